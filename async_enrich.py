@@ -0,0 +1,127 @@
+import asyncio
+import threading
+from concurrent.futures import FIRST_COMPLETED, wait
+
+from pyflink.common.typeinfo import Types
+from pyflink.datastream import KeyedProcessFunction, OutputTag
+from pyflink.datastream.state import ListStateDescriptor
+
+from news_codec import decode_news
+
+# 병렬 인스턴스 하나가 동시에 처리하는 최대 기사 수
+ENRICH_CAPACITY = 32
+# 기사 하나의 전처리 제한 시간 (초)
+ENRICH_TIMEOUT = 60
+# 완료된 기사를 내보내기 위해 확인하는 주기 (ms)
+ENRICH_POLL_INTERVAL_MS = 200
+
+# 시간 초과, 오류로 전처리하지 못한 원본 메시지를 내보내는 side output
+ENRICH_FAILED_TAG = OutputTag("enrich-failed", Types.STRING())
+
+
+class AsyncEnrichFunction(KeyedProcessFunction):
+    """
+    Flink async I/O 방식의 기사 전처리 연산자
+    enrich(news) 코루틴을 백그라운드 이벤트 루프에서 최대 capacity개까지 동시에 실행하고,
+    끝나는 순서대로(unordered) 결과를 내보낸다.
+
+    - 용량이 가득 차면 하나가 끝날 때까지 다음 기사를 받지 않는다. (backpressure)
+    - timeout을 넘긴 기사는 취소하고 원본 메시지를 ENRICH_FAILED_TAG side output으로 내보내므로,
+      느린 기사 하나가 파티션 전체를 막지 않고 실패한 기사도 잃어버리지 않는다.
+    - 처리 중인 원본 메시지는 키별 ListState에 두고, 결과는 그 키의 처리 시간 타이머에서 내보내면서 지운다.
+      state와 타이머는 checkpoint에 포함되므로, Kafka offset이 커밋된 뒤 장애가 나도
+      복구된 타이머가 아직 내보내지 않은 기사를 다시 전처리한다.
+    """
+
+    def __init__(
+        self,
+        enrich,
+        capacity=ENRICH_CAPACITY,
+        timeout=ENRICH_TIMEOUT,
+        poll_interval_ms=ENRICH_POLL_INTERVAL_MS,
+        on_open=None,
+    ):
+        self.enrich = enrich
+        self.capacity = capacity
+        self.timeout = timeout
+        self.poll_interval_ms = poll_interval_ms
+        # 병렬 인스턴스 수를 받아서 호출할 함수 (프로세스별 API 한도 나누기 등)
+        self.on_open = on_open
+
+    def open(self, runtime_context):
+        if self.on_open is not None:
+            self.on_open(runtime_context.get_number_of_parallel_subtasks())
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="async-enrich", daemon=True)
+        self._thread.start()
+        # 키 -> [(원본 메시지, future)] (결과는 키별 state와 함께 그 키의 타이머에서 정리)
+        self._in_flight = {}
+        self._pending = runtime_context.get_list_state(ListStateDescriptor("pending", Types.STRING()))
+
+    async def _enrich(self, raw):
+        return await self.enrich(decode_news(raw))
+
+    def _submit(self, raw):
+        coro = asyncio.wait_for(self._enrich(raw), self.timeout)
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    # 키의 처리 중인 기사 목록
+    # 이 프로세스에 없으면 checkpoint에서 복구된 키이므로, 장애 전에 내보내지 못한 기사를 다시 전처리한다
+    def _entries(self, key):
+        if key not in self._in_flight:
+            self._in_flight[key] = [(raw, self._submit(raw)) for raw in self._pending.get() or []]
+        return self._in_flight[key]
+
+    def _running(self):
+        return [future for entries in self._in_flight.values() for _, future in entries if not future.done()]
+
+    def _schedule_poll(self, ctx, now):
+        ctx.timer_service().register_processing_time_timer(now + self.poll_interval_ms)
+
+    def process_element(self, value, ctx):
+        # 끝났지만 아직 내보내지 않은 기사는 용량에서 빼고, 타이머에서 내보낸다
+        running = self._running()
+        while len(running) >= self.capacity:
+            wait(running, return_when=FIRST_COMPLETED)
+            running = self._running()
+
+        entries = self._entries(ctx.get_current_key())
+        self._pending.add(value)
+        entries.append((value, self._submit(value)))
+        self._schedule_poll(ctx, ctx.timer_service().current_processing_time())
+
+    def on_timer(self, timestamp, ctx):
+        key = ctx.get_current_key()
+        remaining = []
+        for raw, future in self._entries(key):
+            if not future.done():
+                remaining.append((raw, future))
+                continue
+            try:
+                result = future.result()
+            except TimeoutError:
+                print(f"기사 전처리 시간 초과 ({self.timeout}초)")
+                yield ENRICH_FAILED_TAG, raw
+                continue
+            except Exception as e:
+                print(f"기사 전처리 중 오류 발생: {e}")
+                yield ENRICH_FAILED_TAG, raw
+                continue
+            if result is not None:
+                yield result
+
+        if remaining:
+            self._in_flight[key] = remaining
+            self._pending.update([raw for raw, _ in remaining])
+            self._schedule_poll(ctx, timestamp)
+        else:
+            self._in_flight.pop(key, None)
+            self._pending.clear()
+
+    def close(self):
+        for entries in self._in_flight.values():
+            for _, future in entries:
+                future.cancel()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
@@ -1,3 +1,4 @@
+import glob
 import os
 import shutil
 from datetime import datetime, timedelta
@@ -26,7 +27,8 @@ def main():
     ARCHIVE_DIR = "/opt/airflow/data/news_archive"
     REPORT_DIR = "/opt/airflow/data"
 
-    INPUT_PATH = os.path.join(REALTIME_DIR, "*.json")
+    INPUT_PATH = os.path.join(REALTIME_DIR, "*.jsonl")
+    LEGACY_INPUT_PATH = os.path.join(REALTIME_DIR, "*.json")
     REPORT_PATH = os.path.join(REPORT_DIR, f"daily_report_{report_date.strftime('%Y%m%d')}.pdf")
     ARCHIVE_TARGET = os.path.join(ARCHIVE_DIR)
 
@@ -38,7 +40,18 @@ def main():
 
     try:
         # 6. JSON 데이터 로드
-        df = spark.read.option("multiline", "true").json(INPUT_PATH)
+        # JSONL은 한 줄이 기사 하나라 multiline 없이 분할해서 읽고, 이전 형식(JSON 배열) 파일이 남아 있으면 함께 읽기
+        frames = []
+        if glob.glob(INPUT_PATH):
+            frames.append(spark.read.json(INPUT_PATH))
+        if glob.glob(LEGACY_INPUT_PATH):
+            frames.append(spark.read.option("multiline", "true").json(LEGACY_INPUT_PATH))
+        if not frames:
+            raise FileNotFoundError(f"{REALTIME_DIR}에 기사 파일이 없습니다.")
+
+        df = frames[0]
+        for frame in frames[1:]:
+            df = df.unionByName(frame, allowMissingColumns=True)
         print(f"[INFO] 전체 로드된 기사 수: {df.count()}")
 
         # 7. 날짜 필터링
@@ -67,10 +80,11 @@ def main():
         else:
             print("[WARN] 키워드 데이터가 없습니다. 리포트 생성 생략.")
 
-        # 10. JSON 아카이빙
+        # 10. JSON 아카이빙 (consumer가 아직 쓰고 있는 오늘 파일은 제외)
         os.makedirs(ARCHIVE_TARGET, exist_ok=True)
+        today_prefix = datetime.today().strftime("%Y-%m-%d")
         for file in os.listdir(REALTIME_DIR):
-            if file.endswith(".json"):
+            if file.endswith((".json", ".jsonl")) and not file.startswith(today_prefix):
                 src_path = os.path.join(REALTIME_DIR, file)
                 dst_path = os.path.join(ARCHIVE_TARGET, file)
                 shutil.move(src_path, dst_path)
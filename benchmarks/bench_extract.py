@@ -0,0 +1,90 @@
+"""
+기사 본문 추출 CPU 시간 비교: BeautifulSoup(html.parser) vs selectolax(lexbor) 추출 규칙
+
+    python benchmarks/bench_extract.py --rounds 5
+    python benchmarks/bench_extract.py --html-dir ./saved_pages   # 저장해 둔 실제 기사 페이지(*.html)
+"""
+import argparse
+import glob
+import html
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bs4 import BeautifulSoup
+
+import html_extract
+from benchmarks.stub_pages import load_articles, render_article_html
+from news_crawling import KHAN_CONTENT, OHMYNEWS_DESCRIPTION
+
+
+# 이전 구현: 기사 페이지 전체를 html.parser로 파싱
+def soup_extract_content(page):
+    soup = BeautifulSoup(page, "html.parser")
+    content_tag = soup.find_all("p", class_="content_text text-l")
+    if not content_tag:
+        return "본문 없음"
+    return "\n\n".join([tag.text.strip() for tag in content_tag])
+
+
+def soup_clean_description(raw_html):
+    soup = BeautifulSoup(raw_html, "html.parser")
+    return soup.get_text(strip=True).split("전체 내용보기")[0].strip()
+
+
+# 오마이뉴스 RSS description과 비슷한 HTML 조각
+def render_description(article):
+    summary = html.escape(article["content"][:300])
+    return f'<p>{summary}</p><br/><a href="{html.escape(article["url"])}">전체 내용보기</a>'
+
+
+def load_pages(html_dir):
+    if not html_dir:
+        return [render_article_html(article) for article in load_articles()]
+    pages = []
+    for path in sorted(glob.glob(os.path.join(html_dir, "*.html"))):
+        with open(path, "r", encoding="utf-8") as f:
+            pages.append(f.read())
+    return pages
+
+
+# 문서 하나당 평균 CPU 시간 (ms)
+def bench(extract, documents, rounds):
+    start = time.process_time()
+    for _ in range(rounds):
+        for document in documents:
+            extract(document)
+    return (time.process_time() - start) * 1000 / (rounds * len(documents))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--html-dir", help="저장해 둔 기사 페이지(*.html) 디렉터리 (기본: 저장된 기사로 렌더링)")
+    args = parser.parse_args()
+
+    if html_extract.LexborHTMLParser is None:
+        print("selectolax가 설치되어 있지 않아 BeautifulSoup으로만 추출합니다.")
+
+    pages = load_pages(args.html_dir)
+    descriptions = [render_description(article) for article in load_articles()]
+
+    cases = [
+        ("기사 페이지", pages, soup_extract_content, KHAN_CONTENT),
+        ("RSS description", descriptions, soup_clean_description, OHMYNEWS_DESCRIPTION),
+    ]
+    for name, documents, before, after in cases:
+        mismatches = sum(before(document) != after(document) for document in documents)
+        soup_ms = bench(before, documents, args.rounds)
+        fast_ms = bench(after, documents, args.rounds)
+
+        print(f"{name} {len(documents)}건 x {args.rounds}회 (결과가 다른 문서 {mismatches}건)")
+        print(f"  BeautifulSoup : {soup_ms:7.3f} ms/article")
+        print(f"  추출 규칙     : {fast_ms:7.3f} ms/article")
+        print(f"  CPU 시간 감소 : {(1 - fast_ms / soup_ms) * 100:.0f}% ({soup_ms / fast_ms:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
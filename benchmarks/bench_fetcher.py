@@ -0,0 +1,55 @@
+"""
+기사 본문 수집 처리량 비교: 순차 requests(crawl_article) vs 비동기 ArticleFetcher
+
+    python benchmarks/bench_fetcher.py --articles 50 --latency 0.1
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.stub_pages import StubArticleServer, load_articles, render_article_html
+from news_crawling import crawl_article
+from news_fetcher import fetch_articles
+
+
+def bench_sequential(urls):
+    start = time.perf_counter()
+    for url in urls:
+        crawl_article(url)
+    return time.perf_counter() - start
+
+
+def bench_async(urls, concurrency, per_host):
+    start = time.perf_counter()
+    results = fetch_articles(urls, concurrency=concurrency, per_host=per_host)
+    elapsed = time.perf_counter() - start
+    assert len(results) == len(urls), "일부 기사 수집 실패"
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--articles", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.1, help="스텁 서버 응답 지연 (초)")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--per-host", type=int, default=8)
+    args = parser.parse_args()
+
+    pages = [render_article_html(article) for article in load_articles()]
+    with StubArticleServer(pages, latency=args.latency) as server:
+        urls = [server.url(i) for i in range(args.articles)]
+
+        sequential = bench_sequential(urls)
+        concurrent = bench_async(urls, args.concurrency, args.per_host)
+
+    print(f"기사 {args.articles}건, 응답 지연 {args.latency * 1000:.0f}ms")
+    print(f"순차 requests     : {sequential:7.3f}s  ({args.articles / sequential:7.1f} articles/s)")
+    print(f"비동기 aiohttp    : {concurrent:7.3f}s  ({args.articles / concurrent:7.1f} articles/s)")
+    print(f"속도 향상         : {sequential / concurrent:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
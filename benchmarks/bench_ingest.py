@@ -0,0 +1,317 @@
+"""
+오프라인 수집 파이프라인 벤치마크
+저장된 뉴스 JSON(data/, batch/data/news_archive/)을 producer -> Kafka -> consumer(process_and_save)
+-> PostgreSQL/Elasticsearch/JSONL/HDFS 순서로 그대로 흘려보내고 단계별 지연과 처리량을 측정한다.
+
+외부 서비스는 모두 프로세스 안의 가짜로 대신한다.
+- Kafka: InMemoryKafka (producer와 같은 직렬화)
+- OpenAI: FakeOpenAI (결정적 키워드/카테고리/임베딩, 지연 조절)
+- Elasticsearch: InMemoryEsSink
+- PostgreSQL: SQLite (--pg-dsn을 주면 로컬 PostgreSQL)
+- JSONL, HDFS: 임시 디렉터리
+
+    python benchmarks/bench_ingest.py --mode sync --repeat 1
+    python benchmarks/bench_ingest.py --mode async --capacity 32 --chat-latency 0.5
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
+from functools import partial
+
+# 실행 결과가 캐시에 남지 않도록 LLM 캐시를 끈다 (llm_cache를 import하기 전에 설정)
+os.environ.setdefault("LLM_CACHE_PATH", "")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import async_enrich
+import embedding_batcher
+import es_sink
+import hdfs_sink
+import jsonl_archive
+import near_dup
+import news_consumer
+import openai_api
+import pg_writer
+import related_articles
+from benchmarks.fake_services import (
+    FakeOpenAI,
+    InMemoryEsSink,
+    InMemoryKafka,
+    InMemoryRelatedUpdater,
+    SqliteArticleWriter,
+)
+from benchmarks.stub_pages import load_articles
+from news_codec import FORMATS, decode_news, encode_news, url_key
+from news_producer import TOPIC
+
+STAGES = ["produce", "decode", "enrich", "pg_batch", "es_bulk", "sinks", "end_to_end"]
+
+
+class StageTimer:
+    """단계별 소요 시간을 모아 백분위수로 보여주는 타이머 (여러 스레드에서 기록)"""
+
+    def __init__(self):
+        self.samples = {}
+        self._lock = threading.Lock()
+
+    def record(self, stage, seconds):
+        with self._lock:
+            self.samples.setdefault(stage, []).append(seconds)
+
+    @contextlib.contextmanager
+    def measure(self, stage):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start)
+
+    def wrap(self, stage, func):
+        def timed(*args, **kwargs):
+            with self.measure(stage):
+                return func(*args, **kwargs)
+
+        return timed
+
+    def wrap_async(self, stage, func):
+        async def timed(*args, **kwargs):
+            with self.measure(stage):
+                return await func(*args, **kwargs)
+
+        return timed
+
+    def report(self):
+        print(f"{'단계':<12}{'건수':>8}{'p50':>10}{'p95':>10}{'p99':>10}{'max':>10}  (ms)")
+        for stage in STAGES:
+            values = sorted(self.samples.get(stage, []))
+            if not values:
+                continue
+            row = [percentile(values, p) * 1000 for p in (50, 95, 99)] + [values[-1] * 1000]
+            print(f"{stage:<12}{len(values):>8}" + "".join(f"{value:>10.1f}" for value in row))
+
+
+# nearest-rank 백분위수 (values는 정렬된 상태)
+def percentile(values, p):
+    index = max(0, -(-len(values) * p // 100) - 1)
+    return values[int(index)]
+
+
+# 저장된 기사를 repeat번 반복해서 Kafka로 전송 (반복분은 url을 바꿔 새 기사로 취급)
+def replay(articles, repeat, kafka, timer):
+    for n in range(repeat):
+        for article in articles:
+            data = dict(article)
+            data.pop("category", None)
+            if n:
+                data["url"] = f"{data['url']}#replay-{n}"
+            with timer.measure("produce"):
+                kafka.send(TOPIC, value=data, key=url_key(data["url"]))
+    kafka.flush()
+
+
+def install_stand_ins(args, workdir, backend, on_saved):
+    """consumer가 쓰는 공유 리소스(OpenAI, 저장소 singleton)를 가짜 서비스로 바꿔 끼운다."""
+    openai_api.use_backend(backend, backend.async_client)
+    if args.chat_rpm:
+        openai_api.RATE_LIMITS[openai_api.CHAT_MODEL] = (args.chat_rpm, openai_api.RATE_LIMITS[openai_api.CHAT_MODEL][1])
+
+    if args.pg_dsn:
+        from psycopg2.pool import ThreadedConnectionPool
+
+        pool = ThreadedConnectionPool(pg_writer.PG_POOL_MIN, pg_writer.PG_POOL_MAX, dsn=args.pg_dsn)
+        writer = pg_writer.PostgresArticleWriter(pool=pool, on_saved=on_saved)
+    else:
+        writer = SqliteArticleWriter(os.path.join(workdir, "news.sqlite3"), on_saved=on_saved)
+
+    pg_writer._writer = writer
+    es_sink._sink = InMemoryEsSink(latency=args.es_latency)
+    jsonl_archive._writer = jsonl_archive.JsonlArchiveWriter(os.path.join(workdir, "archive"))
+    hdfs_sink._sink = hdfs_sink.RollingHdfsSink(
+        client=hdfs_sink.LocalFileSystemClient(os.path.join(workdir, "hdfs")),
+        staging_dir=os.path.join(workdir, "hdfs_staging"),
+    )
+    embedding_batcher._batcher = embedding_batcher.EmbeddingBatcher()
+    related_articles._updater = InMemoryRelatedUpdater()
+    return writer
+
+
+class _TimerService:
+    def __init__(self, ctx):
+        self.ctx = ctx
+
+    def current_processing_time(self):
+        return int(time.time() * 1000)
+
+    def register_processing_time_timer(self, timestamp):
+        self.ctx.timers.add(self.ctx.key)
+
+
+class _Context:
+    """Flink 키 context 흉내: 현재 키와 타이머를 등록한 키 목록"""
+
+    def __init__(self):
+        self.key = None
+        self.timers = set()
+
+    def get_current_key(self):
+        return self.key
+
+    def timer_service(self):
+        return _TimerService(self)
+
+
+class _KeyedListState:
+    def __init__(self, ctx):
+        self.ctx = ctx
+        self.values = {}
+
+    def get(self):
+        return self.values.get(self.ctx.key, [])
+
+    def add(self, value):
+        self.values.setdefault(self.ctx.key, []).append(value)
+
+    def update(self, values):
+        self.values[self.ctx.key] = list(values)
+
+    def clear(self):
+        self.values.pop(self.ctx.key, None)
+
+
+class _RuntimeContext:
+    def __init__(self, ctx):
+        self.ctx = ctx
+
+    def get_list_state(self, descriptor):
+        return _KeyedListState(self.ctx)
+
+
+# 타이머를 등록한 키마다 on_timer를 불러서 끝난 기사를 저장 단계로 전달
+def _fire_timers(function, ctx):
+    for key in list(ctx.timers):
+        ctx.timers.discard(key)
+        ctx.key = key
+        for data in function.on_timer(0, ctx):
+            if isinstance(data, tuple):  # (ENRICH_FAILED_TAG, 원본 메시지)
+                continue
+            news_consumer.save_article(data)
+
+
+# Flink 없이 AsyncEnrichFunction을 직접 구동 (news_consumer와 같은 키로, 전처리 결과는 저장 단계로 바로 전달)
+def consume_async(messages, enrich, capacity, timeout):
+    function = async_enrich.AsyncEnrichFunction(enrich, capacity=capacity, timeout=timeout)
+    ctx = _Context()
+    function.open(_RuntimeContext(ctx))
+    try:
+        for _, raw in messages:
+            value = raw.decode("latin-1")
+            ctx.key = news_consumer.enrich_key(value)
+            function.process_element(value, ctx)
+            _fire_timers(function, ctx)
+        while ctx.timers:
+            running = function._running()
+            if running:
+                wait(running, return_when=FIRST_COMPLETED)
+            _fire_timers(function, ctx)
+    finally:
+        function.close()
+
+
+def consume_sync(messages):
+    for _, raw in messages:
+        news_consumer.process_and_save(raw.decode("latin-1"))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--mode", choices=["sync", "async"], default="async", help="consumer 전처리 방식")
+    parser.add_argument("--repeat", type=int, default=1, help="저장된 기사를 반복해서 보낼 횟수")
+    parser.add_argument("--format", choices=FORMATS, default="json", help="메시지 직렬화 형식")
+    parser.add_argument("--chat-latency", type=float, default=0.5, help="키워드/카테고리 요청 지연 (초)")
+    parser.add_argument("--embedding-latency", type=float, default=0.2, help="임베딩 요청 지연 (초)")
+    parser.add_argument("--es-latency", type=float, default=0.02, help="Elasticsearch bulk 요청 지연 (초)")
+    parser.add_argument("--chat-rpm", type=int, help="키워드/카테고리 요청 RPM 한도 (기본: openai_api 설정)")
+    parser.add_argument("--capacity", type=int, default=async_enrich.ENRICH_CAPACITY, help="async 모드 동시 처리 기사 수")
+    parser.add_argument("--timeout", type=float, default=async_enrich.ENRICH_TIMEOUT, help="기사 하나의 전처리 제한 시간 (초)")
+    parser.add_argument("--pg-dsn", help="SQLite 대신 사용할 로컬 PostgreSQL DSN (news_article 테이블 필요)")
+    parser.add_argument("--workdir", help="JSONL, HDFS, SQLite 결과를 남길 디렉터리 (기본: 임시 디렉터리)")
+    parser.add_argument("--verbose", action="store_true", help="consumer 출력을 그대로 보여줌")
+    args = parser.parse_args()
+
+    articles = load_articles()
+    timer = StageTimer()
+    backend = FakeOpenAI(args.chat_latency, args.embedding_latency)
+
+    received_at = {}
+    saved = []
+    save_to_sinks = news_consumer.save_to_sinks
+
+    # consumer가 메시지를 받은 시각부터 모든 저장소에 넘길 때까지를 end_to_end로 측정
+    def timed_decode(raw):
+        with timer.measure("decode"):
+            news = decode_news(raw)
+        received_at[news["url"]] = time.perf_counter()
+        return news
+
+    def timed_save_to_sinks(article_id, data):
+        with timer.measure("sinks"):
+            save_to_sinks(article_id, data)
+        timer.record("end_to_end", time.perf_counter() - received_at[data["url"]])
+        saved.append(article_id)
+
+    news_consumer.decode_news = timed_decode
+    async_enrich.decode_news = timed_decode
+    news_consumer.enrich_article = timer.wrap("enrich", news_consumer.enrich_article)
+
+    with contextlib.ExitStack() as stack:
+        workdir = args.workdir or stack.enter_context(tempfile.TemporaryDirectory())
+        writer = install_stand_ins(args, workdir, backend, timed_save_to_sinks)
+        writer._insert_rows = timer.wrap("pg_batch", writer._insert_rows)
+        sink = es_sink._sink
+        sink._bulk = timer.wrap("es_bulk", sink._bulk)
+
+        kafka = InMemoryKafka(partial(encode_news, fmt=args.format))
+        replay(articles, args.repeat, kafka, timer)
+        messages = kafka.poll()
+
+        output = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+        start = time.perf_counter()
+        with output:
+            if args.mode == "async":
+                enrich = timer.wrap_async("enrich", news_consumer.aenrich_article)
+                consume_async(messages, enrich, args.capacity, args.timeout)
+            else:
+                consume_sync(messages)
+
+            # 버퍼에 남은 기사까지 모든 저장소에 반영될 때까지 기다림
+            writer.close()
+            sink.close()
+            jsonl_archive._writer.close()
+            hdfs_sink._sink.close()
+            embedding_batcher._batcher.close()
+            related_articles._updater.close()
+        elapsed = time.perf_counter() - start
+
+    print(
+        f"기사 {len(messages)}건 ({args.format}, {kafka.bytes_sent / 1024:.0f}KB), 모드 {args.mode}, "
+        f"chat 지연 {args.chat_latency * 1000:.0f}ms, 임베딩 지연 {args.embedding_latency * 1000:.0f}ms"
+    )
+    timer.report()
+    print(f"저장 완료      : {len(saved)}/{len(messages)}건, {elapsed:.3f}s ({len(saved) / elapsed:.1f} articles/s)")
+    batch_size = backend.embedded_texts / backend.embedding_requests if backend.embedding_requests else 0
+    print(
+        f"OpenAI 요청    : chat {backend.chat_requests}회, "
+        f"embedding {backend.embedding_requests}회 (평균 배치 {batch_size:.1f}건)"
+    )
+    print(f"유사 기사 재사용: {near_dup.get_near_dup_index().hits}건 (반복분은 본문이 같아 모두 재사용)")
+    print(f"저장소 요청    : PostgreSQL 배치 {len(timer.samples.get('pg_batch', []))}회, ES bulk {sink.bulk_requests}회")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+"""
+오프라인 벤치마크용 가짜 외부 서비스
+Kafka, OpenAI, Elasticsearch, PostgreSQL을 프로세스 안에서 흉내 내고,
+응답 지연은 인자로 조절한다. 같은 입력에는 항상 같은 결과를 돌려준다.
+"""
+import asyncio
+import hashlib
+import json
+import math
+import queue
+import random
+import re
+import sqlite3
+import threading
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+from es_sink import ElasticsearchBulkSink
+from openai_api import ALLOWED_CATEGORIES
+from pg_writer import PostgresArticleWriter
+from related_articles import RelatedArticleUpdater
+
+
+def _seed(text):
+    return int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "big")
+
+
+# 본문에서 뽑은 키워드 5개와 본문 해시로 고른 카테고리
+def fake_enrichment(content):
+    keywords = []
+    for word in re.findall(r"[가-힣A-Za-z0-9]{2,}", content):
+        if word not in keywords:
+            keywords.append(word)
+        if len(keywords) == 5:
+            break
+    category = ALLOWED_CATEGORIES[_seed(content) % len(ALLOWED_CATEGORIES)]
+    return {"keywords": keywords, "category": category}
+
+
+# 본문 해시를 시드로 만든 단위 벡터
+def fake_embedding(text, dimensions=1536):
+    rng = random.Random(_seed(text))
+    vector = [rng.gauss(0, 1) for _ in range(dimensions)]
+    norm = math.sqrt(sum(value * value for value in vector)) or 1.0
+    return [value / norm for value in vector]
+
+
+def _chat_response(messages):
+    content = json.dumps(fake_enrichment(messages[-1]["content"]), ensure_ascii=False)
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content), finish_reason="stop")])
+
+
+def _embedding_response(texts):
+    return SimpleNamespace(
+        data=[SimpleNamespace(index=i, embedding=fake_embedding(text)) for i, text in enumerate(texts)]
+    )
+
+
+class FakeOpenAI:
+    """
+    OpenAI 클라이언트 대신 쓰는 결정적 가짜 백엔드
+    chat_latency: 키워드/카테고리 요청 하나의 지연 (초)
+    embedding_latency: 임베딩 요청 하나의 지연 (초, 배치 크기와 무관)
+    """
+
+    def __init__(self, chat_latency=0.5, embedding_latency=0.2):
+        self.chat_latency = chat_latency
+        self.embedding_latency = embedding_latency
+        self.chat_requests = 0
+        self.embedding_requests = 0
+        self.embedded_texts = 0
+        self._lock = threading.Lock()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create_chat))
+        self.embeddings = SimpleNamespace(create=self._create_embeddings)
+
+    def _count(self, chat=0, embedding=0, texts=0):
+        with self._lock:
+            self.chat_requests += chat
+            self.embedding_requests += embedding
+            self.embedded_texts += texts
+
+    def _create_chat(self, model, messages, **kwargs):
+        self._count(chat=1)
+        time.sleep(self.chat_latency)
+        return _chat_response(messages)
+
+    def _create_embeddings(self, input, model, **kwargs):
+        self._count(embedding=1, texts=len(input))
+        time.sleep(self.embedding_latency)
+        return _embedding_response(input)
+
+    def async_client(self):
+        """요청 수는 이 객체에 함께 집계하는 async 클라이언트"""
+        return FakeAsyncOpenAI(self)
+
+
+class FakeAsyncOpenAI:
+    """FakeOpenAI의 async 버전 (지연은 asyncio.sleep)"""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create_chat))
+        self.embeddings = SimpleNamespace(create=self._create_embeddings)
+
+    async def _create_chat(self, model, messages, **kwargs):
+        self.backend._count(chat=1)
+        await asyncio.sleep(self.backend.chat_latency)
+        return _chat_response(messages)
+
+    async def _create_embeddings(self, input, model, **kwargs):
+        self.backend._count(embedding=1, texts=len(input))
+        await asyncio.sleep(self.backend.embedding_latency)
+        return _embedding_response(input)
+
+
+class InMemoryKafka:
+    """
+    KafkaProducer와 같은 send()/flush()를 가진 프로세스 내부 토픽
+    value_serializer로 직렬화한 바이트를 그대로 쌓아두고, 소비하는 쪽은 poll()로 꺼낸다.
+    """
+
+    def __init__(self, value_serializer):
+        self.value_serializer = value_serializer
+        self.bytes_sent = 0
+        self._messages = queue.Queue()
+
+    def send(self, topic, value, key=None):
+        raw = self.value_serializer(value)
+        self.bytes_sent += len(raw)
+        self._messages.put((key, raw))
+
+    def flush(self):
+        pass
+
+    def poll(self):
+        """쌓여 있는 메시지를 모두 꺼낸다."""
+        messages = []
+        while True:
+            try:
+                messages.append(self._messages.get_nowait())
+            except queue.Empty:
+                return messages
+
+
+class InMemoryElasticsearch:
+    """InMemoryEsSink가 색인한 문서를 보관하는 가짜 Elasticsearch 클라이언트"""
+
+    def __init__(self):
+        self.documents = {}
+        self._lock = threading.Lock()
+
+    def index(self, index, id, document):
+        with self._lock:
+            self.documents[id] = document
+
+
+class InMemoryEsSink(ElasticsearchBulkSink):
+    """bulk 요청을 보내지 않고 latency만큼 기다린 뒤 메모리에 색인하는 sink"""
+
+    def __init__(self, latency=0.02, **kwargs):
+        self.latency = latency
+        self.bulk_requests = 0
+        super().__init__(client=InMemoryElasticsearch(), **kwargs)
+
+    def _bulk(self, actions):
+        self.bulk_requests += 1
+        time.sleep(self.latency)
+        for action in actions:
+            self.client.index(index=self.index, id=action.get("_id"), document=action["_source"])
+        return [True] * len(actions)
+
+
+CREATE_ARTICLE_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS news_article (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        title TEXT, writer TEXT, write_date TEXT, category TEXT, content TEXT,
+        url TEXT UNIQUE, keywords TEXT, embedding TEXT, views INTEGER, duplicate_of TEXT
+    )
+"""
+
+
+class SqliteConnectionPool:
+    """커넥션 하나를 공유하는 PostgresArticleWriter용 풀"""
+
+    def __init__(self, path):
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute(CREATE_ARTICLE_TABLE_SQL)
+
+    def closeall(self):
+        self.conn.close()
+
+
+class SqliteArticleWriter(PostgresArticleWriter):
+    """PostgreSQL 대신 SQLite에 같은 배치 INSERT ... ON CONFLICT DO NOTHING RETURNING을 실행하는 writer"""
+
+    def __init__(self, path=":memory:", **kwargs):
+        self.insert_batches = 0
+        super().__init__(pool=SqliteConnectionPool(path), **kwargs)
+
+    def _insert_rows(self, rows):
+        self.insert_batches += 1
+        placeholders = ", ".join(["(?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"] * len(rows))
+        sql = (
+            "INSERT INTO news_article (title, writer, write_date, category, content, url, keywords, embedding, views, duplicate_of) "
+            f"VALUES {placeholders} ON CONFLICT (url) DO NOTHING RETURNING id, url"
+        )
+        conn = self.pool.conn
+        try:
+            saved = conn.execute(sql, [value for row in rows for value in row]).fetchall()
+            conn.commit()
+            return saved
+        except Exception:
+            conn.rollback()
+            raise
+
+
+class _NullPool:
+    def closeall(self):
+        pass
+
+
+class InMemoryRelatedUpdater(RelatedArticleUpdater):
+    """HNSW 검색 대신 메모리의 임베딩 전체와 코사인 거리를 비교해서 관련 기사를 갱신하는 updater"""
+
+    def __init__(self, **kwargs):
+        self.embeddings = {}
+        self.related = {}
+        self.update_batches = 0
+        super().__init__(pool=_NullPool(), **kwargs)
+
+    def _update(self, batch):
+        self.update_batches += 1
+        for article_id, embedding in batch:
+            vector = np.asarray(embedding, dtype=np.float32)
+            vector /= np.linalg.norm(vector) or 1.0
+            if self.embeddings:
+                ids = list(self.embeddings)
+                distances = 1.0 - np.stack([self.embeddings[i] for i in ids]) @ vector
+                for index in np.argsort(distances)[: self.top_k]:
+                    self._link(article_id, ids[index], float(distances[index]))
+                    self._link(ids[index], article_id, float(distances[index]))
+            self.embeddings[article_id] = vector
+
+    def _link(self, article_id, related_id, distance):
+        related = self.related.setdefault(article_id, {})
+        related[related_id] = distance
+        if len(related) > self.top_k:
+            del related[max(related, key=related.get)]
+
@@ -0,0 +1,108 @@
+"""
+벤치마크용 기사 HTML 코퍼스와 로컬 스텁 HTTP 서버
+저장된 뉴스 JSON(data/, batch/data/news_archive/)의 본문을 경향신문 기사 페이지 형태로 렌더링한다.
+"""
+import glob
+import html
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ARTICLE_JSON_PATTERNS = [
+    os.path.join(ROOT_DIR, "data", "*.json"),
+    os.path.join(ROOT_DIR, "batch", "data", "news_archive", "*.json"),
+]
+
+
+# 저장된 기사 JSON을 모두 읽어오는 함수
+def load_articles():
+    articles = []
+    for pattern in ARTICLE_JSON_PATTERNS:
+        for path in sorted(glob.glob(pattern)):
+            with open(path, "r", encoding="utf-8") as f:
+                articles.extend(json.load(f))
+    return articles
+
+
+# 기사 하나를 경향신문 기사 페이지와 비슷한 HTML로 렌더링하는 함수
+def render_article_html(article):
+    paragraphs = "\n".join(
+        f'<p class="content_text text-l">{html.escape(p)}</p>'
+        for p in article["content"].split("\n\n")
+    )
+    # 실제 페이지처럼 본문 앞뒤로 메뉴, 광고 등 잡음을 둔다
+    noise = "\n".join(
+        f'<li><a href="/article/{i}">관련 기사 {i}</a></li>' for i in range(50)
+    )
+    return f"""<!DOCTYPE html>
+<html lang="ko">
+<head><meta charset="utf-8"><title>{html.escape(article["title"])}</title></head>
+<body>
+<header><nav><ul>{noise}</ul></nav></header>
+<article>
+<h1>{html.escape(article["title"])}</h1>
+<div class="editor">{html.escape(article["writer"])} 기자</div>
+<div class="art_body">
+{paragraphs}
+</div>
+</article>
+<aside><ul>{noise}</ul></aside>
+<footer>경향신문</footer>
+</body>
+</html>"""
+
+
+# /article/<번호> 경로로 기사 HTML을 돌려주는 스텁 서버
+class StubArticleServer:
+    def __init__(self, pages, latency=0.0, host="127.0.0.1", port=0):
+        self.pages = [page.encode("utf-8") for page in pages]
+        self.latency = latency
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                try:
+                    index = int(self.path.rsplit("/", 1)[-1])
+                    body = server.pages[index % len(server.pages)]
+                except ValueError:
+                    self.send_error(404)
+                    return
+
+                # 네트워크 왕복 지연 흉내
+                if server.latency:
+                    time.sleep(server.latency)
+
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def url(self, index):
+        return f"{self.base_url}/article/{index}"
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
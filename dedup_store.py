@@ -0,0 +1,150 @@
+import os
+import sqlite3
+import time
+from collections import OrderedDict
+
+# 수집한 url을 기록하는 SQLite 파일 경로
+DEDUP_DB_PATH = os.getenv("DEDUP_DB_PATH", "./batch/data/collected_url.sqlite3")
+# url을 기억하는 기간 (초, 기본 7일)
+DEDUP_TTL = 7 * 24 * 60 * 60
+# 메모리에 올려둘 최대 url 수
+DEDUP_MEMORY_SIZE = 100_000
+
+
+class MemoryDedupStore:
+    """
+    메모리 기반 url 중복 확인 저장소
+    url -> 수집 시각을 LRU 순서로 보관하고, TTL이 지나거나 용량을 넘으면 오래된 것부터 버린다.
+    """
+
+    def __init__(self, ttl=DEDUP_TTL, max_size=DEDUP_MEMORY_SIZE):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._seen = OrderedDict()
+
+    def __contains__(self, url):
+        seen_at = self._seen.get(url)
+        if seen_at is None:
+            return False
+        if self._expired(seen_at):
+            del self._seen[url]
+            return False
+        self._seen.move_to_end(url)
+        return True
+
+    def __len__(self):
+        return len(self._seen)
+
+    def _expired(self, seen_at, now=None):
+        return self.ttl is not None and seen_at < (now or time.time()) - self.ttl
+
+    def _remember(self, url, seen_at):
+        self._seen[url] = seen_at
+        self._seen.move_to_end(url)
+        while len(self._seen) > self.max_size:
+            self._seen.popitem(last=False)
+
+    def add(self, url, seen_at=None):
+        self.add_many([url], seen_at)
+
+    def add_many(self, urls, seen_at=None):
+        seen_at = seen_at or time.time()
+        for url in urls:
+            self._remember(url, seen_at)
+
+    def evict_expired(self):
+        now = time.time()
+        for url in [url for url, seen_at in self._seen.items() if self._expired(seen_at, now)]:
+            del self._seen[url]
+
+    # Postgres에 이미 저장된 기사 url로 저장소를 채우는 함수
+    def seed_from_postgres(self, conn):
+        with conn.cursor() as cur:
+            cur.execute("SELECT url FROM news_article")
+            while True:
+                rows = cur.fetchmany(5000)
+                if not rows:
+                    break
+                self.add_many(row[0] for row in rows)
+
+    def close(self):
+        pass
+
+
+class SqliteDedupStore(MemoryDedupStore):
+    """
+    메모리 캐시 앞단 + SQLite 영구 저장소
+    재시작하면 최근 url을 디스크에서 메모리로 다시 올리고(warm start),
+    메모리에 없는 url은 SQLite 인덱스로 확인한다.
+    """
+
+    def __init__(self, path=DEDUP_DB_PATH, ttl=DEDUP_TTL, max_size=DEDUP_MEMORY_SIZE):
+        super().__init__(ttl, max_size)
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS collected_url (url TEXT PRIMARY KEY, seen_at REAL NOT NULL)"
+        )
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS collected_url_seen_at ON collected_url (seen_at)"
+        )
+        self.conn.commit()
+
+        self.evict_expired()
+        self.warm_start()
+
+    def __contains__(self, url):
+        if super().__contains__(url):
+            return True
+
+        row = self.conn.execute(
+            "SELECT seen_at FROM collected_url WHERE url = ?", (url,)
+        ).fetchone()
+        if row is None or self._expired(row[0]):
+            return False
+
+        self._remember(url, row[0])
+        return True
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM collected_url").fetchone()[0]
+
+    # 최근에 수집한 url부터 메모리 용량만큼 불러오기
+    def warm_start(self):
+        rows = self.conn.execute(
+            "SELECT url, seen_at FROM collected_url ORDER BY seen_at DESC LIMIT ?",
+            (self.max_size,),
+        ).fetchall()
+        for url, seen_at in reversed(rows):
+            self._remember(url, seen_at)
+
+    def add_many(self, urls, seen_at=None):
+        seen_at = seen_at or time.time()
+        urls = list(urls)
+        super().add_many(urls, seen_at)
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO collected_url (url, seen_at) VALUES (?, ?)",
+            [(url, seen_at) for url in urls],
+        )
+        self.conn.commit()
+
+    def evict_expired(self):
+        super().evict_expired()
+        if self.ttl is not None:
+            self.conn.execute(
+                "DELETE FROM collected_url WHERE seen_at < ?", (time.time() - self.ttl,)
+            )
+            self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+
+# 설정에 맞는 중복 확인 저장소 생성 (path가 없으면 메모리 전용)
+def create_dedup_store(path=DEDUP_DB_PATH, ttl=DEDUP_TTL, max_size=DEDUP_MEMORY_SIZE):
+    if not path:
+        return MemoryDedupStore(ttl, max_size)
+    return SqliteDedupStore(path, ttl, max_size)
@@ -152,6 +152,19 @@ CORS_ALLOWED_ORIGINS = [
     "http://localhost:3000",
 ]
 
+# 조회수/조회 기록 write-behind 버퍼
+# REDIS_URL이 있으면 Redis에 모으고 manage.py flush_views 워커가 반영,
+# 없으면 프로세스 안에 모았다가 백그라운드 스레드가 VIEW_BUFFER_FLUSH_INTERVAL(초)마다 반영
+VIEW_BUFFER_REDIS_URL = os.getenv("REDIS_URL")
+VIEW_BUFFER_FLUSH_INTERVAL = 5
+
+# 임베딩 HNSW 인덱스 검색 후보 수 (클수록 정확하지만 느림, consumer의 PGVECTOR_EF_SEARCH와 같은 값)
+PGVECTOR_EF_SEARCH = int(os.getenv("PGVECTOR_EF_SEARCH", 40))
+# 기사마다 미리 계산해 두는 관련 기사 수 (news_relatedarticle)
+RELATED_ARTICLES_TOP_K = 10
+# 설정하면 관련 기사/추천 검색을 이 디렉터리의 memory-mapped 임베딩 색인에서 처리 (manage.py sync_vector_index가 갱신)
+VECTOR_INDEX_DIR = os.getenv("VECTOR_INDEX_DIR")
+
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'rest_framework.authentication.TokenAuthentication',
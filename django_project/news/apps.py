@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class NewsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "news"
+
+    def ready(self):
+        # 좋아요/댓글 카운터, 추천 프로필 signals 등록
+        from . import counters  # noqa: F401
+        from . import profiles  # noqa: F401
@@ -0,0 +1,52 @@
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Article, CommentHistory, LikeHistory
+
+
+# 좋아요/댓글 기록이 생기거나 지워질 때 Article의 카운터를 같은 트랜잭션 안에서 갱신
+# (사용자, 기사 삭제로 cascade되는 기록도 post_delete가 호출된다)
+def adjust_count(article_id, field, delta):
+    Article.objects.filter(id=article_id).update(**{field: F(field) + delta})
+
+
+@receiver(post_save, sender=LikeHistory)
+def like_created(sender, instance, created, **kwargs):
+    if created:
+        adjust_count(instance.article_id, 'like_count', 1)
+
+
+@receiver(post_delete, sender=LikeHistory)
+def like_deleted(sender, instance, **kwargs):
+    adjust_count(instance.article_id, 'like_count', -1)
+
+
+@receiver(post_save, sender=CommentHistory)
+def comment_created(sender, instance, created, **kwargs):
+    if created:
+        adjust_count(instance.article_id, 'comment_count', 1)
+
+
+@receiver(post_delete, sender=CommentHistory)
+def comment_deleted(sender, instance, **kwargs):
+    adjust_count(instance.article_id, 'comment_count', -1)
+
+
+def _count_of(model):
+    counts = model.objects.filter(article=OuterRef('pk')).order_by().values('article')
+    return Coalesce(Subquery(counts.annotate(n=Count('id')).values('n')), 0)
+
+
+def recompute_counts(articles=None):
+    """
+    좋아요/댓글 기록으로 카운터를 다시 계산 (bulk 작업 등으로 signals를 거치지 않은 경우)
+    바뀐 기사 수를 돌려준다.
+    """
+    articles = Article.objects.all() if articles is None else articles
+    likes, comments = _count_of(LikeHistory), _count_of(CommentHistory)
+    stale = articles.annotate(actual_likes=likes, actual_comments=comments) \
+        .exclude(like_count=F('actual_likes'), comment_count=F('actual_comments'))
+    return Article.objects.filter(id__in=stale.values('id')) \
+        .update(like_count=likes, comment_count=comments)
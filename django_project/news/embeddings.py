@@ -0,0 +1,207 @@
+import asyncio
+import hashlib
+import json
+import os
+import time
+
+import numpy as np
+from django.db import connection
+
+from .models import EMBEDDING_DIMENSIONS, Article
+
+
+# consumer(openai_api)와 같은 모델, 같은 본문 길이 제한
+EMBEDDING_MODEL = 'text-embedding-3-small'
+MAX_CONTENT_TOKENS = 5000
+# 임베딩 API 요청 하나에 넣을 수 있는 최대 토큰 수 (API 한도 300,000에서 여유를 둠)
+MAX_REQUEST_TOKENS = 250_000
+
+
+class OpenAIEmbeddingBackend:
+    """OpenAI 임베딩 API (dimensions를 주면 그 차원으로 줄여서 받음)"""
+
+    def __init__(self, model=EMBEDDING_MODEL, dimensions=None, max_retries=5):
+        from openai import AsyncOpenAI
+        import tiktoken
+
+        self.model = model
+        self.dimensions = dimensions
+        self.client = AsyncOpenAI(max_retries=max_retries)
+        self.encoding = tiktoken.get_encoding('cl100k_base')
+
+    def _truncate(self, text):
+        """본문을 MAX_CONTENT_TOKENS로 자르고 (본문, 토큰 수)를 돌려준다."""
+        tokens = self.encoding.encode(text or '')
+        if len(tokens) > MAX_CONTENT_TOKENS:
+            return self.encoding.decode(tokens[:MAX_CONTENT_TOKENS]), MAX_CONTENT_TOKENS
+        return text or ' ', max(len(tokens), 1)
+
+    async def embed(self, texts):
+        """batch_size건이라도 토큰 합이 MAX_REQUEST_TOKENS를 넘으면 요청을 나눠서 차례로 보낸다."""
+        embeddings = []
+        for request in _token_batches([self._truncate(text) for text in texts], MAX_REQUEST_TOKENS):
+            embeddings.extend(await self._embed(request))
+        return embeddings
+
+    async def _embed(self, texts):
+        extra = {'dimensions': self.dimensions} if self.dimensions else {}
+        response = await self.client.embeddings.create(input=texts, model=self.model, **extra)
+        return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+
+
+def _token_batches(truncated, max_tokens):
+    """[(본문, 토큰 수)]를 토큰 합이 max_tokens를 넘지 않는 본문 목록들로 나눈다."""
+    batch, batch_tokens = [], 0
+    for text, tokens in truncated:
+        if batch and batch_tokens + tokens > max_tokens:
+            yield batch
+            batch, batch_tokens = [], 0
+        batch.append(text)
+        batch_tokens += tokens
+    if batch:
+        yield batch
+
+
+class FakeEmbeddingBackend:
+    """본문 해시로 만든 단위 벡터를 돌려주는 오프라인 백엔드 (latency만큼 기다림)"""
+
+    def __init__(self, model=EMBEDDING_MODEL, dimensions=None, latency=0.0):
+        # 실제 모델의 체크포인트와 섞이지 않도록 이름을 구분
+        self.model = f'fake:{model}'
+        self.dimensions = dimensions or EMBEDDING_DIMENSIONS
+        self.latency = latency
+        self.requests = 0
+
+    async def embed(self, texts):
+        self.requests += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return [self._vector(text) for text in texts]
+
+    def _vector(self, text):
+        seed = int.from_bytes(hashlib.sha256((text or '').encode('utf-8')).digest()[:8], 'big')
+        vector = np.random.default_rng(seed).normal(size=self.dimensions)
+        return (vector / np.linalg.norm(vector)).tolist()
+
+
+class CheckpointMismatch(Exception):
+    """체크포인트 파일이 다른 모델, 차원으로 한 작업의 것일 때"""
+
+
+class Checkpoint:
+    """
+    마지막으로 저장한 기사 id를 파일에 기록 (중단된 작업을 이어서 하기 위함)
+    모델, 차원이 다른 작업의 체크포인트는 이어받지 않는다.
+    """
+
+    def __init__(self, path, model, dimensions):
+        self.path = path
+        self.model = model
+        self.dimensions = dimensions
+
+    def load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return 0
+        if data.get('model') != self.model or data.get('dimensions') != self.dimensions:
+            raise CheckpointMismatch(
+                f"체크포인트({self.path})가 다른 작업({data.get('model')}, {data.get('dimensions')}차원)의 것입니다."
+            )
+        return data['last_id']
+
+    def save(self, last_id):
+        tmp = f'{self.path}.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({'model': self.model, 'dimensions': self.dimensions, 'last_id': last_id, 'saved_at': time.time()}, f)
+        os.replace(tmp, self.path)
+
+    def clear(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def update_embeddings(rows):
+    """[(id, 임베딩)]을 UPDATE ... FROM (VALUES ...) 한 번으로 저장"""
+    if not rows:
+        return 0
+    values = ', '.join(['(%s::bigint, %s::vector)'] * len(rows))
+    params = [value for article_id, embedding in rows for value in (article_id, json.dumps(list(embedding)))]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'UPDATE news_article AS a SET embedding = v.embedding '
+            f'FROM (VALUES {values}) AS v(id, embedding) WHERE a.id = v.id',
+            params,
+        )
+        return cursor.rowcount
+
+
+def _rounds(articles, batch_size, concurrency):
+    """기사를 id 순서대로 읽어서 (API 요청 batch_size건씩) concurrency개 묶음으로 나눈다."""
+    round_, batch = [], []
+    # PostgreSQL에서는 iterator()가 서버 측 커서로 chunk_size씩 가져온다
+    for row in articles.order_by('id').values_list('id', 'content').iterator(chunk_size=batch_size * concurrency):
+        batch.append(row)
+        if len(batch) == batch_size:
+            round_.append(batch)
+            batch = []
+            if len(round_) == concurrency:
+                yield round_
+                round_ = []
+    if batch:
+        round_.append(batch)
+    if round_:
+        yield round_
+
+
+async def _embed_round(backend, round_):
+    results = await asyncio.gather(*(backend.embed([content for _, content in batch]) for batch in round_))
+    return [
+        (article_id, embedding)
+        for batch, embeddings in zip(round_, results)
+        for (article_id, _), embedding in zip(batch, embeddings)
+    ]
+
+
+def reembed(backend, checkpoint, articles=None, batch_size=100, concurrency=4, limit=None, progress=None):
+    """
+    기사 임베딩을 다시 계산해서 저장
+    API 요청 concurrency개(각 batch_size건)를 동시에 보내고, 결과를 한 번의 UPDATE로 저장한 뒤
+    마지막 id를 체크포인트에 남긴다. 중단되면 체크포인트 다음 id부터 이어서 처리한다.
+    처리한 기사 수를 돌려준다.
+    """
+    articles = Article.objects.all() if articles is None else articles
+    last_id = checkpoint.load()
+    done = 0
+
+    loop = asyncio.new_event_loop()
+    try:
+        for round_ in _rounds(articles.filter(id__gt=last_id), batch_size, concurrency):
+            if limit is not None:
+                round_ = _limit_round(round_, limit - done)
+                if not round_:
+                    break
+            rows = loop.run_until_complete(_embed_round(backend, round_))
+            update_embeddings(rows)
+
+            done += len(rows)
+            last_id = rows[-1][0]
+            checkpoint.save(last_id)
+            if progress:
+                progress(done, last_id)
+            if limit is not None and done >= limit:
+                break
+    finally:
+        loop.close()
+    return done
+
+
+def _limit_round(round_, remaining):
+    limited = []
+    for batch in round_:
+        if remaining <= 0:
+            break
+        limited.append(batch[:remaining])
+        remaining -= len(limited[-1])
+    return limited
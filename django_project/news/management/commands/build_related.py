@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from news.models import Article
+from news.related import build_related
+
+
+class Command(BaseCommand):
+    help = '임베딩 HNSW 인덱스로 기사별 관련 기사 목록(news_relatedarticle)을 다시 계산합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='한 트랜잭션에서 처리할 기사 수')
+        parser.add_argument('--top-k', type=int, default=None, help='기사마다 저장할 관련 기사 수 (기본: RELATED_ARTICLES_TOP_K)')
+        parser.add_argument('--missing-only', action='store_true', help='관련 기사가 아직 없는 기사만 계산')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        articles = Article.objects.exclude(embedding=None).only('id', 'embedding')
+        if options['missing_only']:
+            articles = articles.filter(related_articles=None)
+
+        last_id, done, saved = 0, 0, 0
+        while True:
+            batch = list(articles.filter(id__gt=last_id).order_by('id')[:batch_size])
+            if not batch:
+                break
+            saved += build_related(batch, options['top_k'])
+            done += len(batch)
+            last_id = batch[-1].id
+            self.stdout.write(f"{done}건 처리 (마지막 id {last_id})")
+
+        self.stdout.write(self.style.SUCCESS(f"기사 {done}건의 관련 기사 {saved}건을 저장했습니다."))
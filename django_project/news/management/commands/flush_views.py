@@ -0,0 +1,29 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from news.view_buffer import flush_views
+
+
+class Command(BaseCommand):
+    help = 'Redis에 쌓인 조회수와 조회 기록을 주기적으로 DB에 반영합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=float, default=5.0, help='반영 주기 (초)')
+        parser.add_argument('--once', action='store_true', help='한 번만 반영하고 종료')
+
+    def handle(self, *args, **options):
+        while True:
+            try:
+                articles, histories = flush_views()
+                if articles or histories:
+                    self.stdout.write(f"조회수 {articles}건, 조회 기록 {histories}건 반영")
+            except Exception as e:
+                self.stderr.write(f"조회수 반영 중 오류 발생: {e}")
+            finally:
+                close_old_connections()
+
+            if options['once']:
+                break
+            time.sleep(options['interval'])
@@ -3,6 +3,11 @@ from elasticsearch import Elasticsearch
 import json
 from dotenv import load_dotenv
 import os
+import sys
+
+# 프로젝트 루트의 consumer 모듈(es_sink) 사용
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))))
+from es_sink import ElasticsearchBulkSink
 
 # 저장되어 있는 데이터를 Elasticsearch로 마이그레이션
 # 환경 변수 로드
@@ -27,27 +32,34 @@ cursor.execute("""
     FROM news_article
 """)
 
+
+# PostgreSQL row를 색인할 문서로 변환 (문서 id = 기사 id)
+def to_document(row):
+    return {
+        "id": row[0],
+        "title": row[1],
+        "writer": row[2],
+        "write_date": row[3],
+        "category": row[4],
+        "content": row[5],
+        "url": row[6],
+        "keywords": row[7],
+    }
+
+
 # 데이터를 Elasticsearch로 마이그레이션
-for row in cursor.fetchall():
-    try:
-        # PostgreSQL row를 딕셔너리로 변환
-        doc = {
-            "id": row[0],
-            "title": row[1],
-            "writer": row[2],
-            "write_date": row[3],
-            "category": row[4],
-            "content": row[5],
-            "url": row[6],
-            "keywords": row[7],
-        }
-        
-        # Elasticsearch에 저장
-        es.index(index="news", document=doc)
-        print(f"문서 저장 완료: {doc['title']}")
-        
-    except Exception as e:
-        print(f"문서 저장 중 오류 발생: {e}")
+# 대량 색인 동안에는 refresh를 끄고, 끝나면(오류가 나도) 원래 값으로 되돌림
+sink = ElasticsearchBulkSink(client=es, index="news")
+count = 0
+try:
+    with sink.bulk_mode():
+        for row in cursor:
+            sink.add(to_document(row), doc_id=row[0])
+            count += 1
+finally:
+    sink.close()
+
+print(f"문서 {count}건 색인 요청 완료")
 
 # 연결 종료
 cursor.close()
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from news.profiles import rebuild_profiles
+
+
+class Command(BaseCommand):
+    help = '좋아요/조회 기록으로 사용자 추천 프로필(임베딩 가중합)을 다시 계산합니다.'
+
+    def handle(self, *args, **options):
+        count = rebuild_profiles()
+        self.stdout.write(self.style.SUCCESS(f"사용자 {count}명의 프로필을 다시 계산했습니다."))
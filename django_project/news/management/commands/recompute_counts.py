@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from news.counters import recompute_counts
+from news.models import Article
+
+
+class Command(BaseCommand):
+    help = '좋아요/댓글 기록으로 기사별 like_count, comment_count를 다시 계산합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000, help='한 트랜잭션에서 처리할 기사 수')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        last_id, fixed = 0, 0
+
+        # id 구간별로 나눠서 갱신 (테이블 전체를 오래 잠그지 않도록)
+        while True:
+            ids = list(Article.objects.filter(id__gt=last_id).order_by('id').values_list('id', flat=True)[:batch_size])
+            if not ids:
+                break
+            with transaction.atomic():
+                fixed += recompute_counts(Article.objects.filter(id__gte=ids[0], id__lte=ids[-1]))
+            last_id = ids[-1]
+
+        self.stdout.write(self.style.SUCCESS(f"카운터가 달랐던 기사 {fixed}건을 다시 계산했습니다."))
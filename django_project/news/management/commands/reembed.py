@@ -0,0 +1,73 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from news.embeddings import (
+    EMBEDDING_MODEL,
+    Checkpoint,
+    CheckpointMismatch,
+    FakeEmbeddingBackend,
+    OpenAIEmbeddingBackend,
+    reembed,
+)
+from news.models import EMBEDDING_DIMENSIONS, Article
+
+
+class Command(BaseCommand):
+    help = '기사 임베딩을 배치 API 요청으로 다시 계산합니다. 중단되면 체크포인트부터 이어서 처리합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--model', default=EMBEDDING_MODEL, help='임베딩 모델')
+        parser.add_argument('--dimensions', type=int, default=None, help='요청할 임베딩 차원 (embedding 컬럼 차원과 같아야 함)')
+        parser.add_argument('--batch-size', type=int, default=100, help='API 요청 하나에 넣을 기사 수')
+        parser.add_argument('--concurrency', type=int, default=4, help='동시에 보낼 API 요청 수')
+        parser.add_argument('--missing-only', action='store_true', help='임베딩이 없는 기사만 처리')
+        parser.add_argument('--limit', type=int, default=None, help='이번 실행에서 처리할 최대 기사 수')
+        parser.add_argument('--checkpoint', default=None, help='체크포인트 파일 (기본: BASE_DIR/reembed_checkpoint.json)')
+        parser.add_argument('--restart', action='store_true', help='체크포인트를 지우고 처음부터 처리')
+        parser.add_argument('--backend', choices=['openai', 'fake'], default='openai', help='fake: 오프라인 테스트용 가짜 임베딩')
+        parser.add_argument('--fake-latency', type=float, default=0.0, help='fake 백엔드 요청 지연 (초)')
+
+    def handle(self, *args, **options):
+        dimensions = options['dimensions'] or EMBEDDING_DIMENSIONS
+        if dimensions != EMBEDDING_DIMENSIONS:
+            raise CommandError(
+                f"embedding 컬럼은 {EMBEDDING_DIMENSIONS}차원입니다. "
+                "차원을 바꾸려면 먼저 EMBEDDING_DIMENSIONS와 마이그레이션(컬럼, HNSW 인덱스)을 바꿔야 합니다."
+            )
+
+        if options['backend'] == 'fake':
+            backend = FakeEmbeddingBackend(options['model'], dimensions, latency=options['fake_latency'])
+        else:
+            backend = OpenAIEmbeddingBackend(options['model'], options['dimensions'])
+
+        path = options['checkpoint'] or str(settings.BASE_DIR / 'reembed_checkpoint.json')
+        checkpoint = Checkpoint(path, backend.model, dimensions)
+        if options['restart']:
+            checkpoint.clear()
+
+        articles = Article.objects.all()
+        if options['missing_only']:
+            articles = articles.filter(embedding=None)
+
+        def progress(done, last_id):
+            self.stdout.write(f"{done}건 처리 (마지막 id {last_id})")
+
+        try:
+            done = reembed(
+                backend,
+                checkpoint,
+                articles,
+                batch_size=options['batch_size'],
+                concurrency=options['concurrency'],
+                limit=options['limit'],
+                progress=progress,
+            )
+        except CheckpointMismatch as e:
+            raise CommandError(f"{e} --restart로 처음부터 처리하거나 --checkpoint로 다른 파일을 지정하세요.")
+
+        self.stdout.write(self.style.SUCCESS(f"기사 {done}건의 임베딩을 다시 계산했습니다."))
+        if done:
+            self.stdout.write(
+                "관련 기사, 추천 프로필, 임베딩 색인도 다시 만드세요: "
+                "manage.py build_related, manage.py rebuild_profiles, manage.py sync_vector_index --rebuild"
+            )
@@ -0,0 +1,60 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+
+from news.models import Article
+from news.vector_index import get_vector_index
+
+# 늦게 커밋된 기사(더 작은 id)를 놓치지 않도록 마지막 id에서 이만큼 앞부터 다시 확인
+SYNC_LOOKBACK = 1000
+
+
+def article_batches(articles, batch_size):
+    last_id = 0
+    while True:
+        rows = list(articles.filter(id__gt=last_id).order_by('id').values_list('id', 'embedding')[:batch_size])
+        if not rows:
+            return
+        yield [article_id for article_id, _ in rows], [embedding for _, embedding in rows]
+        last_id = rows[-1][0]
+
+
+class Command(BaseCommand):
+    help = '기사 임베딩을 memory-mapped 색인(VECTOR_INDEX_DIR)에 반영합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rebuild', action='store_true', help='색인 전체를 새로 만듦 (임베딩 변경, 기사 삭제 반영)')
+        parser.add_argument('--batch-size', type=int, default=5000, help='한 번에 읽을 기사 수')
+        parser.add_argument('--interval', type=float, default=5.0, help='새 기사 확인 주기 (초)')
+        parser.add_argument('--once', action='store_true', help='한 번만 반영하고 종료')
+
+    def handle(self, *args, **options):
+        index = get_vector_index()
+        if index is None:
+            raise CommandError('VECTOR_INDEX_DIR이 설정되어 있지 않습니다.')
+
+        articles = Article.objects.exclude(embedding=None)
+        if options['rebuild']:
+            count = index.rebuild(article_batches(articles, options['batch_size']))
+            self.stdout.write(self.style.SUCCESS(f"기사 {count}건으로 색인을 새로 만들었습니다."))
+            return
+
+        while True:
+            try:
+                since = max(index.last_id() - SYNC_LOOKBACK, 0)
+                known = index.ids_after(since)
+                added = 0
+                for ids, embeddings in article_batches(articles.filter(id__gt=since), options['batch_size']):
+                    new = [i for i, article_id in enumerate(ids) if article_id not in known]
+                    added += index.append([ids[i] for i in new], [embeddings[i] for i in new])
+                if added:
+                    self.stdout.write(f"새 기사 {added}건 반영 (전체 {len(index)}건)")
+            except Exception as e:
+                self.stderr.write(f"색인 반영 중 오류 발생: {e}")
+            finally:
+                close_old_connections()
+
+            if options['once']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,27 @@
+# Generated by Django 5.1.2 on 2025-06-02 10:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("news", "0007_alter_commenthistory_commented_at"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="article",
+            index=models.Index(fields=["write_date", "id"], name="article_write_date_id_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="article",
+            index=models.Index(fields=["views", "id"], name="article_views_id_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="article",
+            index=models.Index(
+                fields=["category", "write_date", "id"], name="article_category_date_id_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.1.2 on 2025-06-02 14:37
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+# 기존 좋아요, 댓글 기록으로 카운터 채우기
+def fill_counts(apps, schema_editor):
+    Article = apps.get_model("news", "Article")
+    LikeHistory = apps.get_model("news", "LikeHistory")
+    CommentHistory = apps.get_model("news", "CommentHistory")
+
+    def count_of(model):
+        counts = model.objects.filter(article=OuterRef("pk")).order_by().values("article")
+        return Coalesce(Subquery(counts.annotate(n=Count("id")).values("n")), 0)
+
+    Article.objects.update(like_count=count_of(LikeHistory), comment_count=count_of(CommentHistory))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("news", "0008_article_keyset_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="article",
+            name="comment_count",
+            field=models.IntegerField(db_default=0, default=0),
+        ),
+        migrations.AddField(
+            model_name="article",
+            name="like_count",
+            field=models.IntegerField(db_default=0, default=0),
+        ),
+        migrations.RunPython(fill_counts, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="article",
+            index=models.Index(fields=["like_count", "id"], name="article_like_count_id_idx"),
+        ),
+    ]
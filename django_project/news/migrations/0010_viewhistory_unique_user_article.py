@@ -0,0 +1,36 @@
+# Generated by Django 5.1.2 on 2025-06-03 11:05
+
+from django.db import migrations, models
+from django.db.models import Count, Max
+
+
+# (사용자, 기사)마다 가장 최근 조회 기록 하나만 남기기
+def remove_duplicate_views(apps, schema_editor):
+    ViewHistory = apps.get_model("news", "ViewHistory")
+
+    duplicates = (
+        ViewHistory.objects.values("user_id", "article_id")
+        .annotate(n=Count("id"), latest=Max("viewed_at"))
+        .filter(n__gt=1)
+    )
+    for row in duplicates:
+        rows = ViewHistory.objects.filter(user_id=row["user_id"], article_id=row["article_id"])
+        keep = rows.filter(viewed_at=row["latest"]).order_by("-id").values_list("id", flat=True).first()
+        rows.exclude(id=keep).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("news", "0009_article_like_comment_counts"),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_views, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="viewhistory",
+            constraint=models.UniqueConstraint(
+                fields=("user", "article"), name="viewhistory_user_article_uniq"
+            ),
+        ),
+    ]
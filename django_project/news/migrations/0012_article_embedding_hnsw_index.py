@@ -0,0 +1,27 @@
+# Generated by Django 5.1.2 on 2025-06-04 16:24
+
+import pgvector.django.indexes
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    # 인덱스를 만드는 동안 consumer의 INSERT를 막지 않도록 CONCURRENTLY로 생성
+    atomic = False
+
+    dependencies = [
+        ("news", "0011_relatedarticle"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="article",
+            index=pgvector.django.indexes.HnswIndex(
+                ef_construction=64,
+                fields=["embedding"],
+                m=16,
+                name="article_embedding_hnsw_idx",
+                opclasses=["vector_cosine_ops"],
+            ),
+        ),
+    ]
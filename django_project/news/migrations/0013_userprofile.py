@@ -0,0 +1,55 @@
+# Generated by Django 5.1.2 on 2025-06-05 11:08
+
+import django.db.models.deletion
+import pgvector.django.vector
+from django.conf import settings
+from django.db import migrations, models
+
+# 기존 좋아요(가중치 3), 조회(가중치 1) 기록으로 프로필 채우기
+# 가중치만큼 행을 복제해서 sum(vector)으로 가중합을 구한다
+FILL_PROFILES_SQL = """
+    INSERT INTO news_userprofile (user_id, embedding_sum, total_weight)
+    SELECT user_id, sum(embedding), count(*)
+    FROM (
+        SELECT l.user_id, a.embedding
+        FROM news_likehistory l
+        JOIN news_article a ON a.id = l.article_id
+        CROSS JOIN generate_series(1, 3)
+        WHERE a.embedding IS NOT NULL
+        UNION ALL
+        SELECT v.user_id, a.embedding
+        FROM news_viewhistory v
+        JOIN news_article a ON a.id = v.article_id
+        WHERE a.embedding IS NOT NULL
+    ) weighted
+    GROUP BY user_id
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("news", "0012_article_embedding_hnsw_index"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="UserProfile",
+            fields=[
+                (
+                    "user",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="news_profile",
+                        serialize=False,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                ("embedding_sum", pgvector.django.vector.VectorField(dimensions=1536)),
+                ("total_weight", models.FloatField(default=0)),
+            ],
+        ),
+        migrations.RunSQL(FILL_PROFILES_SQL, migrations.RunSQL.noop),
+    ]
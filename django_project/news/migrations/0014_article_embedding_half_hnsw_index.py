@@ -0,0 +1,38 @@
+# Generated by Django 5.1.2 on 2025-06-06 10:12
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.comparison
+import pgvector.django.halfvec
+import pgvector.django.indexes
+from django.contrib.postgres.operations import AddIndexConcurrently, RemoveIndexConcurrently
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    # 새 인덱스를 먼저 만들고 기존 인덱스를 지워서 검색이 인덱스 없이 도는 구간이 없게 한다
+    atomic = False
+
+    dependencies = [
+        ("news", "0013_userprofile"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="article",
+            index=pgvector.django.indexes.HnswIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.comparison.Cast(
+                        "embedding", pgvector.django.halfvec.HalfVectorField(dimensions=1536)
+                    ),
+                    name="halfvec_cosine_ops",
+                ),
+                ef_construction=64,
+                m=16,
+                name="article_embedding_half_hnsw_idx",
+            ),
+        ),
+        RemoveIndexConcurrently(
+            model_name="article",
+            name="article_embedding_hnsw_idx",
+        ),
+    ]
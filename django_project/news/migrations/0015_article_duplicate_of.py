@@ -0,0 +1,18 @@
+# Generated by Django 5.1.2 on 2025-06-07 09:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("news", "0014_article_embedding_half_hnsw_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="article",
+            name="duplicate_of",
+            field=models.CharField(blank=True, max_length=200, null=True),
+        ),
+    ]
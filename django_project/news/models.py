@@ -1,7 +1,12 @@
 from django.db import models
-from pgvector.django import VectorField
+from django.db.models.functions import Cast
+from django.contrib.postgres.indexes import OpClass
+from pgvector.django import HalfVectorField, HnswIndex, VectorField
 from django.contrib.auth.models import User
 
+# OpenAI text-embedding-3-small 임베딩 차원 (consumer의 openai_api.EMBEDDING_DIMENSIONS와 같아야 함)
+EMBEDDING_DIMENSIONS = 1536
+
 # Create your models here.
 class Article(models.Model):
     title = models.CharField(max_length=200)
@@ -11,8 +16,55 @@ class Article(models.Model):
     content = models.TextField()
     url = models.CharField(max_length=200, unique=True)
     keywords = models.JSONField(default=list)
-    embedding = VectorField(dimensions=1536)
+    embedding = VectorField(dimensions=EMBEDDING_DIMENSIONS)
     views = models.IntegerField(default=0)
+    # 좋아요, 댓글 수 (LikeHistory, CommentHistory가 바뀔 때 signals에서 같은 트랜잭션으로 갱신)
+    # consumer가 SQL로 직접 INSERT하므로 DB 기본값도 둔다
+    like_count = models.IntegerField(default=0, db_default=0)
+    comment_count = models.IntegerField(default=0, db_default=0)
+    # 본문이 거의 같은 기존 기사(원본)의 url (consumer의 유사 기사 검출, 원본이면 NULL)
+    duplicate_of = models.CharField(max_length=200, null=True, blank=True)
+
+    class Meta:
+        # 기사 목록 keyset 페이지네이션용 (정렬 값, id) 인덱스
+        indexes = [
+            models.Index(fields=['write_date', 'id'], name='article_write_date_id_idx'),
+            models.Index(fields=['views', 'id'], name='article_views_id_idx'),
+            models.Index(fields=['like_count', 'id'], name='article_like_count_id_idx'),
+            models.Index(fields=['category', 'write_date', 'id'], name='article_category_date_id_idx'),
+            # 코사인 거리 근사 최근접 이웃 검색용 (검색 정확도는 settings.PGVECTOR_EF_SEARCH)
+            # 임베딩을 halfvec으로 바꾼 식에 만들어 인덱스 크기를 절반으로 줄이고,
+            # 찾은 후보는 float32 embedding으로 다시 정렬한다 (news.related.nearest_articles)
+            HnswIndex(
+                OpClass(Cast('embedding', HalfVectorField(dimensions=EMBEDDING_DIMENSIONS)), name='halfvec_cosine_ops'),
+                name='article_embedding_half_hnsw_idx',
+                m=16,
+                ef_construction=64,
+            ),
+        ]
+
+
+# 기사별로 미리 계산해 둔 관련 기사 top-K (consumer가 새 기사를 저장할 때 갱신)
+class RelatedArticle(models.Model):
+    article = models.ForeignKey(Article, on_delete=models.CASCADE, related_name='related_articles')
+    related = models.ForeignKey(Article, on_delete=models.CASCADE, related_name='+')
+    distance = models.FloatField()  # 코사인 거리
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['article', 'related'], name='related_article_pair_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['article', 'distance'], name='related_article_distance_idx'),
+        ]
+
+
+# 사용자 추천용 프로필 임베딩: 좋아요/조회한 기사 임베딩의 가중합과 가중치 합
+# 기록이 바뀔 때마다 news.profiles에서 더하고 빼서 O(1)로 갱신한다
+class UserProfile(models.Model):
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='news_profile')
+    embedding_sum = VectorField(dimensions=EMBEDDING_DIMENSIONS)
+    total_weight = models.FloatField(default=0)
 
 
 class LikeHistory(models.Model):
@@ -29,6 +81,12 @@ class ViewHistory(models.Model):
     article = models.ForeignKey(Article, on_delete=models.CASCADE)
     viewed_at = models.DateTimeField()
 
+    class Meta:
+        # 조회 기록은 (사용자, 기사)마다 하나 (버퍼 flush에서 bulk upsert)
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'article'], name='viewhistory_user_article_uniq'),
+        ]
+
 
 class Highlight(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
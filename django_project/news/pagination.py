@@ -0,0 +1,115 @@
+import base64
+import json
+from datetime import datetime
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+
+# 한 페이지 기본 기사 수와 최대 기사 수
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+# 정렬 옵션별 keyset (내림차순, 마지막은 항상 id로 순서를 확정)
+SORT_KEYS = {
+    'latest': ('write_date', 'id'),
+    'views': ('views', 'id'),
+    'likes': ('like_count', 'id'),
+}
+
+
+# 커서 정수 값의 허용 범위 (PostgreSQL bigint)
+MIN_BIGINT, MAX_BIGINT = -(2 ** 63), 2 ** 63 - 1
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+def sort_key(sort_by):
+    """정렬 파라미터를 keyset으로 변환 (기존 '-write_date' 등 알 수 없는 값은 최신순)"""
+    return SORT_KEYS.get(sort_by, SORT_KEYS['latest'])
+
+
+def page_size_from(request):
+    try:
+        size = int(request.GET.get('page_size', DEFAULT_PAGE_SIZE))
+    except ValueError:
+        size = DEFAULT_PAGE_SIZE
+    return max(1, min(size, MAX_PAGE_SIZE))
+
+
+# 커서에는 기준 기사의 정렬 값과 방향만 담고, 클라이언트에는 불투명한 문자열로 전달
+def encode_cursor(values, direction):
+    values = [value.isoformat() if isinstance(value, datetime) else value for value in values]
+    raw = json.dumps({'v': values, 'd': direction}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, fields):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        data = json.loads(raw)
+        values, direction = data['v'], data['d']
+    except (ValueError, TypeError, KeyError):
+        raise InvalidCursor(cursor)
+    if direction not in ('next', 'prev') or not isinstance(values, list) or len(values) != len(fields):
+        raise InvalidCursor(cursor)
+
+    if fields[0] == 'write_date':
+        values[0] = parse_datetime(values[0]) if isinstance(values[0], str) else None
+        if values[0] is None:
+            raise InvalidCursor(cursor)
+    # 나머지 정렬 값(views, like_count, id)은 bigint 범위의 정수여야 한다 (bool은 int의 하위 클래스라 따로 거름)
+    for value in values[1:] if fields[0] == 'write_date' else values:
+        if not isinstance(value, int) or isinstance(value, bool) or not MIN_BIGINT <= value <= MAX_BIGINT:
+            raise InvalidCursor(cursor)
+    return values, direction
+
+
+def _after(fields, values, descending):
+    """
+    (k, id) 튜플 비교 조건: 내림차순이면 (k, id) < (k0, id0)
+    k <= k0를 함께 걸어서 (k, id) 인덱스 범위 스캔을 쓸 수 있게 한다.
+    """
+    (key, id_field), (value, last_id) = fields, values
+    op = 'lt' if descending else 'gt'
+    op_eq = 'lte' if descending else 'gte'
+    return Q(**{f'{key}__{op_eq}': value}) & (
+        Q(**{f'{key}__{op}': value}) | Q(**{f'{id_field}__{op}': last_id})
+    )
+
+
+def paginate_keyset(request, queryset, fields):
+    """
+    keyset(cursor) 페이지네이션
+    정렬 값 기준으로 다음/이전 페이지를 WHERE 조건으로 찾으므로 OFFSET과 달리 깊이와 상관없이 비용이 같다.
+    (results, next 커서, previous 커서)를 돌려주고, 잘못된 커서면 InvalidCursor를 던진다.
+    """
+    size = page_size_from(request)
+    cursor = request.GET.get('cursor')
+    direction = 'next'
+
+    if cursor:
+        values, direction = decode_cursor(cursor, fields)
+        queryset = queryset.filter(_after(fields, values, descending=direction == 'next'))
+
+    # 이전 페이지는 반대 방향으로 읽어서 뒤집는다
+    ordering = [f'-{field}' for field in fields] if direction == 'next' else list(fields)
+    rows = list(queryset.order_by(*ordering)[:size + 1])
+    has_more = len(rows) > size
+    rows = rows[:size]
+    if direction == 'prev':
+        rows.reverse()
+
+    def cursor_for(article, to):
+        return encode_cursor([getattr(article, field) for field in fields], to)
+
+    next_cursor = previous_cursor = None
+    if rows:
+        # 다음 방향: 'next'로 읽었으면 더 있을 때만, 'prev'로 왔으면 원래 있던 페이지가 뒤에 있음
+        if has_more if direction == 'next' else True:
+            next_cursor = cursor_for(rows[-1], 'next')
+        if (cursor is not None) if direction == 'next' else has_more:
+            previous_cursor = cursor_for(rows[0], 'prev')
+    return rows, next_cursor, previous_cursor
@@ -0,0 +1,136 @@
+import json
+
+import numpy as np
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Article, LikeHistory, UserProfile, ViewHistory
+
+
+# 추천 프로필에서 좋아요, 조회 한 건의 가중치
+LIKE_WEIGHT = 3
+VIEW_WEIGHT = 1
+
+# 프로필이 없으면 만들고, 있으면 가중합과 가중치 합에 더한다
+ADD_PROFILE_SQL = """
+    INSERT INTO news_userprofile (user_id, embedding_sum, total_weight)
+    VALUES (%s, %s::vector, %s)
+    ON CONFLICT (user_id) DO UPDATE SET
+        embedding_sum = news_userprofile.embedding_sum + EXCLUDED.embedding_sum,
+        total_weight = news_userprofile.total_weight + EXCLUDED.total_weight
+"""
+
+# 빼는 쪽은 프로필이 있을 때만 (사용자 삭제로 cascade되는 기록이 프로필을 다시 만들지 않도록)
+SUBTRACT_PROFILE_SQL = """
+    UPDATE news_userprofile
+    SET embedding_sum = embedding_sum - %s::vector, total_weight = total_weight - %s
+    WHERE user_id = %s
+"""
+
+# 좋아요, 조회 기록으로 프로필 전체를 다시 계산 (가중치만큼 행을 복제해서 sum(vector)으로 가중합)
+REBUILD_PROFILES_SQL = """
+    INSERT INTO news_userprofile (user_id, embedding_sum, total_weight)
+    SELECT user_id, sum(embedding), count(*)
+    FROM (
+        SELECT l.user_id, a.embedding
+        FROM news_likehistory l
+        JOIN news_article a ON a.id = l.article_id
+        CROSS JOIN generate_series(1, %s)
+        WHERE a.embedding IS NOT NULL
+        UNION ALL
+        SELECT v.user_id, a.embedding
+        FROM news_viewhistory v
+        JOIN news_article a ON a.id = v.article_id
+        CROSS JOIN generate_series(1, %s)
+        WHERE a.embedding IS NOT NULL
+    ) weighted
+    GROUP BY user_id
+"""
+
+
+def update_profiles(deltas):
+    """
+    사용자별 (가중 임베딩 합, 가중치 합) 변화량을 프로필에 반영
+    기록 한 건마다 벡터 덧셈 한 번이므로 기록이 아무리 많아도 비용이 같다.
+    그새 탈퇴한 사용자의 프로필은 만들지 않는다 (FK 오류로 트랜잭션 전체가 실패하지 않도록).
+    """
+    users = set(
+        User.objects.filter(id__in=[user_id for user_id, (_, weight) in deltas.items() if weight > 0])
+        .values_list('id', flat=True)
+    )
+    added, subtracted = [], []
+    for user_id, (vector, weight) in deltas.items():
+        if weight > 0 and user_id in users:
+            added.append((user_id, json.dumps(vector.tolist()), weight))
+        elif weight < 0:
+            subtracted.append((json.dumps((-vector).tolist()), -weight, user_id))
+
+    with connection.cursor() as cursor:
+        if added:
+            cursor.executemany(ADD_PROFILE_SQL, added)
+        if subtracted:
+            cursor.executemany(SUBTRACT_PROFILE_SQL, subtracted)
+
+
+def weighted_embeddings(pairs, weight):
+    """(user_id, article_id) 목록을 사용자별 (임베딩 합 * weight, 건수 * weight)로 묶는다."""
+    embeddings = dict(
+        Article.objects.filter(id__in={article_id for _, article_id in pairs})
+        .exclude(embedding=None)
+        .values_list('id', 'embedding')
+    )
+    deltas = {}
+    for user_id, article_id in pairs:
+        if article_id not in embeddings:
+            continue
+        vector, total = deltas.get(user_id, (0, 0))
+        deltas[user_id] = (vector + np.asarray(embeddings[article_id], dtype=np.float32) * weight, total + weight)
+    return deltas
+
+
+def profile_vector(user_id):
+    """추천에 쓸 프로필 벡터 (좋아요/조회 기록이 없으면 None)"""
+    profile = UserProfile.objects.filter(user_id=user_id).first()
+    if profile is None or profile.total_weight <= 0 or not np.any(profile.embedding_sum):
+        return None
+    # 코사인 거리는 크기와 무관하므로 가중 평균 대신 가중합을 그대로 쓴다
+    return profile.embedding_sum
+
+
+def rebuild_profiles():
+    """기록으로 모든 프로필을 다시 계산 (기록이 signals를 거치지 않고 바뀐 경우). 프로필 수를 돌려준다."""
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute('DELETE FROM news_userprofile')
+        cursor.execute(REBUILD_PROFILES_SQL, [LIKE_WEIGHT, VIEW_WEIGHT])
+        return cursor.rowcount
+
+
+@receiver(post_save, sender=LikeHistory)
+def like_added_to_profile(sender, instance, created, **kwargs):
+    if created:
+        update_profiles(weighted_embeddings([(instance.user_id, instance.article_id)], LIKE_WEIGHT))
+
+
+@receiver(post_delete, sender=LikeHistory)
+def like_removed_from_profile(sender, instance, **kwargs):
+    update_profiles(weighted_embeddings([(instance.user_id, instance.article_id)], -LIKE_WEIGHT))
+
+
+# 조회 기록은 view_buffer.flush_views에서 bulk로 만들어지므로 새로 생긴 기록만 그쪽에서 더하고,
+# 기사 삭제 등으로 지워지는 기록만 여기서 뺀다
+@receiver(post_delete, sender=ViewHistory)
+def view_removed_from_profile(sender, instance, **kwargs):
+    update_profiles(weighted_embeddings([(instance.user_id, instance.article_id)], -VIEW_WEIGHT))
+
+
+def add_new_views(pairs):
+    """
+    flush에서 새로 만들어진 조회 기록 (user, article)을 프로필에 더한다.
+    (이미 본 기사를 다시 보면 viewed_at만 갱신되므로 가중치도 그대로)
+    새 기록은 view_buffer.flush_views가 INSERT ... ON CONFLICT DO NOTHING RETURNING으로 고르므로,
+    여러 워커(LocalViewBuffer)가 같은 기록을 동시에 flush해도 한 번만 더해진다.
+    """
+    if pairs:
+        update_profiles(weighted_embeddings(list(pairs), VIEW_WEIGHT))
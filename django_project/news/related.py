@@ -0,0 +1,112 @@
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models.functions import Cast
+from pgvector.django import CosineDistance, HalfVector, HalfVectorField
+
+from .models import EMBEDDING_DIMENSIONS, Article, RelatedArticle
+from .vector_index import get_vector_index
+
+# pgvector가 허용하는 hnsw.ef_search 최댓값
+MAX_EF_SEARCH = 1000
+# halfvec 인덱스에서 limit의 몇 배만큼 후보를 찾아 float32로 다시 정렬할지
+RERANK_FACTOR = 4
+
+
+def set_ef_search(ef_search=None):
+    """현재 트랜잭션의 HNSW 검색 후보 수 설정 (transaction.atomic 안에서 호출)"""
+    if connection.vendor != 'postgresql':
+        return
+    ef_search = ef_search or getattr(settings, 'PGVECTOR_EF_SEARCH', 40)
+    with connection.cursor() as cursor:
+        cursor.execute('SET LOCAL hnsw.ef_search = %s', [ef_search])
+
+
+def nearest_articles(embedding, limit, exclude_ids=(), queryset=None):
+    """
+    임베딩과 코사인 거리가 가까운 기사 limit개
+    halfvec HNSW 인덱스로 후보 limit * RERANK_FACTOR개를 찾고, 후보만 float32 embedding으로 거리를 다시 재서 정렬한다.
+    후보 쿼리는 ORDER BY embedding::halfvec <=> %s LIMIT n 형태여야 인덱스를 타므로 거리 외의 정렬은 붙이지 않는다.
+    제외할 기사는 인덱스 검색 후에 걸러지므로 그만큼 검색 후보(ef_search)를 늘린다.
+    VECTOR_INDEX_DIR이 설정되어 있으면 DB 대신 memory-mapped 색인에서 찾는다.
+    """
+    index = get_vector_index()
+    if index is not None and queryset is None:
+        try:
+            if len(index):
+                return _nearest_from_index(index, embedding, limit, exclude_ids)
+        except (OSError, ValueError) as e:
+            # 색인 파일이 교체되는 중이거나 손상된 경우에는 pgvector로 검색
+            print(f"임베딩 색인 검색 중 오류 발생: {e}")
+
+    queryset = Article.objects.all() if queryset is None else queryset
+    candidate_limit = limit * RERANK_FACTOR
+    candidates = queryset.exclude(id__in=exclude_ids)\
+        .exclude(embedding=None)\
+        .annotate(half_distance=CosineDistance(half_embedding(), HalfVector(embedding)))\
+        .order_by('half_distance')\
+        .values('id')[:candidate_limit]
+
+    ef_search = getattr(settings, 'PGVECTOR_EF_SEARCH', 40)
+    with transaction.atomic():
+        set_ef_search(min(max(ef_search, candidate_limit + len(exclude_ids)), MAX_EF_SEARCH))
+        return list(
+            Article.objects.filter(id__in=candidates)
+            .defer('embedding')
+            .annotate(similarity=CosineDistance('embedding', embedding))
+            .order_by('similarity')[:limit]
+        )
+
+
+# 인덱스(article_embedding_half_hnsw_idx)와 같은 식이어야 인덱스를 탄다
+def half_embedding():
+    return Cast('embedding', HalfVectorField(dimensions=EMBEDDING_DIMENSIONS))
+
+
+# memory-mapped 색인에서 찾은 id로 기사를 읽는다 (그새 삭제된 기사는 빠짐)
+def _nearest_from_index(index, embedding, limit, exclude_ids):
+    found = index.search(embedding, limit, exclude_ids)
+    articles = Article.objects.defer('embedding').in_bulk([article_id for article_id, _ in found])
+    nearest = []
+    for article_id, distance in found:
+        article = articles.get(article_id)
+        if article is not None:
+            article.similarity = distance
+            nearest.append(article)
+    return nearest
+
+
+def related_articles_for(article, limit=5):
+    """
+    미리 계산해 둔 관련 기사(news_relatedarticle)를 거리순으로 돌려준다.
+    아직 계산되지 않은 기사(consumer 반영 전, backfill 전)는 HNSW 검색으로 바로 찾는다.
+    """
+    rows = list(
+        RelatedArticle.objects.filter(article=article)
+        .select_related('related')
+        .defer('related__embedding')
+        .order_by('distance')[:limit]
+    )
+    if rows:
+        return [row.related for row in rows]
+    if article.embedding is None:
+        return []
+    return nearest_articles(article.embedding, limit, exclude_ids=[article.id])
+
+
+def build_related(articles, top_k=None):
+    """
+    기사들의 관련 기사 목록을 새로 계산해서 저장 (manage.py build_related)
+    기존 목록은 지우고 이웃 top_k개로 바꾼다. 저장한 행 수를 돌려준다.
+    """
+    top_k = top_k or getattr(settings, 'RELATED_ARTICLES_TOP_K', 10)
+    rows = []
+    for article in articles:
+        if article.embedding is None:
+            continue
+        for neighbour in nearest_articles(article.embedding, top_k, exclude_ids=[article.id]):
+            rows.append(RelatedArticle(article_id=article.id, related_id=neighbour.id, distance=neighbour.similarity))
+
+    with transaction.atomic():
+        RelatedArticle.objects.filter(article__in=[article.id for article in articles]).delete()
+        RelatedArticle.objects.bulk_create(rows)
+    return len(rows)
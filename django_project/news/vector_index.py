@@ -0,0 +1,229 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import numpy as np
+from django.conf import settings
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+
+# 한 번의 행렬-벡터 곱에서 다룰 최대 행 수 (임시 배열 크기 제한)
+SEARCH_CHUNK_ROWS = 65536
+# 다른 프로세스가 추가한 행을 확인하는 주기 (초)
+REFRESH_INTERVAL = 1.0
+
+
+class MmapVectorIndex:
+    """
+    기사 임베딩을 float32 memory-mapped 행렬(+ id 배열)로 두고 코사인 거리 top-K를 계산하는 색인
+
+    디렉터리 구성
+        meta.json                 {'generation': g, 'count': n, 'dimensions': d}
+        embeddings-{g}.f32        정규화한 임베딩 n x d (행마다 L2 norm 1, 내적 = 코사인 유사도)
+        ids-{g}.i64               행 순서대로의 기사 id
+
+    읽기는 파일을 mode='r'로 mmap만 하므로 워커가 새로 떠도 행렬을 복사하지 않고,
+    같은 서버의 gunicorn 워커들은 OS 페이지 캐시를 함께 쓴다.
+    쓰기(append, rebuild)는 write.lock 파일에 fcntl lock을 잡고 하므로 sync 루프와 --rebuild가 겹쳐도
+    차례로 반영되고, 데이터를 먼저 쓴 뒤 meta.json을 os.replace로 바꾸므로 읽는 쪽은 완성된 행만 본다.
+    rebuild는 바로 이전 세대 파일을 다음 rebuild까지 남겨 두므로, 이전 meta.json을 읽은 워커도 파일을 열 수 있다.
+    """
+
+    def __init__(self, path, dimensions=1536, refresh_interval=REFRESH_INTERVAL):
+        self.path = path
+        self.dimensions = dimensions
+        self.refresh_interval = refresh_interval
+
+        self._lock = threading.Lock()
+        self._write_thread_lock = threading.Lock()
+        self._checked_at = 0.0
+        # (generation, count, 임베딩 행렬, id 배열)을 한 번에 바꿔서 검색 중인 스레드와 충돌하지 않게 한다
+        self._view = (None, 0, None, None)
+
+    def _file(self, kind, generation):
+        suffix = 'f32' if kind == 'embeddings' else 'i64'
+        return os.path.join(self.path, f'{kind}-{generation}.{suffix}')
+
+    def _read_meta(self):
+        try:
+            with open(os.path.join(self.path, 'meta.json'), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {'generation': 0, 'count': 0, 'dimensions': self.dimensions}
+
+    @contextmanager
+    def _write_lock(self):
+        """프로세스 사이(fcntl), 스레드 사이(threading.Lock) 쓰기 lock"""
+        os.makedirs(self.path, exist_ok=True)
+        with self._write_thread_lock, open(os.path.join(self.path, 'write.lock'), 'a') as f:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            yield
+
+    def _write_meta(self, generation, count):
+        tmp = os.path.join(self.path, 'meta.json.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({'generation': generation, 'count': count, 'dimensions': self.dimensions}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, os.path.join(self.path, 'meta.json'))
+
+    def _refresh(self, force=False):
+        now = time.monotonic()
+        if not force and now - self._checked_at < self.refresh_interval:
+            return self._view
+        with self._lock:
+            self._checked_at = now
+            meta = self._read_meta()
+            generation, count = meta['generation'], meta['count']
+            if (generation, count) != self._view[:2]:
+                if count == 0:
+                    self._view = (generation, 0, None, None)
+                else:
+                    # 파일이 계속 자라는 중이어도 meta의 행 수만큼만 매핑한다
+                    matrix = np.memmap(
+                        self._file('embeddings', generation), dtype=np.float32, mode='r', shape=(count, self.dimensions)
+                    )
+                    ids = np.memmap(self._file('ids', generation), dtype=np.int64, mode='r', shape=(count,))
+                    self._view = (generation, count, matrix, ids)
+            return self._view
+
+    def __len__(self):
+        return self._refresh()[1]
+
+    def ids_after(self, min_id):
+        """색인에 들어 있는 id 중 min_id보다 큰 것 (sync에서 늦게 커밋된 기사를 찾을 때 사용)"""
+        _, count, _, ids = self._refresh(force=True)
+        if not count:
+            return set()
+        return set(ids[ids > min_id].tolist())
+
+    def last_id(self):
+        _, count, _, ids = self._refresh(force=True)
+        return int(ids.max()) if count else 0
+
+    def search(self, embedding, k, exclude_ids=()):
+        """
+        코사인 거리가 가까운 기사 k개의 [(id, 거리)]
+        청크마다 행렬-벡터 곱으로 유사도를 구하고 argpartition으로 후보 k개만 남긴 뒤 합쳐서 정렬한다.
+        """
+        _, count, matrix, ids = self._refresh()
+        if not count or k <= 0:
+            return []
+
+        query = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if not norm:
+            return []
+        query = query / norm
+        exclude = np.fromiter(exclude_ids, dtype=np.int64) if exclude_ids else None
+
+        best_ids, best_scores = [], []
+        for start in range(0, count, SEARCH_CHUNK_ROWS):
+            chunk_ids = ids[start : start + SEARCH_CHUNK_ROWS]
+            scores = matrix[start : start + SEARCH_CHUNK_ROWS] @ query
+            if exclude is not None:
+                scores[np.isin(chunk_ids, exclude)] = -np.inf
+            if len(scores) > k:
+                top = np.argpartition(scores, -k)[-k:]
+                chunk_ids, scores = chunk_ids[top], scores[top]
+            best_ids.append(np.asarray(chunk_ids))
+            best_scores.append(scores)
+
+        ids_, scores = np.concatenate(best_ids), np.concatenate(best_scores)
+        order = np.argsort(-scores, kind='stable')[:k]
+        return [(int(ids_[i]), float(1.0 - scores[i])) for i in order if np.isfinite(scores[i])]
+
+    def append(self, ids, embeddings):
+        """
+        새 기사 행 추가. 추가한 행 수를 돌려준다.
+        lock을 잡는 동안 rebuild가 끝났을 수 있으므로 이미 색인에 있는 id는 건너뛴다.
+        """
+        if not len(ids):
+            return 0
+        ids = np.asarray(ids, dtype=np.int64)
+        matrix = _normalize(embeddings, self.dimensions)
+        with self._write_lock():
+            meta = self._read_meta()
+            generation, count = meta['generation'], meta['count']
+            if count:
+                existing = np.memmap(self._file('ids', generation), dtype=np.int64, mode='r', shape=(count,))
+                new = ~np.isin(ids, existing[existing >= ids.min()])
+                ids, matrix = ids[new], matrix[new]
+                if not len(ids):
+                    return 0
+            # 이전에 중간에 실패한 쓰기가 남긴 행은 덮어쓴다
+            _write_at(self._file('embeddings', generation), count * matrix.itemsize * self.dimensions, matrix)
+            _write_at(self._file('ids', generation), count * 8, ids)
+            self._write_meta(generation, count + len(ids))
+        self._refresh(force=True)
+        return len(ids)
+
+    def rebuild(self, batches):
+        """
+        (ids, embeddings) 배치들로 새 세대의 파일을 만든 뒤 meta.json을 바꿔서 한 번에 교체
+        (임베딩이 바뀌거나 기사가 삭제된 경우). 전체 행 수를 돌려준다.
+        """
+        with self._write_lock():
+            generation = self._read_meta()['generation'] + 1
+            count = 0
+            with open(self._file('embeddings', generation), 'wb') as embeddings_file, \
+                    open(self._file('ids', generation), 'wb') as ids_file:
+                for ids, embeddings in batches:
+                    embeddings_file.write(_normalize(embeddings, self.dimensions).tobytes())
+                    ids_file.write(np.asarray(ids, dtype=np.int64).tobytes())
+                    count += len(ids)
+                for f in (embeddings_file, ids_file):
+                    f.flush()
+                    os.fsync(f.fileno())
+            self._write_meta(generation, count)
+
+            # 바로 이전 세대는 이전 meta.json을 읽은 워커가 아직 열 수 있으므로 남겨 두고, 그 전 세대를 지운다
+            # (이미 mmap한 워커는 파일이 지워져도 다시 열 때까지 그대로 읽을 수 있다)
+            for kind in ('embeddings', 'ids'):
+                old = self._file(kind, generation - 2)
+                if os.path.exists(old):
+                    os.remove(old)
+        self._refresh(force=True)
+        return count
+
+
+def _normalize(embeddings, dimensions):
+    matrix = np.asarray(embeddings, dtype=np.float32).reshape(-1, dimensions)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def _write_at(path, offset, array):
+    with open(path, 'r+b' if os.path.exists(path) else 'wb') as f:
+        f.seek(offset)
+        f.write(array.tobytes())
+        f.truncate()
+        f.flush()
+        os.fsync(f.fileno())
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_vector_index():
+    """
+    프로세스에서 공유하는 임베딩 색인
+    settings.VECTOR_INDEX_DIR이 없으면 None (관련 기사, 추천은 pgvector로 검색)
+    """
+    global _index
+    path = getattr(settings, 'VECTOR_INDEX_DIR', None)
+    if not path:
+        return None
+    with _index_lock:
+        if _index is None:
+            _index = MmapVectorIndex(path)
+        return _index
@@ -0,0 +1,269 @@
+import atexit
+import threading
+import time
+import uuid
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import close_old_connections, connection, transaction
+from django.db.models import F
+
+from .models import Article, ViewHistory
+from .profiles import add_new_views
+
+
+class LocalViewBuffer:
+    """
+    프로세스 안에서 조회수와 조회 기록을 모아두는 버퍼 (Redis가 없을 때 사용)
+    flush는 같은 프로세스의 백그라운드 스레드가 맡는다.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views = defaultdict(int)
+        self._history = {}
+
+    def record(self, article_id, user_id=None, viewed_at=None):
+        """조회 한 건을 기록하고 아직 DB에 반영되지 않은 이 기사의 조회수를 돌려준다."""
+        with self._lock:
+            self._views[article_id] += 1
+            if user_id is not None:
+                self._history[(user_id, article_id)] = viewed_at or time.time()
+            return self._views[article_id]
+
+    def pending(self, article_id):
+        with self._lock:
+            return self._views.get(article_id, 0)
+
+    def drain(self):
+        """쌓인 조회수 {article_id: n}와 조회 기록 {(user_id, article_id): 시각}을 꺼낸다."""
+        with self._lock:
+            views, self._views = dict(self._views), defaultdict(int)
+            history, self._history = self._history, {}
+        return views, history
+
+    @contextmanager
+    def flush_lock(self):
+        yield True  # flush는 이 프로세스의 스레드 하나만 한다
+
+    def ack(self):
+        pass
+
+    # DB 반영에 실패하면 꺼낸 값을 다시 버퍼에 합친다
+    def restore(self, views, history):
+        with self._lock:
+            for article_id, n in views.items():
+                self._views[article_id] += n
+            for key, viewed_at in history.items():
+                self._history[key] = max(viewed_at, self._history.get(key, 0))
+
+
+# source 해시를 processing 해시에 합치고(조회수는 더하고, 시각은 큰 값) source를 지운 뒤 processing을 돌려준다
+_DRAIN_SCRIPT = """
+local data = redis.call('HGETALL', KEYS[1])
+for i = 1, #data, 2 do
+    if ARGV[1] == 'sum' then
+        redis.call('HINCRBY', KEYS[2], data[i], data[i + 1])
+    else
+        local current = redis.call('HGET', KEYS[2], data[i])
+        if not current or tonumber(current) < tonumber(data[i + 1]) then
+            redis.call('HSET', KEYS[2], data[i], data[i + 1])
+        end
+    end
+end
+redis.call('DEL', KEYS[1])
+return redis.call('HGETALL', KEYS[2])
+"""
+
+# 자기가 잡은 lock일 때만 지운다 (만료된 뒤 다른 워커가 잡은 lock은 남겨둔다)
+_UNLOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class RedisViewBuffer:
+    """
+    Redis 해시에 조회수와 조회 기록을 모아두는 버퍼 (gunicorn 워커들이 함께 사용)
+    flush는 manage.py flush_views 워커가 맡는다.
+
+    drain()은 쌓인 값을 processing 해시로 옮겨서 돌려주고, DB에 반영한 뒤 ack()로 지운다.
+    반영에 실패하면 processing 해시가 남아 있다가 다음 drain()에서 새 값과 합쳐진다.
+    flush_views 워커가 여럿이어도 drain부터 ack까지는 flush_lock()을 잡은 한 곳에서만 한다.
+    """
+
+    VIEWS_KEY = 'news:views'
+    HISTORY_KEY = 'news:view_history'
+    LOCK_KEY = 'news:views:flush_lock'
+    # lock 만료 시간 (초, flush 도중 워커가 죽어도 이 시간이 지나면 다른 워커가 이어받는다)
+    LOCK_TIMEOUT = 60
+
+    def __init__(self, url):
+        import redis
+
+        self.redis = redis.Redis.from_url(url)
+        self._drain = self.redis.register_script(_DRAIN_SCRIPT)
+        self._unlock = self.redis.register_script(_UNLOCK_SCRIPT)
+
+    def record(self, article_id, user_id=None, viewed_at=None):
+        pipe = self.redis.pipeline()
+        pipe.hincrby(self.VIEWS_KEY, article_id, 1)
+        if user_id is not None:
+            pipe.hset(self.HISTORY_KEY, f'{user_id}:{article_id}', viewed_at or time.time())
+        return pipe.execute()[0]
+
+    def pending(self, article_id):
+        return int(self.redis.hget(self.VIEWS_KEY, article_id) or 0)
+
+    def drain(self):
+        raw_views = self._drain(keys=[self.VIEWS_KEY, f'{self.VIEWS_KEY}:processing'], args=['sum'])
+        raw_history = self._drain(keys=[self.HISTORY_KEY, f'{self.HISTORY_KEY}:processing'], args=['max'])
+
+        views = {int(key): int(value) for key, value in _pairs(raw_views)}
+        history = {}
+        for key, value in _pairs(raw_history):
+            user_id, article_id = key.decode().split(':')
+            history[(int(user_id), int(article_id))] = float(value)
+        return views, history
+
+    @contextmanager
+    def flush_lock(self):
+        """SET NX EX로 lock을 잡아보고 잡았는지 여부를 돌려준다."""
+        token = uuid.uuid4().hex
+        acquired = self.redis.set(self.LOCK_KEY, token, nx=True, ex=self.LOCK_TIMEOUT)
+        try:
+            yield bool(acquired)
+        finally:
+            if acquired:
+                self._unlock(keys=[self.LOCK_KEY], args=[token])
+
+    def ack(self):
+        self.redis.delete(f'{self.VIEWS_KEY}:processing', f'{self.HISTORY_KEY}:processing')
+
+    def restore(self, views, history):
+        pass  # processing 해시에 그대로 남아 있음
+
+
+def _pairs(flat):
+    return zip(flat[::2], flat[1::2])
+
+
+# 아직 없는 조회 기록만 넣고 실제로 넣은 (user, article)을 돌려준다
+# 같은 기록을 동시에 넣는 다른 트랜잭션은 unique 제약에서 기다렸다가 건너뛰므로 새 기록은 한 곳에서만 나온다
+INSERT_NEW_HISTORY_SQL = """
+    INSERT INTO news_viewhistory (user_id, article_id, viewed_at)
+    VALUES {values}
+    ON CONFLICT (user_id, article_id) DO NOTHING
+    RETURNING user_id, article_id
+"""
+
+
+def _insert_new_history(history):
+    if not history:
+        return set()
+    values = ', '.join(['(%s, %s, %s)'] * len(history))
+    params = [
+        value
+        for (user_id, article_id), viewed_at in history.items()
+        for value in (user_id, article_id, datetime.fromtimestamp(viewed_at, tz=dt_timezone.utc))
+    ]
+    with connection.cursor() as cursor:
+        cursor.execute(INSERT_NEW_HISTORY_SQL.format(values=values), params)
+        return {(user_id, article_id) for user_id, article_id in cursor.fetchall()}
+
+
+def flush_views(buffer=None):
+    """
+    버퍼에 쌓인 조회수와 조회 기록을 한 트랜잭션으로 DB에 반영
+    조회수는 증가량별로 UPDATE ... SET views = views + n WHERE id IN (...),
+    조회 기록은 처음 본 기사만 새로 넣어서 추천 프로필에 더하고, 나머지는 (user, article) 기준 bulk upsert로 viewed_at만 갱신한다.
+    반영한 (기사 수, 조회 기록 수)를 돌려준다. 다른 워커가 반영 중이면 (0, 0)을 돌려준다.
+    """
+    buffer = buffer or get_view_buffer()
+    with buffer.flush_lock() as acquired:
+        if not acquired:
+            return 0, 0
+        return _flush_locked(buffer)
+
+
+def _flush_locked(buffer):
+    views, history = buffer.drain()
+    if not views and not history:
+        buffer.ack()
+        return 0, 0
+
+    by_increment = defaultdict(list)
+    for article_id, n in views.items():
+        by_increment[n].append(article_id)
+
+    try:
+        with transaction.atomic():
+            for n, article_ids in by_increment.items():
+                Article.objects.filter(id__in=article_ids).update(views=F('views') + n)
+
+            # 그새 삭제된 기사, 탈퇴한 사용자의 조회 기록은 버린다 (FK 오류로 배치 전체가 계속 되돌려지지 않도록)
+            existing = set(Article.objects.filter(id__in={article_id for _, article_id in history}).values_list('id', flat=True))
+            users = set(User.objects.filter(id__in={user_id for user_id, _ in history}).values_list('id', flat=True))
+            saved = {key: viewed_at for key, viewed_at in history.items() if key[1] in existing and key[0] in users}
+            # 처음 본 기사만 추천 프로필에 더한다
+            new = _insert_new_history(saved)
+            add_new_views(new)
+            ViewHistory.objects.bulk_create(
+                [
+                    ViewHistory(
+                        user_id=user_id,
+                        article_id=article_id,
+                        viewed_at=datetime.fromtimestamp(viewed_at, tz=dt_timezone.utc),
+                    )
+                    for (user_id, article_id), viewed_at in saved.items()
+                    if (user_id, article_id) not in new
+                ],
+                update_conflicts=True,
+                unique_fields=['user', 'article'],
+                update_fields=['viewed_at'],
+            )
+    except Exception:
+        buffer.restore(views, history)
+        raise
+
+    buffer.ack()
+    return len(views), len(history)
+
+
+def _flush_forever(buffer, interval):
+    while True:
+        time.sleep(interval)
+        try:
+            flush_views(buffer)
+        except Exception as e:
+            print(f"조회수 반영 중 오류 발생: {e}")
+        finally:
+            close_old_connections()
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def get_view_buffer():
+    """
+    프로세스에서 공유하는 조회 버퍼
+    VIEW_BUFFER_REDIS_URL이 있으면 Redis, 없으면 프로세스 내부 버퍼와 백그라운드 flush 스레드를 쓴다.
+    """
+    global _buffer
+    with _buffer_lock:
+        if _buffer is None:
+            url = getattr(settings, 'VIEW_BUFFER_REDIS_URL', None)
+            if url:
+                _buffer = RedisViewBuffer(url)
+            else:
+                _buffer = LocalViewBuffer()
+                interval = getattr(settings, 'VIEW_BUFFER_FLUSH_INTERVAL', 5)
+                threading.Thread(target=_flush_forever, args=(_buffer, interval), name='view-flush', daemon=True).start()
+                atexit.register(flush_views, _buffer)
+        return _buffer
@@ -5,12 +5,14 @@ from rest_framework.response import Response
 from rest_framework import status
 from .models import Article, LikeHistory, ViewHistory, Highlight, CommentHistory
 from .serializers import ArticleListSerializer, LikeListSerializer, ViewListSerializer, CommentListSerializer
+from .pagination import InvalidCursor, page_size_from, paginate_keyset, sort_key
+from .view_buffer import get_view_buffer
+from .related import nearest_articles, related_articles_for
+from .profiles import profile_vector
 from django.db.models.functions import TruncDate
 from django.contrib.auth.models import User
-from pgvector.django import CosineDistance
-from django.db.models import Count
+from django.db import transaction
 from django.utils import timezone
-import numpy as np
 from elasticsearch import Elasticsearch
 import ollama
 from rest_framework.views import APIView
@@ -19,64 +21,49 @@ from rest_framework import status
 from django.contrib.auth.models import User
 
 
+# 정렬 옵션(latest, views, likes)에 맞춰 커서 단위로 잘라서 응답
+# ?cursor=<next/previous 값>&page_size=<최대 100>
+def paginated_article_list(request, articles):
+	fields = sort_key(request.GET.get('sort', 'latest'))  # 기본값은 최신순
+	try:
+		page, next_cursor, previous_cursor = paginate_keyset(request, articles, fields)
+	except InvalidCursor:
+		return Response({"error": "잘못된 커서입니다."}, status=status.HTTP_400_BAD_REQUEST)
+
+	serializer = ArticleListSerializer(page, many=True)
+	return Response({
+		'results': serializer.data,
+		'next': next_cursor,
+		'previous': previous_cursor,
+	}, status=status.HTTP_200_OK)
+
+
 # 전체 기사 리스트
 @api_view(['GET'])
 def article_list(request):
-	sort_by = request.GET.get('sort', '-write_date')  # 기본값은 최신순
-	articles = Article.objects \
-        .annotate(like_count=Count('likehistory'), comment_count=Count('commenthistory'))
-	
-
-	# 정렬 옵션에 따른 처리
-	if sort_by == 'likes':
-		articles = articles.order_by('-like_count', '-write_date')
-	elif sort_by == 'views':
-		articles = articles.order_by('-views', '-write_date')
-	else:  # 기본값 또는 '-write_date'
-		articles = articles.order_by('-write_date')
-	
-	serializer = ArticleListSerializer(articles, many=True)
-	return Response(serializer.data, status=status.HTTP_200_OK)
+	return paginated_article_list(request, Article.objects.defer('embedding'))
 
 
 # 장르 전체 기사 리스트
 @api_view(['GET'])
 def genre_article_list(request, type):
-	sort_by = request.GET.get('sort', '-write_date')  # 기본값은 최신순
-	articles = Article.objects.filter(category=type)\
-		.annotate(like_count=Count('likehistory'), comment_count=Count('commenthistory'))
-	
-	# 정렬 옵션에 따른 처리
-	if sort_by == 'likes':
-		articles = articles.order_by('-like_count', '-write_date')
-	elif sort_by == 'views':
-		articles = articles.order_by('-views', '-write_date')
-	else:  # 기본값 또는 '-write_date'
-		articles = articles.order_by('-write_date')
-	
-	serializer = ArticleListSerializer(articles, many=True)
-	return Response(serializer.data, status=status.HTTP_200_OK)
+	return paginated_article_list(request, Article.objects.filter(category=type).defer('embedding'))
 
 
 # 기사 자세히
 @api_view(['GET'])
 @permission_classes([AllowAny]) 
 def article_detail(request, article_id):
-	article = Article.objects \
-        .annotate(like_count=Count('likehistory'), comment_count=Count('commenthistory')) \
-        .get(id=article_id)
-	article.views += 1
-	article.save(update_fields=['views'])
+	article = Article.objects.defer('embedding').get(id=article_id)
 	liked = False
+	user_id = request.user.id if request.user.is_authenticated else None
 
-	# 로그인된 사용자일 때만 ViewHistory 생성
-	if request.user.is_authenticated:
-		ViewHistory.objects.update_or_create(
-			user_id=request.user.id, 
-			article_id=article.id,
-			defaults={'viewed_at': timezone.now()}
-		)
-		liked = LikeHistory.objects.filter(user_id=request.user.id, article_id=article_id).exists()
+	# 조회수와 조회 기록(로그인된 사용자만)은 버퍼에 쌓았다가 주기적으로 DB에 반영
+	# 응답에는 아직 반영되지 않은 조회수까지 더해서 보여준다
+	article.views += get_view_buffer().record(article.id, user_id)
+
+	if user_id is not None:
+		liked = LikeHistory.objects.filter(user_id=user_id, article_id=article_id).exists()
 
 	serializer = ArticleListSerializer(article)
 	return Response({'data': serializer.data, 'liked': liked}, status=status.HTTP_200_OK)
@@ -96,33 +83,33 @@ def article_commented(request, article_id):
 def article_detail_related(request, article_id):
 	article = Article.objects.get(id=article_id)
 
-	related_articles = Article.objects.exclude(id=article.id)\
-		.annotate(similarity=CosineDistance('embedding', article.embedding))\
-		.order_by('similarity')[:5]  # 코사인 거리가 가까운 순으로 5개
+	# 미리 계산해 둔 관련 기사 목록을 읽고, 아직 없으면 HNSW 인덱스로 검색
+	related_articles = related_articles_for(article, limit=5)
 
 	serializer = ArticleListSerializer(related_articles, many=True)
 	return Response(serializer.data, status=status.HTTP_200_OK)
 	
 
 # 기사 좋아요 누르기
+# 좋아요 기록과 like_count(signals)를 한 트랜잭션에서 바꾸고, 갱신된 카운터를 그대로 응답
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def like_article(request, article_id):
     user_id = request.user.id
-    liked = LikeHistory.objects.filter(user_id=user_id, article_id=article_id)
-    
-    # 좋아요가 있으면 취소
-    if liked.exists():
-        liked.delete()
-        status_code = status.HTTP_200_OK
-        liked = False
-    # 없으면 생성
-    else:
-        LikeHistory.objects.create(user_id=user_id, article_id=article_id)
-        status_code = status.HTTP_201_CREATED
-        liked = True
-
-    count = LikeHistory.objects.filter(article_id=article_id).count()
+
+    with transaction.atomic():
+        # 좋아요가 있으면 취소
+        deleted, _ = LikeHistory.objects.filter(user_id=user_id, article_id=article_id).delete()
+        if deleted:
+            status_code = status.HTTP_200_OK
+            liked = False
+        # 없으면 생성 (동시에 두 번 눌러도 한 번만 생성)
+        else:
+            LikeHistory.objects.get_or_create(user_id=user_id, article_id=article_id)
+            status_code = status.HTTP_201_CREATED
+            liked = True
+
+        count = Article.objects.values_list('like_count', flat=True).get(id=article_id)
     return Response({'like_count':count, 'liked':liked}, status_code)
 
 
@@ -133,14 +120,15 @@ def comment_article(request, article_id):
     user_id = request.user.id
     comment = request.data.get('comment', '')
     
-    CommentHistory.objects.create(
-        user_id=user_id, 
-        article_id=article_id,
-        comment=comment
-    )
+    with transaction.atomic():
+        CommentHistory.objects.create(
+            user_id=user_id, 
+            article_id=article_id,
+            comment=comment
+        )
+        count = Article.objects.values_list('comment_count', flat=True).get(id=article_id)
     status_code = status.HTTP_201_CREATED
 
-    count = CommentHistory.objects.filter(article_id=article_id).count()
     return Response({'comment': comment, 'comment_count': count}, status_code)
 	
 
@@ -173,7 +161,7 @@ def get_user_information(request):
 def article_list_whom_liked(request):
     user_id = request.user.id
 
-    liked_articles = LikeHistory.objects.filter(user_id=user_id)
+    liked_articles = LikeHistory.objects.filter(user_id=user_id).select_related('article').defer('article__embedding')
     serializer = LikeListSerializer(liked_articles, many=True)
     return Response(serializer.data, status=status.HTTP_200_OK)
 
@@ -184,7 +172,7 @@ def article_list_whom_liked(request):
 def article_list_whom_viewed(request):
 	user_id = request.user.id
 	
-	viewed_articles = ViewHistory.objects.filter(user_id=user_id)
+	viewed_articles = ViewHistory.objects.filter(user_id=user_id).select_related('article').defer('article__embedding')
 	serializer = ViewListSerializer(viewed_articles, many=True)
 	return Response(serializer.data, status=status.HTTP_200_OK)
 
@@ -193,38 +181,23 @@ def article_list_whom_viewed(request):
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def recommend_articles_for_user(request):
-	LIKE_WEIGHT = 3.0
-	VIEW_WEIGHT = 1.0
 	user_id = request.user.id
-
-	# 유저의 좋아요 및 조회 기사 ID 수집
-	liked_article_ids = LikeHistory.objects.filter(user_id=user_id).values_list('article_id', flat=True)
-	viewed_article_ids = ViewHistory.objects.filter(user_id=user_id).values_list('article_id', flat=True)
-	exclude_ids = set(liked_article_ids).union(set(viewed_article_ids))
-
-	# 유저 임베딩 계산 (가중 평균)
-	weighted_vectors = []
-	
-	liked_articles = Article.objects.filter(id__in=liked_article_ids)
-	for article in liked_articles:
-		if article.embedding is not None and len(article.embedding) > 0:
-			weighted_vectors.append((np.array(article.embedding), LIKE_WEIGHT))
-
-	viewed_articles = Article.objects.filter(id__in=viewed_article_ids)
-	for article in viewed_articles:
-		if article.embedding is not None and len(article.embedding) > 0:
-			weighted_vectors.append((np.array(article.embedding), VIEW_WEIGHT))
-
-	vectors = np.array([vec * weight for vec, weight in weighted_vectors])
-	weights = np.array([weight for _, weight in weighted_vectors])
-	user_embedding = np.sum(vectors, axis=0) / np.sum(weights)
-
-    # 추천 기사 조회 (유사도 기반)
-	recommendations = Article.objects.exclude(id__in=exclude_ids)\
-        .annotate(similarity=CosineDistance('embedding', user_embedding))\
-        .order_by('similarity')
-
-    # 직렬화 후 응답
+	size = page_size_from(request)
+
+	# 좋아요/조회 기록으로 갱신해 둔 프로필 임베딩
+	user_embedding = profile_vector(user_id)
+
+	# 기록이 없으면 최신 기사
+	if user_embedding is None:
+		recommendations = Article.objects.defer('embedding').order_by('-write_date', '-id')[:size]
+	else:
+		# 이미 좋아요를 누르거나 본 기사는 제외하고 프로필과 가까운 기사 (HNSW 인덱스 검색)
+		liked_article_ids = LikeHistory.objects.filter(user_id=user_id).values_list('article_id', flat=True)
+		viewed_article_ids = ViewHistory.objects.filter(user_id=user_id).values_list('article_id', flat=True)
+		exclude_ids = set(liked_article_ids).union(set(viewed_article_ids))
+		recommendations = nearest_articles(user_embedding, size, exclude_ids=exclude_ids)
+
+	# 직렬화 후 응답
 	serializer = ArticleListSerializer(recommendations, many=True)
 	return Response(serializer.data, status=status.HTTP_200_OK)
 
@@ -254,12 +227,20 @@ def search_articles(request):
             body=search_body
         )
         
+        # 검색된 기사들의 조회수, 좋아요 수를 한 번에 조회
+        hits = response["hits"]["hits"]
+        counters = {
+            article_id: (views, like_count)
+            for article_id, views, like_count in Article.objects
+                .filter(id__in=[hit["_source"]["id"] for hit in hits])
+                .values_list('id', 'views', 'like_count')
+        }
+
         # 검색 결과를 직렬화
         results = []
-        for hit in response["hits"]["hits"]:
+        for hit in hits:
             data = hit["_source"]
-            like_count = LikeHistory.objects.filter(article_id=data["id"]).count()
-            views = Article.objects.get(id=data["id"]).views
+            views, like_count = counters.get(data["id"], (0, 0))
 
             results.append({
                 "id": data["id"],
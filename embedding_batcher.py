@@ -0,0 +1,116 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from openai_api import transform_to_embeddings
+
+# 한 번의 임베딩 요청에 담을 최대 기사 수
+EMBEDDING_BATCH_SIZE = 16
+# 첫 기사가 들어온 뒤 배치를 채우기 위해 기다리는 최대 시간 (ms)
+EMBEDDING_MAX_WAIT_MS = 50
+
+
+class EmbeddingBatcher:
+    """
+    임베딩 마이크로 배치 단계
+    여러 스레드에서 들어오는 기사를 최대 batch_size개 또는 max_wait_ms까지 모아
+    한 번의 임베딩 요청으로 보내고, 결과를 각 기사의 Future로 나눠준다.
+    """
+
+    def __init__(
+        self,
+        embed_many=transform_to_embeddings,
+        batch_size=EMBEDDING_BATCH_SIZE,
+        max_wait_ms=EMBEDDING_MAX_WAIT_MS,
+    ):
+        self.embed_many = embed_many
+        self.batch_size = batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queue = queue.Queue()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, text):
+        """임베딩 요청을 배치 대기열에 넣고 결과를 받을 Future를 돌려준다."""
+        if self._closed:
+            raise RuntimeError("이미 종료된 EmbeddingBatcher입니다.")
+        future = Future()
+        self._queue.put((text, future))
+        return future
+
+    def embed(self, text, timeout=None):
+        return self.submit(text).result(timeout)
+
+    def close(self):
+        if not self._closed:
+            self._closed = True
+            self._queue.put(None)
+            self._thread.join()
+
+    # 첫 요청이 올 때까지 기다린 뒤, 배치가 차거나 대기 시간이 끝날 때까지 모으기
+    def _collect(self):
+        first = self._queue.get()
+        if first is None:
+            return None
+
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                self._queue.put(None)  # 남은 배치를 처리한 뒤 종료
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            if batch is None:
+                return
+            self._flush(batch)
+
+    def _flush(self, batch):
+        # 기다리는 동안 취소된 요청(타임아웃 등)은 제외
+        batch = [(text, future) for text, future in batch if future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+
+        texts = [text for text, _ in batch]
+        try:
+            embeddings = self.embed_many(texts)
+        except Exception as e:
+            if len(batch) == 1:
+                batch[0][1].set_exception(e)
+                return
+            # 배치 중 한 건 때문에 전체가 실패하지 않도록 한 건씩 다시 요청
+            for text, future in batch:
+                try:
+                    future.set_result(self.embed_many([text])[0])
+                except Exception as e:
+                    future.set_exception(e)
+            return
+
+        for (_, future), embedding in zip(batch, embeddings):
+            future.set_result(embedding)
+
+
+_batcher = None
+_batcher_lock = threading.Lock()
+
+
+# 프로세스에서 공유하는 EmbeddingBatcher (처음 사용할 때 생성)
+def get_embedding_batcher():
+    global _batcher
+    with _batcher_lock:
+        if _batcher is None:
+            _batcher = EmbeddingBatcher()
+        return _batcher
@@ -0,0 +1,165 @@
+import atexit
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+from elasticsearch import Elasticsearch, helpers
+
+ES_URL = "http://localhost:9200"
+ES_INDEX = "news"
+# flush 기준: 문서 수, 요청 크기(bytes), 시간(초)
+ES_MAX_DOCS = 500
+ES_MAX_BYTES = 5 * 1024 * 1024
+ES_FLUSH_INTERVAL = 1.0
+# 실패한 문서를 다음 flush에 다시 보내는 최대 횟수
+ES_MAX_RETRIES = 3
+
+_client = None
+_client_lock = threading.Lock()
+
+
+# 프로세스에서 공유하는 Elasticsearch 클라이언트
+def get_es_client():
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = Elasticsearch(ES_URL)
+        return _client
+
+
+class ElasticsearchBulkSink:
+    """
+    Elasticsearch bulk 색인 sink
+    문서를 모았다가 문서 수, 요청 크기, 시간 중 하나가 기준을 넘으면 streaming_bulk로 한 번에 색인한다.
+    bulk 요청에서 실패한 문서는 버퍼에 다시 넣어서 다음 flush(최소 flush_interval 뒤)에 함께 보내고,
+    max_retries번 다시 보내도 실패하면 버린다.
+    """
+
+    def __init__(
+        self,
+        client=None,
+        index=ES_INDEX,
+        max_docs=ES_MAX_DOCS,
+        max_bytes=ES_MAX_BYTES,
+        flush_interval=ES_FLUSH_INTERVAL,
+        max_retries=ES_MAX_RETRIES,
+    ):
+        self.client = client or get_es_client()
+        self.index = index
+        self.max_docs = max_docs
+        self.max_bytes = max_bytes
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+
+        self._buffer = []
+        self._buffer_bytes = 0
+        self._oldest = None
+        self._buffer_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._closed = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="es-sink", daemon=True)
+        self._thread.start()
+
+    def add(self, document, doc_id=None):
+        action = {"_index": self.index, "_source": document}
+        if doc_id is not None:
+            action["_id"] = doc_id
+        size = len(json.dumps(document, ensure_ascii=False, default=str).encode("utf-8"))
+
+        with self._buffer_lock:
+            self._append(action, size, 0)
+            full = len(self._buffer) >= self.max_docs or self._buffer_bytes >= self.max_bytes
+
+        if full:
+            self.flush()
+
+    # 버퍼 항목: (bulk action, 문서 크기, 지금까지 다시 보낸 횟수)
+    def _append(self, action, size, retries):
+        if not self._buffer:
+            self._oldest = time.monotonic()
+        self._buffer.append((action, size, retries))
+        self._buffer_bytes += size
+
+    def flush(self):
+        with self._buffer_lock:
+            entries, self._buffer, self._buffer_bytes = self._buffer, [], 0
+        if not entries:
+            return
+
+        with self._flush_lock:
+            results = self._bulk([action for action, _, _ in entries])
+            failed = [entry for entry, ok in zip(entries, results) if not ok]
+            print(f"ElasticSearch {len(entries) - len(failed)}/{len(entries)}건 색인")
+            self._requeue(failed)
+
+    # 실패한 문서를 버퍼에 다시 넣기 (flush_lock을 잡은 채로 기다리지 않도록 다음 flush에서 재시도)
+    def _requeue(self, failed):
+        with self._buffer_lock:
+            for action, size, retries in failed:
+                if retries >= self.max_retries:
+                    print(f"ElasticSearch 저장 중 오류 발생: 문서 {action.get('_id')} 색인 {retries + 1}회 실패")
+                    continue
+                self._append(action, size, retries + 1)
+
+    # 문서별 성공 여부를 보낸 순서대로 돌려준다
+    def _bulk(self, actions):
+        results = helpers.streaming_bulk(
+            self.client,
+            actions,
+            chunk_size=len(actions),
+            max_chunk_bytes=self.max_bytes,
+            raise_on_error=False,
+            raise_on_exception=False,
+        )
+        return [ok for ok, _ in results]
+
+    # 다시 넣은 문서까지 비울 때까지 flush (각 문서는 max_retries번 안에 색인되거나 버려진다)
+    def _flush_all(self):
+        while self._buffer:
+            self.flush()
+
+    # 시간 기준 flush
+    def _run(self):
+        while not self._closed.wait(self.flush_interval / 4):
+            with self._buffer_lock:
+                due = self._buffer and time.monotonic() - self._oldest >= self.flush_interval
+            if due:
+                self.flush()
+
+    @contextmanager
+    def bulk_mode(self):
+        """
+        대량 색인(backfill) 동안 refresh_interval을 끄고, 끝나면 원래 값으로 되돌린 뒤 refresh
+        """
+        settings = self.client.indices.get_settings(index=self.index)
+        original = settings[self.index]["settings"]["index"].get("refresh_interval")
+        self.client.indices.put_settings(index=self.index, settings={"index": {"refresh_interval": "-1"}})
+        try:
+            yield self
+            self._flush_all()
+        finally:
+            self.client.indices.put_settings(
+                index=self.index, settings={"index": {"refresh_interval": original}}
+            )
+            self.client.indices.refresh(index=self.index)
+
+    def close(self):
+        if not self._closed.is_set():
+            self._closed.set()
+            self._thread.join()
+            self._flush_all()
+
+
+_sink = None
+_sink_lock = threading.Lock()
+
+
+# 프로세스에서 공유하는 bulk sink (처음 사용할 때 생성, 종료 시 남은 문서 flush)
+def get_es_sink():
+    global _sink
+    with _sink_lock:
+        if _sink is None:
+            _sink = ElasticsearchBulkSink()
+            atexit.register(_sink.close)
+        return _sink
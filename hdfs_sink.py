@@ -0,0 +1,292 @@
+import atexit
+import json
+import os
+import queue
+import shutil
+import socket
+import threading
+import time
+from datetime import datetime
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# WebHDFS 주소와 사용자 (HDFS_LOCAL_ROOT가 있으면 로컬 파일시스템에 대신 업로드)
+HDFS_URL = os.getenv("HDFS_URL", "http://localhost:9870")
+HDFS_USER = os.getenv("HDFS_USER")
+HDFS_LOCAL_ROOT = os.getenv("HDFS_LOCAL_ROOT")
+HDFS_DIR = "/news"
+# 업로드 전 part 파일을 쓰는 로컬 디렉터리
+STAGING_DIR = "./batch/data/hdfs_staging"
+# part 파일을 닫는 기준: 크기(bytes), 시간(초)
+PART_MAX_BYTES = 64 * 1024 * 1024
+PART_MAX_AGE = 300
+# 업로드 실패 시 다시 시도하기 전 대기 시간 (초), 최대 시도 횟수
+UPLOAD_RETRY_DELAY = 10
+UPLOAD_MAX_ATTEMPTS = 5
+
+IN_PROGRESS_SUFFIX = ".inprogress"
+# staging 디렉터리 아래 워커별 디렉터리 이름 접두사와, 워커가 살아 있는 동안 잡고 있는 lock 파일
+WORKER_DIR_PREFIX = "worker-"
+WORKER_LOCK_FILE = ".lock"
+
+
+class WebHdfsClient:
+    """WebHDFS로 업로드하는 클라이언트 (JVM을 띄우지 않고 프로세스 안에서 HTTP로 업로드)"""
+
+    def __init__(self, url=HDFS_URL, user=HDFS_USER):
+        from hdfs import InsecureClient
+
+        self.client = InsecureClient(url, user=user)
+
+    def makedirs(self, hdfs_path):
+        self.client.makedirs(hdfs_path)
+
+    def upload(self, hdfs_path, local_path):
+        self.client.upload(hdfs_path, local_path, overwrite=True)
+
+
+class LocalFileSystemClient:
+    """HDFS 대신 로컬 디렉터리에 업로드하는 클라이언트 (개발, 테스트용)"""
+
+    def __init__(self, root):
+        self.root = root
+
+    def _local(self, hdfs_path):
+        return os.path.join(self.root, hdfs_path.lstrip("/"))
+
+    def makedirs(self, hdfs_path):
+        os.makedirs(self._local(hdfs_path), exist_ok=True)
+
+    def upload(self, hdfs_path, local_path):
+        target = self._local(hdfs_path)
+        shutil.copyfile(local_path, target + IN_PROGRESS_SUFFIX)
+        os.replace(target + IN_PROGRESS_SUFFIX, target)
+
+
+def create_hdfs_client():
+    if HDFS_LOCAL_ROOT:
+        return LocalFileSystemClient(HDFS_LOCAL_ROOT)
+    return WebHdfsClient()
+
+
+class RollingHdfsSink:
+    """
+    HDFS 롤링 part 파일 sink
+    기사를 로컬 part 파일(JSONL)에 이어 쓰다가 크기나 시간 기준을 넘으면 파일을 닫고,
+    백그라운드 스레드가 /news/YYYY-MM-DD/part-*.jsonl로 업로드한 뒤 로컬 파일을 지운다.
+    업로드에 실패한 파일은 남겨두고 다시 시도하며, 재시작하면 남아 있던 part 파일부터 올린다.
+
+    Flink subtask 여러 개가 같은 staging 디렉터리를 쓰므로 워커마다 하위 디렉터리
+    (worker-<host>-<pid>)에 쓰고, 그 안의 lock 파일을 fcntl.flock으로 잡아 둔다.
+    시작할 때는 자기 디렉터리와, lock을 잡을 수 있는(= 쓰던 프로세스가 끝난) 워커 디렉터리의
+    part 파일만 가져와서 올리므로 살아 있는 다른 워커의 파일은 건드리지 않는다.
+    """
+
+    def __init__(
+        self,
+        client=None,
+        staging_dir=STAGING_DIR,
+        hdfs_dir=HDFS_DIR,
+        max_bytes=PART_MAX_BYTES,
+        max_age=PART_MAX_AGE,
+    ):
+        self.client = client or create_hdfs_client()
+        self.staging_dir = staging_dir
+        self.hdfs_dir = hdfs_dir
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+
+        self._lock = threading.Lock()
+        self._file = None
+        self._path = None
+        self._date = None
+        self._opened_at = None
+        self._seq = 0
+        self._uploads = queue.Queue()
+        self._closed = threading.Event()
+        os.makedirs(staging_dir, exist_ok=True)
+        self._worker_dir, self._worker_lock = self._claim_worker_dir()
+        self._recover()
+
+        self._uploader = threading.Thread(target=self._upload_loop, name="hdfs-uploader", daemon=True)
+        self._uploader.start()
+        self._roller = threading.Thread(target=self._roll_loop, name="hdfs-roller", daemon=True)
+        self._roller.start()
+
+    def _claim_worker_dir(self):
+        base = f"{WORKER_DIR_PREFIX}{socket.gethostname()}-{os.getpid()}"
+        attempt = 0
+        while True:
+            path = os.path.join(self.staging_dir, base if attempt == 0 else f"{base}-{attempt}")
+            attempt += 1
+            try:
+                os.makedirs(path, exist_ok=True)
+                lock = _try_lock(os.path.join(path, WORKER_LOCK_FILE))
+            except OSError:
+                continue  # 다른 워커가 정리하면서 지운 디렉터리
+            if lock is not None:
+                return path, lock
+
+    # 이전 실행에서 닫혔지만 업로드하지 못한 part 파일, 쓰다 만 part 파일 정리
+    def _recover(self):
+        self._recover_dir(self._worker_dir)
+        if fcntl is None:
+            return  # lock으로 끝난 워커를 구분할 수 없으면 자기 디렉터리만 정리
+        for name in sorted(os.listdir(self.staging_dir)):
+            path = os.path.join(self.staging_dir, name)
+            if path == self._worker_dir or not name.startswith(WORKER_DIR_PREFIX) or not os.path.isdir(path):
+                continue
+            try:
+                lock = _try_lock(os.path.join(path, WORKER_LOCK_FILE))
+            except OSError:
+                continue
+            if lock is None:
+                continue  # 아직 살아 있는 워커
+            try:
+                self._recover_dir(path)
+                os.remove(os.path.join(path, WORKER_LOCK_FILE))
+                os.rmdir(path)
+            except OSError as e:
+                print(f"HDFS staging 디렉터리 정리 중 오류 발생: {e}")
+            finally:
+                lock.close()
+
+    # 디렉터리의 part 파일을 이 워커의 디렉터리로 옮겨서 업로드 대기열에 넣기
+    def _recover_dir(self, directory):
+        for name in sorted(os.listdir(directory)):
+            if not name.endswith((".jsonl", ".jsonl" + IN_PROGRESS_SUFFIX)):
+                continue
+            if name.endswith(IN_PROGRESS_SUFFIX):
+                name = name[: -len(IN_PROGRESS_SUFFIX)]
+                source = os.path.join(directory, name + IN_PROGRESS_SUFFIX)
+            else:
+                source = os.path.join(directory, name)
+            path = os.path.join(self._worker_dir, name)
+            os.replace(source, path)
+            self._uploads.put((path, 1))
+
+    def write(self, data):
+        line = (json.dumps(data, ensure_ascii=False, default=str) + "\n").encode("utf-8")
+        today = datetime.now().strftime("%Y-%m-%d")
+
+        with self._lock:
+            if self._file is not None and today != self._date:
+                self._roll()
+            if self._file is None:
+                self._open(today)
+            self._file.write(line)
+            if self._file.tell() >= self.max_bytes:
+                self._roll()
+
+    def _open(self, date):
+        self._seq += 1
+        name = f"{date}_part-{datetime.now():%H%M%S}-{os.getpid()}-{self._seq:05d}.jsonl"
+        self._path = os.path.join(self._worker_dir, name)
+        self._file = open(self._path + IN_PROGRESS_SUFFIX, "wb")
+        self._date = date
+        self._opened_at = time.monotonic()
+
+    # 현재 part 파일을 닫고 업로드 대기열에 넣기
+    def _roll(self):
+        if self._file is None:
+            return
+        path = self._path
+        # 닫기나 이름 바꾸기가 실패해도 다음 write는 새 part 파일을 연다
+        # (남은 .inprogress 파일은 다음 실행에서 올린다)
+        try:
+            self._file.close()
+            os.replace(path + IN_PROGRESS_SUFFIX, path)
+        finally:
+            self._file = None
+            self._path = None
+        self._uploads.put((path, 1))
+
+    def roll(self):
+        with self._lock:
+            self._roll()
+
+    # 기사가 뜸해도 max_age가 지나면 part 파일을 닫기
+    def _roll_loop(self):
+        while not self._closed.wait(min(self.max_age, 5)):
+            with self._lock:
+                if self._file is not None and time.monotonic() - self._opened_at >= self.max_age:
+                    self._roll()
+
+    def _hdfs_path(self, local_path):
+        date, part = os.path.basename(local_path).split("_", 1)
+        return f"{self.hdfs_dir}/{date}", f"{self.hdfs_dir}/{date}/{part}"
+
+    def _upload_loop(self):
+        while True:
+            item = self._uploads.get()
+            if item is None:
+                return
+            local_path, attempt = item
+            if not os.path.exists(local_path):
+                print(f"HDFS 업로드 건너뜀 (파일 없음): {local_path}")
+                continue
+            try:
+                hdfs_dir, hdfs_path = self._hdfs_path(local_path)
+                self.client.makedirs(hdfs_dir)
+                self.client.upload(hdfs_path, local_path)
+                os.remove(local_path)
+                print(f"HDFS 저장 완료: {hdfs_path}")
+            except Exception as e:
+                print(f"HDFS 저장 중 오류 발생 ({attempt}/{UPLOAD_MAX_ATTEMPTS}): {e}")
+                # 종료 중이거나 여러 번 실패한 파일은 staging에 남겨 두고 다음 실행에서 다시 업로드
+                if self._closed.is_set() or attempt >= UPLOAD_MAX_ATTEMPTS:
+                    continue
+                time.sleep(UPLOAD_RETRY_DELAY)
+                self._uploads.put((local_path, attempt + 1))
+
+    def close(self):
+        """현재 part 파일을 닫고, 대기 중인 업로드가 끝날 때까지 기다린다."""
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        self._roller.join()
+        self.roll()
+        self._uploads.put(None)
+        self._uploader.join()
+        self._release_worker_dir()
+
+    def _release_worker_dir(self):
+        # 올리지 못한 part 파일이 남아 있으면 lock만 풀어서 다음에 시작하는 워커가 가져가게 한다
+        try:
+            if not any(name != WORKER_LOCK_FILE for name in os.listdir(self._worker_dir)):
+                os.remove(os.path.join(self._worker_dir, WORKER_LOCK_FILE))
+                os.rmdir(self._worker_dir)
+        except OSError:
+            pass
+        finally:
+            self._worker_lock.close()
+
+
+def _try_lock(path):
+    """lock 파일을 열고 배타 lock을 잡아서 파일 객체를 돌려준다. 다른 프로세스가 잡고 있으면 None"""
+    f = open(path, "a")
+    if fcntl is None:
+        return f
+    try:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        f.close()
+        return None
+    return f
+
+
+_sink = None
+_sink_lock = threading.Lock()
+
+
+# 프로세스에서 공유하는 HDFS sink (종료 시 남은 part 파일 업로드)
+def get_hdfs_sink():
+    global _sink
+    with _sink_lock:
+        if _sink is None:
+            _sink = RollingHdfsSink()
+            atexit.register(_sink.close)
+        return _sink
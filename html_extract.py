@@ -0,0 +1,60 @@
+from bs4 import BeautifulSoup
+
+# 빠른 HTML 파서 (lexbor 기반 C 파서, 설치되어 있지 않으면 BeautifulSoup만 사용)
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
+
+def _fast_texts(html, selector):
+    tree = LexborHTMLParser(html)
+    if selector is None:
+        return [tree.root.text(separator="", strip=True)] if tree.root else []
+    return [node.text(deep=True).strip() for node in tree.css(selector)]
+
+
+def _soup_texts(html, selector):
+    soup = BeautifulSoup(html, "html.parser")
+    if selector is None:
+        return [soup.get_text(strip=True)]
+    return [tag.text.strip() for tag in soup.select(selector)]
+
+
+def select_texts(html, selector=None):
+    """
+    CSS selector에 맞는 요소들의 텍스트 목록 (selector가 없으면 문서 전체 텍스트 하나)
+    selectolax로 찾고, 설치되어 있지 않거나 파싱에 실패했을 때만 BeautifulSoup으로 다시 찾는다.
+    (본문이 없는 페이지마다 두 번 파싱하지 않도록 빈 결과는 그대로 돌려준다)
+    """
+    if LexborHTMLParser is not None:
+        try:
+            return _fast_texts(html, selector)
+        except Exception as e:
+            print(f"HTML 파싱 중 오류 발생, BeautifulSoup으로 다시 시도: {e}")
+    return _soup_texts(html, selector)
+
+
+class BodyExtractor:
+    """
+    출처별 본문 추출 규칙
+    selector: 본문 문단 CSS selector (None이면 문서 전체 텍스트)
+    separator: 문단을 이어 붙일 구분자
+    cut_marker: 이 문구가 나오면 그 앞까지만 사용 (예: "전체 내용보기")
+    empty: 본문을 찾지 못했을 때 돌려줄 값
+    """
+
+    def __init__(self, selector=None, separator="\n\n", cut_marker=None, empty=""):
+        self.selector = selector
+        self.separator = separator
+        self.cut_marker = cut_marker
+        self.empty = empty
+
+    def __call__(self, html):
+        texts = select_texts(html, self.selector)
+        if not texts:
+            return self.empty
+        text = self.separator.join(texts)
+        if self.cut_marker:
+            text = text.split(self.cut_marker)[0].strip()
+        return text
@@ -0,0 +1,89 @@
+import atexit
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+# 일자별 기사 아카이브 디렉터리 (Airflow 컨테이너의 /opt/airflow/data)
+ARCHIVE_DIR = "./batch/data"
+# fsync 주기 (초)
+FSYNC_INTERVAL = 5.0
+
+
+class JsonlArchiveWriter:
+    """
+    일자별 JSONL 아카이브 writer
+    기사 한 건을 한 줄로 이어 쓰고(append-only), 파일은 열어둔 채로 재사용한다.
+    날짜가 바뀌면 새 파일(YYYY-MM-DD.jsonl)로 넘어가고, fsync는 fsync_interval마다 한 번 한다.
+    쓰는 도중 죽어도 마지막 줄만 잘릴 뿐 앞의 기사들은 그대로 남는다.
+
+    on_rotate(path)가 있으면 날짜가 바뀌어 파일을 닫을 때마다 호출한다.
+    """
+
+    def __init__(self, directory=ARCHIVE_DIR, fsync_interval=FSYNC_INTERVAL, on_rotate=None):
+        self.directory = directory
+        self.fsync_interval = fsync_interval
+        self.on_rotate = on_rotate
+
+        self._lock = threading.Lock()
+        self._file = None
+        self._date = None
+        self._last_fsync = 0.0
+        os.makedirs(directory, exist_ok=True)
+
+    def path_for(self, date):
+        return os.path.join(self.directory, f"{date}.jsonl")
+
+    @property
+    def current_path(self):
+        return self.path_for(self._date) if self._date else None
+
+    def write(self, data):
+        line = json.dumps(data, ensure_ascii=False, default=str) + "\n"
+        today = datetime.now().strftime("%Y-%m-%d")
+
+        with self._lock:
+            if today != self._date:
+                self._rotate(today)
+            self._file.write(line)
+            self._file.flush()
+
+            now = time.monotonic()
+            if now - self._last_fsync >= self.fsync_interval:
+                os.fsync(self._file.fileno())
+                self._last_fsync = now
+
+    def _rotate(self, date):
+        closed_path = self._close_file()
+        self._date = date
+        self._file = open(self.path_for(date), "a", encoding="utf-8")
+        if closed_path and self.on_rotate:
+            self.on_rotate(closed_path)
+
+    def _close_file(self):
+        if self._file is None:
+            return None
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        self._file = None
+        return self.current_path
+
+    def close(self):
+        with self._lock:
+            self._close_file()
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+# 프로세스에서 공유하는 아카이브 writer (종료 시 fsync 후 닫기)
+def get_archive_writer():
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = JsonlArchiveWriter()
+            atexit.register(_writer.close)
+        return _writer
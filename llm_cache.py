@@ -0,0 +1,171 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from array import array
+
+# 캐시 파일 경로 (빈 값이면 캐시 사용 안 함)
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "./batch/data/llm_cache.sqlite3")
+# 캐시 최대 크기 (bytes, 기본 512MB)
+LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", 512 * 1024 * 1024))
+# 다른 프로세스가 쓰는 중일 때 lock을 기다리는 최대 시간 (초)
+LLM_CACHE_TIMEOUT = 5.0
+# 조회 시 accessed_at을 갱신하는 최소 간격 (초, LRU 순서에는 이 정도 오차면 충분)
+ACCESS_UPDATE_INTERVAL = 600
+# 이만큼 쓸 때마다 DB의 전체 크기를 다시 읽어서 정리 (여러 프로세스가 같은 파일을 쓰므로)
+EVICT_CHECK_BYTES = 1024 * 1024
+
+
+# 전처리된 본문 + 모델 이름 + 프롬프트 버전으로 캐시 키 생성
+def cache_key(kind, model, version, content):
+    digest = hashlib.sha256()
+    for part in (kind, model, str(version), content):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+# 임베딩은 float32 배열 그대로, 나머지 결과는 JSON으로 저장
+def _dumps(kind, value):
+    if kind == "embedding":
+        return array("f", value).tobytes()
+    return json.dumps(value, ensure_ascii=False).encode("utf-8")
+
+
+def _loads(kind, blob):
+    if kind == "embedding":
+        values = array("f")
+        values.frombytes(blob)
+        return values.tolist()
+    return json.loads(blob.decode("utf-8"))
+
+
+class LLMCache:
+    """
+    LLM 변환 결과(키워드/카테고리, 임베딩) 캐시
+    내용 해시를 키로 SQLite 파일에 저장하고, 전체 크기가 max_bytes를 넘으면
+    가장 오래 사용하지 않은 항목부터 지운다. (크기 기준 LRU)
+    SQLite 오류는 기록만 하고 조회는 miss, 저장은 건너뛴 것으로 처리한다.
+    """
+
+    def __init__(self, path=LLM_CACHE_PATH, max_bytes=LLM_CACHE_MAX_BYTES):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        self.max_bytes = max_bytes
+        self.hits = {}
+        self.misses = {}
+        self._lock = threading.Lock()
+
+        self.conn = sqlite3.connect(path, timeout=LLM_CACHE_TIMEOUT, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                value BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS llm_cache_accessed_at ON llm_cache (accessed_at)")
+        self.conn.commit()
+        self.total_bytes = self._db_bytes()
+        self._unchecked_bytes = 0
+
+    def _db_bytes(self):
+        return self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()[0]
+
+    def get(self, kind, key):
+        with self._lock:
+            try:
+                row = self.conn.execute("SELECT value, accessed_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+                if row is not None and time.time() - row[1] >= ACCESS_UPDATE_INTERVAL:
+                    self.conn.execute("UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (time.time(), key))
+                    self.conn.commit()
+            except sqlite3.Error as e:
+                print(f"LLM 캐시 조회 중 오류 발생: {e}")
+                self._rollback()
+                row = None
+
+            if row is None:
+                self.misses[kind] = self.misses.get(kind, 0) + 1
+                return None
+            self.hits[kind] = self.hits.get(kind, 0) + 1
+        return _loads(kind, row[0])
+
+    def set(self, kind, key, value):
+        blob = _dumps(kind, value)
+        with self._lock:
+            try:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO llm_cache (key, kind, value, size, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                    (key, kind, blob, len(blob), time.time()),
+                )
+                self.total_bytes += len(blob)
+                self._unchecked_bytes += len(blob)
+                if self._unchecked_bytes >= EVICT_CHECK_BYTES or self.total_bytes > self.max_bytes:
+                    self._evict()
+                self.conn.commit()
+            except sqlite3.Error as e:
+                print(f"LLM 캐시 저장 중 오류 발생: {e}")
+                self._rollback()
+
+    def _rollback(self):
+        try:
+            self.conn.rollback()
+        except sqlite3.Error:
+            pass
+
+    # 최대 크기를 넘으면 오래 사용하지 않은 순서로 삭제
+    # (다른 프로세스가 쓴 항목까지 포함하도록 전체 크기는 DB에서 다시 계산)
+    def _evict(self):
+        self._unchecked_bytes = 0
+        self.total_bytes = self._db_bytes()
+        while self.total_bytes > self.max_bytes:
+            rows = self.conn.execute(
+                "SELECT key, size FROM llm_cache ORDER BY accessed_at LIMIT 100"
+            ).fetchall()
+            if not rows:
+                self.total_bytes = 0
+                return
+            for key, size in rows:
+                self.conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self.total_bytes -= size
+                if self.total_bytes <= self.max_bytes:
+                    return
+
+    def stats(self):
+        with self._lock:
+            kinds = set(self.hits) | set(self.misses)
+            return {
+                "bytes": self.total_bytes,
+                "hits": dict(self.hits),
+                "misses": dict(self.misses),
+                "hit_rate": {
+                    kind: self.hits.get(kind, 0) / (self.hits.get(kind, 0) + self.misses.get(kind, 0))
+                    for kind in kinds
+                },
+            }
+
+    def close(self):
+        self.conn.close()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+# 프로세스에서 공유하는 캐시 (LLM_CACHE_PATH가 비어 있으면 None)
+def get_llm_cache():
+    global _cache
+    if not LLM_CACHE_PATH:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = LLMCache()
+        return _cache
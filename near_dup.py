@@ -0,0 +1,180 @@
+import re
+import threading
+import zlib
+from array import array
+from collections import OrderedDict
+
+import numpy as np
+
+# MinHash 서명 길이와 LSH 밴드 수 (밴드당 행 수 = NEAR_DUP_NUM_PERM / NEAR_DUP_BANDS)
+NEAR_DUP_NUM_PERM = 128
+NEAR_DUP_BANDS = 16
+# 추정 Jaccard 유사도가 이 값 이상이면 같은 기사로 본다
+NEAR_DUP_THRESHOLD = 0.8
+# 문자 n-gram 길이
+NEAR_DUP_SHINGLE_SIZE = 4
+# 이보다 짧은 본문은 비교하지 않음 ("본문 없음" 등)
+NEAR_DUP_MIN_CHARS = 100
+# 메모리에 올려둘 최근 기사 수
+NEAR_DUP_MAX_SIZE = 10_000
+
+_MERSENNE_PRIME = (1 << 31) - 1
+_NON_WORD = re.compile(r"[\W_]+")
+
+
+def shingles(content, size=NEAR_DUP_SHINGLE_SIZE):
+    """공백, 문장부호를 없앤 본문의 문자 n-gram 해시 집합 (프로세스가 달라도 같은 값)"""
+    text = _NON_WORD.sub("", content.lower())
+    return np.fromiter(
+        {zlib.crc32(text[i : i + size].encode("utf-8")) for i in range(len(text) - size + 1)},
+        dtype=np.uint64,
+    )
+
+
+class MinHasher:
+    """고정된 시드의 해시 함수 num_perm개로 MinHash 서명을 만든다."""
+
+    def __init__(self, num_perm=NEAR_DUP_NUM_PERM, seed=1):
+        rng = np.random.default_rng(seed)
+        # (a * x + b) mod p, p = 2^31 - 1이므로 a * x가 uint64를 넘지 않는다
+        self.a = rng.integers(1, _MERSENNE_PRIME, size=num_perm, dtype=np.uint64)[:, None]
+        self.b = rng.integers(0, _MERSENNE_PRIME, size=num_perm, dtype=np.uint64)[:, None]
+
+    def signature(self, hashes):
+        hashes = hashes % np.uint64(_MERSENNE_PRIME)
+        return ((self.a * hashes[None, :] + self.b) % np.uint64(_MERSENNE_PRIME)).min(axis=1)
+
+    def first(self, hashes):
+        """서명의 첫 번째 값만 계산 (signature(hashes)[0]과 같음)"""
+        hashes = hashes % np.uint64(_MERSENNE_PRIME)
+        return int(((self.a[0] * hashes + self.b[0]) % np.uint64(_MERSENNE_PRIME)).min())
+
+
+class NearDuplicateIndex:
+    """
+    MinHash LSH 기반 유사 기사 색인
+    최근 기사들의 MinHash 서명을 밴드별 버킷에 넣어두고, 새 기사와 버킷이 겹치는 후보만
+    서명으로 Jaccard 유사도를 추정해서 threshold 이상인 가장 비슷한 기사를 찾는다.
+
+    기사마다 키워드, 카테고리, 임베딩을 함께 보관해서 유사 기사는 전처리(OpenAI 호출) 없이 재사용한다.
+    max_size를 넘으면 오래된 기사부터 버린다.
+    """
+
+    def __init__(
+        self,
+        num_perm=NEAR_DUP_NUM_PERM,
+        bands=NEAR_DUP_BANDS,
+        threshold=NEAR_DUP_THRESHOLD,
+        min_chars=NEAR_DUP_MIN_CHARS,
+        max_size=NEAR_DUP_MAX_SIZE,
+    ):
+        if num_perm % bands:
+            raise ValueError("num_perm은 bands의 배수여야 합니다.")
+        self.hasher = MinHasher(num_perm)
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.min_chars = min_chars
+        self.max_size = max_size
+
+        self._lock = threading.Lock()
+        self._buckets = [{} for _ in range(bands)]
+        # url -> (서명, 키워드/카테고리, float32 임베딩)
+        self._articles = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._articles)
+
+    def signature(self, content):
+        """비교할 만큼 긴 본문이면 MinHash 서명, 아니면 None"""
+        if not content or len(content) < self.min_chars:
+            return None
+        hashes = shingles(content)
+        if not len(hashes):
+            return None
+        return self.hasher.signature(hashes)
+
+    def routing_key(self, content):
+        """
+        유사 기사끼리 같은 전처리 인스턴스로 보내기 위한 키 (서명의 첫 번째 MinHash 값, 비교하지 않는 본문이면 None)
+        두 기사의 MinHash 값이 같을 확률은 Jaccard 유사도와 같으므로, threshold 0.8 이상인 유사 기사는
+        80% 이상의 확률로 같은 인스턴스의 색인에서 만난다.
+        """
+        if not content or len(content) < self.min_chars:
+            return None
+        hashes = shingles(content)
+        if not len(hashes):
+            return None
+        return self.hasher.first(hashes)
+
+    def _band_keys(self, signature):
+        return [signature[i * self.rows : (i + 1) * self.rows].tobytes() for i in range(len(self._buckets))]
+
+    def find(self, signature):
+        """
+        서명이 가장 비슷한 기사의 (url, 유사도, 전처리 결과, 임베딩)
+        threshold 이상인 기사가 없으면 None
+        """
+        if signature is None:
+            return None
+
+        with self._lock:
+            candidates = set()
+            for bucket, key in zip(self._buckets, self._band_keys(signature)):
+                candidates.update(bucket.get(key, ()))
+
+            best, best_similarity = None, self.threshold
+            for url in candidates:
+                similarity = float(np.mean(self._articles[url][0] == signature))
+                if similarity >= best_similarity:
+                    best, best_similarity = url, similarity
+
+            if best is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._articles.move_to_end(best)
+            _, enrichment, embedding = self._articles[best]
+            return best, best_similarity, dict(enrichment), embedding.tolist()
+
+    def add(self, url, signature, enrichment, embedding):
+        if signature is None:
+            return
+        with self._lock:
+            if url in self._articles:
+                return
+            self._articles[url] = (
+                signature,
+                {"keywords": list(enrichment["keywords"]), "category": enrichment["category"]},
+                array("f", embedding),
+            )
+            for bucket, key in zip(self._buckets, self._band_keys(signature)):
+                bucket.setdefault(key, set()).add(url)
+            while len(self._articles) > self.max_size:
+                self._forget(*self._articles.popitem(last=False))
+
+    def _forget(self, url, article):
+        for bucket, key in zip(self._buckets, self._band_keys(article[0])):
+            urls = bucket.get(key)
+            if urls is not None:
+                urls.discard(url)
+                if not urls:
+                    del bucket[key]
+
+    def stats(self):
+        with self._lock:
+            return {"size": len(self._articles), "hits": self.hits, "misses": self.misses}
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+# 프로세스에서 공유하는 유사 기사 색인 (전처리 인스턴스마다 따로 가지므로, consumer는 routing_key로 유사 기사를 같은 인스턴스에 모은다)
+def get_near_dup_index():
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = NearDuplicateIndex()
+        return _index
@@ -0,0 +1,47 @@
+import hashlib
+import json
+
+try:
+    import msgpack
+except ImportError:  # msgpack 직렬화를 쓰지 않는 환경
+    msgpack = None
+
+# Kafka 메시지 직렬화 형식
+FORMATS = ("json", "msgpack")
+
+
+# 기사 데이터를 Kafka 메시지 값으로 직렬화하는 함수
+def encode_news(data, fmt="json"):
+    if fmt == "msgpack":
+        if msgpack is None:
+            raise RuntimeError("msgpack 직렬화를 사용하려면 msgpack 패키지가 필요합니다.")
+        return msgpack.packb(data, use_bin_type=True)
+    return json.dumps(data, ensure_ascii=False).encode("utf-8")
+
+
+def _is_msgpack(raw):
+    # 기사 데이터는 항상 map이므로 첫 바이트가 fixmap(0x80~0x8f) 또는 map16/map32(0xde, 0xdf)
+    return bool(raw) and (0x80 <= raw[0] <= 0x8F or raw[0] in (0xDE, 0xDF))
+
+
+def decode_news(raw):
+    """
+    Kafka 메시지 값을 기사 데이터로 역직렬화 (JSON / msgpack 자동 판별)
+    Flink의 SimpleStringSchema를 latin-1로 읽으면 바이트가 그대로 문자열에 담기므로 원래 바이트로 되돌린다.
+    """
+    if isinstance(raw, str):
+        try:
+            raw = raw.encode("latin-1")
+        except UnicodeEncodeError:  # 이미 디코딩된 JSON 문자열
+            return json.loads(raw)
+
+    if _is_msgpack(raw):
+        if msgpack is None:
+            raise RuntimeError("msgpack 메시지를 읽으려면 msgpack 패키지가 필요합니다.")
+        return msgpack.unpackb(raw, raw=False)
+    return json.loads(raw.decode("utf-8"))
+
+
+# 메시지 키: url 해시 (같은 url은 같은 파티션으로 가서 순서가 보장되고, 파티션에 고르게 분산)
+def url_key(url):
+    return hashlib.md5(url.encode("utf-8")).hexdigest().encode("ascii")
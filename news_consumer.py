@@ -2,95 +2,46 @@
 
 from pyflink.datastream import StreamExecutionEnvironment
 from pyflink.common.serialization import SimpleStringSchema
-from pyflink.datastream.connectors import FlinkKafkaConsumer
+from pyflink.datastream.connectors import FlinkKafkaConsumer, FlinkKafkaProducer
 from pyflink.common.typeinfo import Types
 from datetime import datetime
 from dotenv import load_dotenv
-import json
+import argparse
+import asyncio
 import os
-import psycopg2
-import subprocess
-from elasticsearch import Elasticsearch
-from openai_api import (
-    transform_classify_category,
-    transform_extract_keywords,
-    transform_to_embedding,
-)
+import zlib
+from async_enrich import ENRICH_CAPACITY, ENRICH_FAILED_TAG, ENRICH_TIMEOUT, AsyncEnrichFunction
+from embedding_batcher import get_embedding_batcher
+from es_sink import get_es_sink
+from hdfs_sink import get_hdfs_sink
+from jsonl_archive import get_archive_writer
+from near_dup import get_near_dup_index
+from news_codec import decode_news
+from openai_api import atransform_enrich, set_rate_limit_workers, transform_enrich
+from pg_writer import get_article_writer
+from related_articles import get_related_updater
 
 # 환경 설정
 load_dotenv()
-env = StreamExecutionEnvironment.get_execution_environment()
-
-# Elasticsearch 클라이언트 초기화
-es = Elasticsearch("http://localhost:9200")
-
-# Kafka connector JAR 등록
-kafka_connector_path = os.getenv("KAFKA_CONNECTOR_PATH")
-env.add_jars(f"file://{kafka_connector_path}")
 
 # Kafka Consumer 설정
 kafka_props = {
     "bootstrap.servers": "localhost:9092",
     "group.id": "flink_consumer_group",
 }
+# 전처리에 실패한 원본 메시지를 보내는 토픽 (news 토픽에 다시 넣어서 재처리)
+ENRICH_FAILED_TOPIC = "news_enrich_failed"
 
-consumer = FlinkKafkaConsumer(
-    topics="news", deserialization_schema=SimpleStringSchema(), properties=kafka_props
-)
-
-
-# PostgreSQL 저장 함수
-def save_to_postgres(data):
-    try:
-        conn = psycopg2.connect(
-            host="localhost",
-            dbname="news",
-            user=os.getenv("DB_USERNAME"),
-            password=os.getenv("DB_PASSWORD"),
-            port=5432,
-        )
-        cursor = conn.cursor()
-
-        cursor.execute(
-            """
-            INSERT INTO news_article (title, writer, write_date, category, content, url, keywords, embedding, views)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-            ON CONFLICT (url) DO NOTHING RETURNING id
-            """,
-            (
-                data["title"],
-                data["writer"],
-                data["write_date"],
-                data["category"],
-                data["content"],
-                data["url"],
-                json.dumps(data["keywords"], ensure_ascii=False),
-                json.dumps(data["embedding"]),
-                0,
-            ),
-        )
-        row = cursor.fetchone()
-        article_id = row[0] if row else -1
-
-        conn.commit()
-        cursor.close()
-        conn.close()
-
-        print(article_id, data["title"])
-        if article_id != -1:
-            print("PostgreSQL, ", end='')
-        return article_id
-    
-    except Exception as e:
-        print(f"PostgreSQL 저장 중 오류 발생: {e}")
+# 연산자 병렬도 (전처리 단계 / 저장 단계)
+ENRICH_PARALLELISM = 1
+SINK_PARALLELISM = 1
 
 
+# Elasticsearch에는 공유 bulk sink로 모아서 색인 (문서 id = 기사 id)
 def save_to_elasticsearch(id, data):
-    es = Elasticsearch("http://localhost:9200")
     try:
-        es.index(
-            index="news",
-            document={
+        get_es_sink().add(
+            {
                 "id": id,
                 "title": data["title"],
                 "writer": data["writer"],
@@ -99,7 +50,8 @@ def save_to_elasticsearch(id, data):
                 "content": data["content"],
                 "url": data["url"],
                 "keywords": data["keywords"],
-            }
+            },
+            doc_id=id,
         )
         print("ElasticSearch, ", end='')
         
@@ -107,83 +59,195 @@ def save_to_elasticsearch(id, data):
         print(f"ElasticSearch 저장 중 오류 발생: {e}")
 
 
+# 일자별 JSONL 파일에 한 줄씩 이어 쓰기
 def save_to_json(data):
     try:
-        write_date = datetime.now().strftime("%Y-%m-%d")
-        file_path = f"./batch/data/{write_date}.json"
-        os.makedirs("./batch/data", exist_ok=True)
-
-        if os.path.exists(file_path):
-            with open(file_path, "r", encoding="utf-8") as f:
-                existing_data = json.load(f)
-        else:
-            existing_data = []
-
         # embedding 제거하고 저장
         data_to_save = data.copy()
         if "embedding" in data_to_save:
             del data_to_save["embedding"]
 
-        existing_data.append(data_to_save)
-
-        with open(file_path, "w", encoding="utf-8") as f:
-            json.dump(existing_data, f, ensure_ascii=False, indent=2)
+        get_archive_writer().write(data_to_save)
         print("Json, ", end='')
     
     except Exception as e:
         print(f"Json 파일 저장 중 오류 발생: {e}")
 
 
+# HDFS에는 롤링 part 파일로 모아서 백그라운드로 업로드
 def save_to_hdfs(data):
     try:
-        write_date = datetime.now().strftime("%Y-%m-%d")
-        file_path = f"./batch/data/{write_date}.json"
-        hdfs_path = f"/news/{write_date}.json"
-
-        if os.path.exists(file_path):
-            subprocess.run(["hdfs", "dfs", "-mkdir", "-p", "/news"])
-            subprocess.run(["hdfs", "dfs", "-put", "-f", file_path, hdfs_path])
-        print("HDFS 저장 완료")
+        data_to_save = data.copy()
+        if "embedding" in data_to_save:
+            del data_to_save["embedding"]
+
+        get_hdfs_sink().write(data_to_save)
+        print("HDFS")
     
     except Exception as e:
         print(f"HDFS 저장 중 오류 발생: {e}")
 
 
+# 관련 기사 목록은 이웃 검색과 함께 배치로 모아서 갱신
+def save_related(article_id, data):
+    try:
+        get_related_updater().add(article_id, data["embedding"])
+    except Exception as e:
+        print(f"관련 기사 저장 중 오류 발생: {e}")
 
-# Kafka에서 가져온 데이터를 전처리하고 저장하는 함수
-def process_and_save(news_json):
-    news = json.loads(news_json)
 
-    content = news.get("content", "")
 
-    # 전처리 (OpenAI API 호출)
-    keywords = transform_extract_keywords(content)
-    category = transform_classify_category(content)
-    embedding = transform_to_embedding(content)
-
-    # DB에 저장할 데이터 구성
-    data = {
+# 전처리 결과로 DB에 저장할 데이터 구성
+def build_article(news, enrichment, embedding):
+    return {
         "title": news.get("title"),
         "writer": news.get("writer"),
         "write_date": news.get("write_date"),
-        "category": category,
-        "content": content,
+        "category": enrichment["category"],
+        "content": news.get("content", ""),
         "url": news.get("url"),
-        "keywords": keywords,
+        "keywords": enrichment["keywords"],
         "embedding": embedding,
     }
-    article_id = save_to_postgres(data)
-    if article_id != -1:
-        save_to_elasticsearch(article_id, data)
-        save_to_json(data)
-        save_to_hdfs(data)
 
 
-# Flink 데이터 흐름 연결
-stream = env.add_source(consumer)
+# 최근 기사 중 본문이 거의 같은 기사(통신사 기사 전재, 일부 수정 등)가 있으면
+# 그 기사의 키워드/카테고리와 임베딩을 그대로 쓰고 원본 기사 url을 duplicate_of로 남긴다
+def reuse_near_duplicate(news, signature):
+    found = get_near_dup_index().find(signature)
+    if found is None:
+        return None
+
+    canonical_url, similarity, enrichment, embedding = found
+    print(f"유사 기사 ({similarity:.2f}): {news.get('url')} -> {canonical_url}")
+    data = build_article(news, enrichment, embedding)
+    data["duplicate_of"] = canonical_url
+    return data
+
+
+# 기사 전처리 (OpenAI API 호출)
+# 임베딩은 마이크로 배치로 다른 기사들과 묶어서 요청하고, 그동안 키워드/카테고리를 한 번에 추출
+def enrich_article(news):
+    content = news.get("content", "")
+
+    signature = get_near_dup_index().signature(content)
+    duplicate = reuse_near_duplicate(news, signature)
+    if duplicate is not None:
+        return duplicate
+
+    embedding_future = get_embedding_batcher().submit(content)
+    enrichment = transform_enrich(content)
+    embedding = embedding_future.result()
+
+    get_near_dup_index().add(news.get("url"), signature, enrichment, embedding)
+    return build_article(news, enrichment, embedding)
+
+
+# enrich_article의 async 버전 (AsyncEnrichFunction에서 여러 기사를 동시에 전처리)
+async def aenrich_article(news):
+    content = news.get("content", "")
+
+    signature = get_near_dup_index().signature(content)
+    duplicate = reuse_near_duplicate(news, signature)
+    if duplicate is not None:
+        return duplicate
+
+    embedding_future = asyncio.wrap_future(get_embedding_batcher().submit(content))
+    enrichment = await atransform_enrich(content)
+    embedding = await embedding_future
+
+    get_near_dup_index().add(news.get("url"), signature, enrichment, embedding)
+    return build_article(news, enrichment, embedding)
+
+
+# 전처리된 기사를 저장하는 함수
+# PostgreSQL에는 배치로 모아서 저장하고, 새로 저장된 기사만 나머지 저장소에 반영
+def save_article(data):
+    get_article_writer(on_saved=save_to_sinks).write(data)
+    return data["url"]
+
 
-# Kafka에서 읽은 데이터를 파싱 + 전처리 + DB 저장
-stream.map(lambda x: process_and_save(x), output_type=Types.STRING())
+# PostgreSQL에 새로 저장된 기사를 나머지 저장소에 저장하는 함수
+def save_to_sinks(article_id, data):
+    print("PostgreSQL, ", end='')
+    save_to_elasticsearch(article_id, data)
+    save_to_json(data)
+    save_to_hdfs(data)
+    save_related(article_id, data)
 
-# Flink 작업 실행
-env.execute("Flink Kafka Consumer Job")
+
+# 전처리 단계의 키: 본문의 MinHash 값 (유사 기사 색인이 전처리 인스턴스마다 따로 있으므로 유사 기사를 같은 인스턴스로 보냄)
+# 비교하지 않는 짧은 본문은 메시지 해시로 고르게 나눔
+def enrich_key(raw):
+    key = get_near_dup_index().routing_key(decode_news(raw).get("content", ""))
+    return key if key is not None else zlib.crc32(raw.encode("utf-8"))
+
+
+# Kafka에서 가져온 데이터를 전처리하고 저장하는 함수 (한 건씩 동기 처리)
+def process_and_save(news_json):
+    save_article(enrich_article(decode_news(news_json)))
+
+
+def main(enrich_parallelism, enrich_capacity, enrich_timeout, sink_parallelism):
+    env = StreamExecutionEnvironment.get_execution_environment()
+
+    # Kafka connector JAR 등록
+    kafka_connector_path = os.getenv("KAFKA_CONNECTOR_PATH")
+    env.add_jars(f"file://{kafka_connector_path}")
+
+    # 메시지 값이 JSON 또는 msgpack이므로 latin-1로 읽어 바이트를 손실 없이 전달 (decode_news에서 판별)
+    consumer = FlinkKafkaConsumer(
+        topics="news",
+        deserialization_schema=SimpleStringSchema("ISO-8859-1"),
+        properties=kafka_props,
+    )
+
+    # Flink 데이터 흐름 연결
+    stream = env.add_source(consumer)
+
+    # 전처리 단계: 본문 MinHash 값을 키로 전처리 인스턴스들에 나누고, 인스턴스마다 여러 기사를 동시에 전처리
+    # (키를 병렬도로 나눈 나머지로 두면 키가 N개뿐이라 key group에 고르게 퍼지지 않음)
+    enriched = stream \
+        .key_by(enrich_key, key_type=Types.LONG()) \
+        .process(
+            AsyncEnrichFunction(
+                aenrich_article,
+                capacity=enrich_capacity,
+                timeout=enrich_timeout,
+                # 전처리 인스턴스들이 OpenAI 한도를 나눠 쓰도록 함
+                on_open=set_rate_limit_workers,
+            ),
+            output_type=Types.PICKLED_BYTE_ARRAY(),
+        ) \
+        .set_parallelism(enrich_parallelism)
+
+    # 시간 초과, 오류로 전처리하지 못한 기사는 원본 메시지 그대로 별도 토픽에 보관
+    enriched \
+        .get_side_output(ENRICH_FAILED_TAG) \
+        .add_sink(
+            FlinkKafkaProducer(
+                topic=ENRICH_FAILED_TOPIC,
+                serialization_schema=SimpleStringSchema("ISO-8859-1"),
+                producer_config={"bootstrap.servers": kafka_props["bootstrap.servers"]},
+            )
+        ) \
+        .set_parallelism(enrich_parallelism)
+
+    # 저장 단계: 전처리와 분리해서 저장소 지연이 전처리를 막지 않도록 함
+    enriched \
+        .map(save_article, output_type=Types.STRING()) \
+        .set_parallelism(sink_parallelism)
+
+    # Flink 작업 실행
+    env.execute("Flink Kafka Consumer Job")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--enrich-parallelism", type=int, default=ENRICH_PARALLELISM)
+    parser.add_argument("--enrich-capacity", type=int, default=ENRICH_CAPACITY, help="전처리 인스턴스당 동시 처리 기사 수")
+    parser.add_argument("--enrich-timeout", type=float, default=ENRICH_TIMEOUT, help="기사 하나의 전처리 제한 시간 (초)")
+    parser.add_argument("--sink-parallelism", type=int, default=SINK_PARALLELISM)
+    args = parser.parse_args()
+
+    main(args.enrich_parallelism, args.enrich_capacity, args.enrich_timeout, args.sink_parallelism)
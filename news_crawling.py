@@ -1,29 +1,27 @@
+import asyncio
 import psycopg2
 import os
 from dotenv import load_dotenv
-import feedparser
 import requests
-from bs4 import BeautifulSoup
+from html_extract import BodyExtractor
 from datetime import datetime
 
 # 환경변수 불러오기
 load_dotenv()
 
-conn = psycopg2.connect(
-    host="localhost",
-    dbname="news",
-    user=os.getenv("DB_USERNAME"),
-    password=os.getenv("DB_PASSWORD"),
-)
-cur = conn.cursor()
 
-# RSS 피드 URL (예: Khan 뉴스 RSS)
-RSS_FEED_URL1 = "https://www.khan.co.kr/rss/rssdata/total_news.xml"
-RSS_FEED_URL2 = "https://rss.ohmynews.com/rss/ohmynews.xml"
+# DB 연결 생성 (import 시점이 아닌 main 실행 시점에 연결)
+def connect_db():
+    return psycopg2.connect(
+        host="localhost",
+        dbname="news",
+        user=os.getenv("DB_USERNAME"),
+        password=os.getenv("DB_PASSWORD"),
+    )
 
 
 # 뉴스 데이터를 db로 저장하는 함수
-def save_to_db(data):
+def save_to_db(cur, data):
     insert_query = """
     INSERT INTO news_article (title, writer, write_date, category, content, url)
     VALUES (%s, %s, %s, %s, %s, %s)
@@ -40,7 +38,6 @@ def save_to_db(data):
             data["url"],
         ),
     )
-    conn.commit()
 
 
 # 작성자 정보 전처리하는 함수
@@ -66,74 +63,53 @@ def format_date(iso_date_str):
         return "날짜 형식 오류"
 
 
+# 출처별 본문 추출 규칙
+# 경향신문: 기사 페이지의 본문 문단
+KHAN_CONTENT = BodyExtractor("p.content_text.text-l", empty="본문 없음")
+# 오마이뉴스: RSS description의 글자만, "전체 내용보기" 링크 앞까지
+OHMYNEWS_DESCRIPTION = BodyExtractor(None, separator="", cut_marker="전체 내용보기")
+
+
 # description을 깔끔하게 글자만 추출하는 함수
 def clean_description(raw_html):
-    soup = BeautifulSoup(raw_html, "html.parser")
-    text = soup.get_text(strip=True)
-    trimmed_text = text.split("전체 내용보기")[0].strip()
-    return trimmed_text
+    return OHMYNEWS_DESCRIPTION(raw_html)
+
+
+# 크롤링 요청 헤더
+CRAWL_HEADERS = {"User-Agent": "Mozilla/5.0"}
 
 
 # 뉴스 내용 크롤링
 def crawl_article(url):
-    headers = {"User-Agent": "Mozilla/5.0"}
-    response = requests.get(url, headers=headers)
+    response = requests.get(url, headers=CRAWL_HEADERS)
     response.raise_for_status()
-    soup = BeautifulSoup(response.text, "html.parser")
+    return extract_content(response.text)
 
-    content_tag = soup.find_all("p", class_="content_text text-l")
-    if not content_tag:
-        return "본문 없음"  # ← 예외 처리 추가
 
-    content_text = "\n\n".join([tag.text.strip() for tag in content_tag])
-    return content_text
+# 기사 HTML에서 본문만 추출하는 함수
+def extract_content(html):
+    return KHAN_CONTENT(html)
 
 
 # 메인 함수
 def main():
-    print("경향신문 RSS 피드를 확인하는 중 ...")
-    feed = feedparser.parse(RSS_FEED_URL1)
-
-    for entry in feed.entries:
-        title = entry.get("title", "제목없음")
-        writer = clean_writer(entry.get("author", "작성자 없음"))
-        write_date = format_date(entry.get("date", "날짜 없음"))
-        category = entry.get("category", "카테고리 없음")
-        content = crawl_article(entry.link)
-        url = entry.link
-
-        # DB에 저장
-        data = {
-            "title": title,
-            "writer": writer,
-            "write_date": write_date if write_date != "날짜 형식 오류" else None,
-            "category": category,
-            "content": content,
-            "url": url,
-        }
-        save_to_db(data)
-
-    print("오 마이 뉴스 RSS 피드를 확인하는 중 ...")
-    feed = feedparser.parse(RSS_FEED_URL2)
-
-    for entry in feed.entries:
-        title = entry.get("title", "제목없음")
-        writer = entry.get("author", "작성자 없음")
-        write_date = format_date(entry.get("published", "날짜 없음"))
-        category = entry.get("category", "카테고리 없음")
-        content = clean_description(entry.get("description", ""))
-        url = entry.link
-
-        # DB에 저장
-        data = {
-            "title": title,
-            "writer": writer,
-            "write_date": write_date if write_date != "날짜 형식 오류" else None,
-            "category": category,
-            "content": content,
-            "url": url,
-        }
-        save_to_db(data)
+    # news_sources가 이 모듈의 전처리 함수를 사용하므로 실행 시점에 import
+    from news_fetcher import ArticleFetcher
+    from news_sources import get_sources, poll_sources_once
+
+    conn = connect_db()
+    cur = conn.cursor()
+
+    async def handle_article(data):
+        save_to_db(cur, data)
+
+    # 등록된 모든 출처를 동시에 확인
+    async def run():
+        async with ArticleFetcher() as fetcher:
+            await poll_sources_once(get_sources(), fetcher, handle_article)
+
+    asyncio.run(run())
+    conn.commit()
 
     cur.close()
     conn.close()
@@ -0,0 +1,109 @@
+import asyncio
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from news_crawling import CRAWL_HEADERS, extract_content
+
+# 전체 동시 요청 수
+FETCH_CONCURRENCY = 16
+# 호스트별 최대 연결 수
+FETCH_PER_HOST = 4
+# 요청 하나당 타임아웃 (초)
+FETCH_TIMEOUT = 10
+# keep-alive 연결 유지 시간 (초)
+KEEPALIVE_TIMEOUT = 30
+
+
+class ArticleFetcher:
+    """
+    비동기 기사 본문 수집기
+    keep-alive 세션을 재사용하면서 전체 동시 요청 수와 호스트별 연결 수를 제한한다.
+
+    사용 예)
+        async with ArticleFetcher() as fetcher:
+            async for url, content in fetcher.fetch_each(urls):
+                ...
+    """
+
+    def __init__(
+        self,
+        concurrency=FETCH_CONCURRENCY,
+        per_host=FETCH_PER_HOST,
+        timeout=FETCH_TIMEOUT,
+        extract=extract_content,
+    ):
+        self.concurrency = concurrency
+        self.per_host = per_host
+        self.timeout = timeout
+        self.extract = extract
+        self._session = None
+        self._semaphore = None
+
+    async def __aenter__(self):
+        await self.open()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def open(self):
+        if self._session is None:
+            connector = aiohttp.TCPConnector(
+                limit=self.concurrency,
+                limit_per_host=self.per_host,
+                keepalive_timeout=KEEPALIVE_TIMEOUT,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                headers=CRAWL_HEADERS,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def fetch(self, url, extract=None):
+        """기사 한 건을 내려받아 본문을 추출한다. (extract가 없으면 기본 추출 함수 사용)"""
+        async with self._semaphore:
+            async with self._session.get(url) as response:
+                response.raise_for_status()
+                html = await response.text()
+
+        # HTML 파싱은 CPU 작업이므로 이벤트 루프를 막지 않도록 스레드에서 실행
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, extract or self.extract, html)
+
+    async def _fetch_with_url(self, url, extract):
+        try:
+            return url, await self.fetch(url, extract)
+        except Exception as e:
+            print(f"기사 수집 중 오류 발생 ({urlsplit(url).netloc}): {e}")
+            return url, None
+
+    async def fetch_each(self, urls, extract=None):
+        """
+        여러 기사를 동시에 내려받고, 끝나는 순서대로 (url, content)를 돌려준다.
+        수집에 실패한 기사는 건너뛴다.
+        """
+        tasks = [asyncio.ensure_future(self._fetch_with_url(url, extract)) for url in urls]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                url, content = await next_done
+                if content is not None:
+                    yield url, content
+        finally:
+            for task in tasks:
+                task.cancel()
+
+
+# 동기 코드에서 사용할 수 있는 일괄 수집 함수
+def fetch_articles(urls, **kwargs):
+    async def run():
+        async with ArticleFetcher(**kwargs) as fetcher:
+            return {url: content async for url, content in fetcher.fetch_each(urls)}
+
+    return asyncio.run(run())
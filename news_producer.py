@@ -1,51 +1,86 @@
 from kafka import KafkaProducer
-import feedparser
-import json
-import time
-from news_crawling import clean_writer, format_date, crawl_article
+import argparse
+import asyncio
+from functools import partial
+from dedup_store import DEDUP_DB_PATH, DEDUP_TTL, create_dedup_store
+from news_codec import FORMATS, encode_news, url_key
+from news_crawling import connect_db
+from news_fetcher import ArticleFetcher
+from news_sources import SOURCES, get_sources, run_scheduler
 
 # Kafka 브로커 주소
 KAFKA_BROKER = "localhost:9092"
 # Kafka 토픽 이름
 TOPIC = "news"
 
-# Kafka Producer 생성 (value는 JSON 직렬화)
-producer = KafkaProducer(
-    bootstrap_servers=KAFKA_BROKER,
-    value_serializer=lambda v: json.dumps(v).encode("utf-8"),
-)
-
-RSS_FEED_URL = "https://www.khan.co.kr/rss/rssdata/total_news.xml"
-
-collected_url = []
-
-while True:
-    print("경향신문 RSS 피드를 확인하는 중 ...")
-    feed = feedparser.parse(RSS_FEED_URL)
-
-    for entry in feed.entries:
-        # 중복 확인
-        if entry.link not in collected_url:
-            title = entry.get("title", "제목없음")
-            writer = clean_writer(entry.get("author", "작성자 없음"))
-            write_date = format_date(entry.get("date", "날짜 없음"))
-            category = entry.get("category", "카테고리 없음")
-            content = crawl_article(entry.link)
-            url = entry.link
-
-            # DB에 저장
-            data = {
-                "title": title,
-                "writer": writer,
-                "write_date": write_date if write_date != "날짜 형식 오류" else None,
-                # "category": category,
-                "content": content,
-                "url": url,
-            }
-            producer.send(TOPIC, data)
-
-            print(title)
-            collected_url.append(url)  # url 저장
-
-    producer.flush()
-    time.sleep(60)
+# 배치 전송 설정 (기사 본문이 크므로 조금 기다렸다가 모아서 압축 전송)
+LINGER_MS = 20
+BATCH_SIZE = 256 * 1024
+COMPRESSION_TYPE = "zstd"
+
+
+# Kafka Producer 생성 (value는 JSON 또는 msgpack 직렬화, key는 url 해시)
+def create_producer(
+    fmt="json",
+    compression_type=COMPRESSION_TYPE,
+    linger_ms=LINGER_MS,
+    batch_size=BATCH_SIZE,
+):
+    return KafkaProducer(
+        bootstrap_servers=KAFKA_BROKER,
+        value_serializer=partial(encode_news, fmt=fmt),
+        compression_type=compression_type,
+        linger_ms=linger_ms,
+        batch_size=batch_size,
+    )
+
+
+async def main(sources, collected_url, producer_options):
+    producer = create_producer(**producer_options)
+
+    # 크롤링이 끝난 기사부터 바로 Kafka로 전송 (카테고리는 consumer에서 분류)
+    async def handle_article(data):
+        data.pop("category", None)
+        producer.send(TOPIC, value=data, key=url_key(data["url"]))
+        print(data["title"])
+
+    # 브로커 전송이 끝난 뒤에 url 저장 (전송 전에 죽으면 다음 실행에서 다시 수집)
+    async def after_poll(source, articles):
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, producer.flush)
+        collected_url.add_many(article["url"] for article in articles)
+        collected_url.evict_expired()
+
+    async with ArticleFetcher() as fetcher:
+        await run_scheduler(sources, fetcher, handle_article, after_poll, collected_url)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sources", nargs="*", choices=sorted(SOURCES), help="수집할 뉴스 출처 (기본: 전체)")
+    parser.add_argument("--dedup-path", default=DEDUP_DB_PATH, help="수집한 url 저장 파일 (빈 값이면 메모리만 사용)")
+    parser.add_argument("--dedup-ttl", type=int, default=DEDUP_TTL, help="url을 기억하는 기간 (초)")
+    parser.add_argument("--seed-from-db", action="store_true", help="news_article.url로 중복 저장소 초기화")
+    parser.add_argument("--format", choices=FORMATS, default="json", help="메시지 직렬화 형식 (consumer가 자동 판별)")
+    parser.add_argument("--compression", choices=["none", "gzip", "snappy", "lz4", "zstd"], default=COMPRESSION_TYPE)
+    parser.add_argument("--linger-ms", type=int, default=LINGER_MS)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    args = parser.parse_args()
+
+    producer_options = {
+        "fmt": args.format,
+        "compression_type": None if args.compression == "none" else args.compression,
+        "linger_ms": args.linger_ms,
+        "batch_size": args.batch_size,
+    }
+
+    collected_url = create_dedup_store(args.dedup_path, args.dedup_ttl)
+    if args.seed_from_db:
+        conn = connect_db()
+        collected_url.seed_from_postgres(conn)
+        conn.close()
+
+    try:
+        asyncio.run(main(get_sources(args.sources), collected_url, producer_options))
+    finally:
+        collected_url.close()
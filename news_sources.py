@@ -0,0 +1,178 @@
+import asyncio
+import time
+
+import feedparser
+
+from news_crawling import KHAN_CONTENT, OHMYNEWS_DESCRIPTION, clean_writer, format_date
+
+
+class NewsSource:
+    """
+    뉴스 출처 어댑터
+    RSS 주소, 항목 필드 이름(작성자/날짜), 작성자 전처리와 본문 추출 방법을 선언한다.
+
+    - page_extractor: 기사 링크를 크롤링한 HTML에서 본문을 추출 (경향신문)
+    - entry_extractor: RSS 항목(description 등)에서 바로 본문을 추출 (오마이뉴스)
+    """
+
+    def __init__(
+        self,
+        name,
+        label,
+        feed_url,
+        writer_field="author",
+        date_field="date",
+        writer_cleaner=None,
+        page_extractor=None,
+        entry_extractor=None,
+        interval=60,
+    ):
+        if (page_extractor is None) == (entry_extractor is None):
+            raise ValueError("page_extractor와 entry_extractor 중 하나만 지정해야 합니다.")
+
+        self.name = name
+        self.label = label
+        self.feed_url = feed_url
+        self.writer_field = writer_field
+        self.date_field = date_field
+        self.writer_cleaner = writer_cleaner
+        self.page_extractor = page_extractor
+        self.entry_extractor = entry_extractor
+        self.interval = interval
+
+    def parse_feed(self):
+        return feedparser.parse(self.feed_url).entries
+
+    # RSS 항목과 본문으로 기사 데이터를 구성하는 함수
+    def build_article(self, entry, content):
+        writer = entry.get(self.writer_field, "작성자 없음")
+        if self.writer_cleaner:
+            writer = self.writer_cleaner(writer)
+        write_date = format_date(entry.get(self.date_field, "날짜 없음"))
+
+        return {
+            "title": entry.get("title", "제목없음"),
+            "writer": writer,
+            "write_date": write_date if write_date != "날짜 형식 오류" else None,
+            "category": entry.get("category", "카테고리 없음"),
+            "content": content,
+            "url": entry.link,
+            "source": self.name,
+        }
+
+    async def collect(self, fetcher, entries):
+        """
+        RSS 항목들의 본문을 구해 완료되는 순서대로 기사 데이터를 돌려준다.
+        페이지 크롤링이 필요한 출처는 fetcher로 동시에 내려받는다.
+        """
+        if self.entry_extractor:
+            for entry in entries:
+                yield self.build_article(entry, self.entry_extractor(entry))
+            return
+
+        by_url = {entry.link: entry for entry in entries}
+        async for url, content in fetcher.fetch_each(by_url, self.page_extractor):
+            yield self.build_article(by_url[url], content)
+
+
+# 등록된 뉴스 출처 목록
+SOURCES = {}
+
+
+def register_source(source):
+    if source.name in SOURCES:
+        raise ValueError(f"이미 등록된 뉴스 출처입니다: {source.name}")
+    SOURCES[source.name] = source
+    return source
+
+
+# 이름으로 출처 목록 조회 (names가 없으면 전체)
+def get_sources(names=None):
+    if not names:
+        return list(SOURCES.values())
+    return [SOURCES[name] for name in names]
+
+
+register_source(
+    NewsSource(
+        name="khan",
+        label="경향신문",
+        feed_url="https://www.khan.co.kr/rss/rssdata/total_news.xml",
+        writer_field="author",
+        date_field="date",
+        writer_cleaner=clean_writer,
+        page_extractor=KHAN_CONTENT,
+    )
+)
+
+register_source(
+    NewsSource(
+        name="ohmynews",
+        label="오마이뉴스",
+        feed_url="https://rss.ohmynews.com/rss/ohmynews.xml",
+        writer_field="author",
+        date_field="published",
+        entry_extractor=lambda entry: OHMYNEWS_DESCRIPTION(entry.get("description", "")),
+    )
+)
+
+
+# 출처 하나의 RSS를 한 번 확인하고, 새 기사를 완료되는 대로 handle_article로 넘기는 함수
+async def poll_source_once(source, fetcher, handle_article, collected_url=None):
+    print(f"{source.label} RSS 피드를 확인하는 중 ...")
+    loop = asyncio.get_running_loop()
+    entries = await loop.run_in_executor(None, source.parse_feed)
+
+    # 중복 확인
+    if collected_url is not None:
+        entries = [entry for entry in entries if entry.link not in collected_url]
+
+    collected = []
+    async for article in source.collect(fetcher, entries):
+        await handle_article(article)
+        collected.append(article)
+    return collected
+
+
+# 모든 출처를 동시에 한 번씩 확인하는 함수
+async def poll_sources_once(sources, fetcher, handle_article, collected_url=None):
+    results = await asyncio.gather(
+        *(poll_source_once(source, fetcher, handle_article, collected_url) for source in sources),
+        return_exceptions=True,
+    )
+
+    collected = []
+    for source, result in zip(sources, results):
+        if isinstance(result, Exception):
+            print(f"{source.label} RSS 처리 중 오류 발생: {result}")
+        else:
+            collected.extend(result)
+    return collected
+
+
+async def _poll_forever(source, fetcher, handle_article, after_poll, collected_url):
+    while True:
+        started = time.monotonic()
+        try:
+            collected = await poll_source_once(source, fetcher, handle_article, collected_url)
+            if after_poll:
+                await after_poll(source, collected)
+        except Exception as e:
+            print(f"{source.label} RSS 처리 중 오류 발생: {e}")
+
+        # 출처마다 자기 주기에 맞춰 다음 확인 (처리에 걸린 시간만큼 빼고 대기)
+        await asyncio.sleep(max(0, source.interval - (time.monotonic() - started)))
+
+
+async def run_scheduler(sources, fetcher, handle_article, after_poll=None, collected_url=None):
+    """
+    출처별로 독립된 주기로 RSS를 동시에 확인하는 스케줄러
+    출처가 늘어나도 한 출처의 처리 시간이 다른 출처의 확인 주기를 늦추지 않는다.
+    after_poll(source, articles)는 출처 한 번의 확인이 끝날 때마다 호출된다.
+    """
+    await asyncio.gather(
+        *(
+            _poll_forever(source, fetcher, handle_article, after_poll, collected_url)
+            for source in sources
+        )
+    )
@@ -1,27 +1,379 @@
-from openai import OpenAI
+import asyncio
+import json
+import os
+import threading
+import time
+import weakref
+from functools import lru_cache
+
+from openai import (
+    APIConnectionError,
+    APITimeoutError,
+    AsyncOpenAI,
+    InternalServerError,
+    OpenAI,
+    RateLimitError,
+)
 from dotenv import load_dotenv
+from llm_cache import cache_key, get_llm_cache
+from rate_limiter import RateLimiter, backoff_delay
 
 load_dotenv()
 
+CHAT_MODEL = "gpt-4o-mini"
+EMBEDDING_MODEL = "text-embedding-3-small"
+# 임베딩 차원 (news.models.EMBEDDING_DIMENSIONS, 마이그레이션의 embedding 컬럼, HNSW 인덱스와 같아야 함)
+EMBEDDING_DIMENSIONS = 1536
+
+ALLOWED_CATEGORIES = [
+    "IT_과학",
+    "건강",
+    "경제",
+    "교육",
+    "국제",
+    "라이프스타일",
+    "문화",
+    "사건사고",
+    "사회일반",
+    "산업",
+    "스포츠",
+    "여성복지",
+    "여행레저",
+    "연예",
+    "정치",
+    "지역",
+    "취미",
+]
+UNCLASSIFIED_CATEGORY = "미분류"
+
+# 본문 최대 토큰 수
+MAX_CONTENT_TOKENS = 5000
+# async 변환 함수의 최대 동시 요청 수
+ASYNC_CONCURRENCY = 8
+# 키워드/카테고리 응답 최대 토큰 수
+ENRICH_MAX_TOKENS = 150
+
+# 모델별 분당 요청 수(RPM), 토큰 수(TPM) 한도 (API 키 전체 기준)
+# 한도는 프로세스마다 따로 관리하므로, 같은 키를 쓰는 프로세스 수(Flink 전처리 병렬도)로 나눠서 쓴다
+RATE_LIMITS = {
+    CHAT_MODEL: (
+        int(os.getenv("OPENAI_CHAT_RPM", 500)),
+        int(os.getenv("OPENAI_CHAT_TPM", 200_000)),
+    ),
+    EMBEDDING_MODEL: (
+        int(os.getenv("OPENAI_EMBEDDING_RPM", 3_000)),
+        int(os.getenv("OPENAI_EMBEDDING_TPM", 1_000_000)),
+    ),
+}
+# 429, 일시적 오류에 대한 최대 재시도 횟수
+OPENAI_MAX_RETRIES = 5
+RETRYABLE_ERRORS = (RateLimitError, APITimeoutError, APIConnectionError, InternalServerError)
+
+# 프롬프트를 바꾸면 버전을 올려 이전 캐시 결과를 쓰지 않도록 함
+ENRICH_PROMPT_VERSION = 1
+ENRICH_PROMPT = f"""다음 뉴스 본문을 읽고 주요 키워드 5개와 가장 적절한 카테고리 하나를 골라 JSON으로만 답변하세요.
+카테고리 목록: {", ".join(ALLOWED_CATEGORIES)}.
+형식: {{"keywords": ["경제", "시장", "금리", "주식", "소비자"], "category": "경제"}}"""
+
+
+# 공유 리소스 (처음 사용할 때 한 번만 생성해서 재사용)
+_resource_lock = threading.Lock()
+_client = None
+_encoding = None
+# AsyncOpenAI 클라이언트와 세마포어는 이벤트 루프마다 따로 둔다
+_async_resources = weakref.WeakKeyDictionary()
+_async_client_factory = None
+_rate_limiters = {}
+_rate_limit_workers = int(os.getenv("OPENAI_RATE_LIMIT_WORKERS", 1))
+
+
+def get_client():
+    """프로세스에서 공유하는 OpenAI 클라이언트"""
+    global _client
+    if _client is None:
+        with _resource_lock:
+            if _client is None:
+                # 재시도는 rate limiter와 함께 직접 처리
+                _client = OpenAI(max_retries=0)
+    return _client
+
+
+def get_encoding():
+    """프로세스에서 공유하는 tiktoken 인코더"""
+    global _encoding
+    if _encoding is None:
+        with _resource_lock:
+            if _encoding is None:
+                import tiktoken
+
+                _encoding = tiktoken.get_encoding("cl100k_base")
+    return _encoding
+
+
+def _get_async_resources():
+    loop = asyncio.get_running_loop()
+    resources = _async_resources.get(loop)
+    if resources is None:
+        client = _async_client_factory() if _async_client_factory else AsyncOpenAI(max_retries=0)
+        resources = (client, asyncio.Semaphore(ASYNC_CONCURRENCY))
+        _async_resources[loop] = resources
+    return resources
+
+
+def get_async_client():
+    """현재 이벤트 루프에서 공유하는 AsyncOpenAI 클라이언트"""
+    return _get_async_resources()[0]
+
+
+def use_backend(client, async_client_factory=None):
+    """
+    OpenAI 대신 같은 인터페이스(chat.completions.create, embeddings.create)를 가진 클라이언트를 사용
+    (오프라인 벤치마크에서 가짜 백엔드를 끼울 때 사용, async_client_factory는 이벤트 루프마다 호출)
+    """
+    global _client, _async_client_factory
+    with _resource_lock:
+        _client = client
+        _async_client_factory = async_client_factory
+        _async_resources.clear()
+
+
+def set_rate_limit_workers(workers):
+    """
+    같은 API 키를 함께 쓰는 프로세스 수 설정 (기본값은 환경 변수 OPENAI_RATE_LIMIT_WORKERS)
+    프로세스마다 RATE_LIMITS를 이 수로 나눈 만큼만 쓰므로 전체 요청량이 키의 한도를 넘지 않는다.
+    """
+    global _rate_limit_workers
+    with _resource_lock:
+        if workers != _rate_limit_workers:
+            _rate_limit_workers = max(1, workers)
+            _rate_limiters.clear()
+
+
+def get_rate_limiter(model):
+    """모델별로 프로세스에서 공유하는 RateLimiter (RATE_LIMITS를 프로세스 수로 나눈 한도)"""
+    limiter = _rate_limiters.get(model)
+    if limiter is None:
+        with _resource_lock:
+            limiter = _rate_limiters.get(model)
+            if limiter is None:
+                rpm, tpm = RATE_LIMITS[model]
+                limiter = RateLimiter(max(1, rpm // _rate_limit_workers), max(1, tpm // _rate_limit_workers))
+                _rate_limiters[model] = limiter
+    return limiter
+
+
+# 응답 헤더의 Retry-After (초)
+def _retry_after(error):
+    response = getattr(error, "response", None)
+    headers = response.headers if response is not None else {}
+    try:
+        if "retry-after-ms" in headers:
+            return float(headers["retry-after-ms"]) / 1000
+        if "retry-after" in headers:
+            return float(headers["retry-after"])
+    except ValueError:
+        pass
+    return None
+
+
+def _retry_delay(limiter, error, attempt):
+    if isinstance(error, RateLimitError):
+        delay = _retry_after(error) or backoff_delay(attempt)
+        limiter.penalize(delay)
+        return delay
+    return backoff_delay(attempt)
+
+
+def _call_with_rate_limit(model, tokens, request):
+    """
+    RPM/TPM 한도 안에서 요청을 보내고, 429나 일시적 오류는
+    Retry-After(없으면 jitter를 준 지수 백오프)만큼 기다렸다가 다시 보낸다.
+    """
+    limiter = get_rate_limiter(model)
+    for attempt in range(OPENAI_MAX_RETRIES + 1):
+        limiter.acquire(tokens)
+        try:
+            return request()
+        except RETRYABLE_ERRORS as e:
+            if attempt == OPENAI_MAX_RETRIES:
+                raise
+            time.sleep(_retry_delay(limiter, e, attempt))
+
+
+async def _acall_with_rate_limit(model, tokens, request):
+    """
+    _call_with_rate_limit의 async 버전 (request는 코루틴을 돌려주는 함수)
+    동시 요청 수(ASYNC_CONCURRENCY) 자리는 요청을 보내는 동안만 잡고, 재시도 전에 기다리는 동안에는 놓는다.
+    """
+    limiter = get_rate_limiter(model)
+    semaphore = _get_async_resources()[1]
+    for attempt in range(OPENAI_MAX_RETRIES + 1):
+        try:
+            async with semaphore:
+                await limiter.aacquire(tokens)
+                return await request()
+        except RETRYABLE_ERRORS as e:
+            if attempt == OPENAI_MAX_RETRIES:
+                raise
+            await asyncio.sleep(_retry_delay(limiter, e, attempt))
+
+
+def warm_up():
+    """
+    클라이언트와 인코더를 미리 만들어 첫 기사 처리 지연을 줄인다.
+    (tiktoken은 처음 사용할 때 인코딩 파일을 내려받고 로드함)
+    """
+    get_client()
+    get_encoding().encode("warm up")
+
+
+# 같은 기사를 키워드/카테고리, 임베딩에서 반복해서 토큰화하지 않도록 최근 결과를 기억
+@lru_cache(maxsize=256)
+def _preprocess(content):
+    """전처리한 본문과 토큰 수"""
+    if not content:
+        return "", 0
+
+    encoding = get_encoding()
+    tokens = encoding.encode(content)
+
+    if len(tokens) > MAX_CONTENT_TOKENS:
+        truncated_tokens = tokens[:MAX_CONTENT_TOKENS]
+        return encoding.decode(truncated_tokens), MAX_CONTENT_TOKENS
+
+    return content, len(tokens)
+
 
 def preprocess_content(content):
     """
     데이터 전처리 - 텍스트 길이 제한  (5000 토큰)
     토큰 수를 제한하여 처리 효율성 확보
     """
-    import tiktoken
+    return _preprocess(content)[0]
 
-    if not content:
-        return ""
 
-    encoding = tiktoken.get_encoding("cl100k_base")
-    tokens = encoding.encode(content)
+# 키워드/카테고리 요청 하나가 쓰는 토큰 수 추정 (시스템 프롬프트 + 본문 + 최대 응답)
+@lru_cache(maxsize=1)
+def _enrich_prompt_tokens():
+    return len(get_encoding().encode(ENRICH_PROMPT))
+
+
+def _enrich_token_estimate(content_tokens):
+    return _enrich_prompt_tokens() + content_tokens + ENRICH_MAX_TOKENS
 
-    if len(tokens) > 5000:
-        truncated_tokens = tokens[:5000]
-        return encoding.decode(truncated_tokens)
 
-    return content
+def _load_enrichment(model_output):
+    """모델의 JSON 응답 (깨진 응답이면 None)"""
+    try:
+        result = json.loads(model_output)
+    except (TypeError, json.JSONDecodeError):
+        return None
+    return result if isinstance(result, dict) else None
+
+
+def parse_enrichment(model_output):
+    """
+    모델의 JSON 응답을 키워드 목록과 카테고리로 정리
+    허용되지 않은 카테고리나 깨진 응답은 '미분류'로 처리
+    """
+    result = _load_enrichment(model_output) or {}
+
+    keywords = result.get("keywords", [])
+    if isinstance(keywords, str):
+        keywords = keywords.split(",")
+    if not isinstance(keywords, list):
+        keywords = []
+    keywords = [str(keyword).strip() for keyword in keywords if str(keyword).strip()][:5]
+
+    category = str(result.get("category", "")).strip()
+    if category not in ALLOWED_CATEGORIES:
+        category = UNCLASSIFIED_CATEGORY
+
+    return {"keywords": keywords, "category": category}
+
+
+def _enrichment_from_response(response):
+    """
+    응답의 키워드/카테고리와 캐시에 저장해도 되는지 여부
+    응답이 max_tokens에서 잘렸거나, 깨진 JSON이나 허용되지 않은 카테고리라서 '미분류'로 대신한 결과는
+    다음에 다시 요청하도록 캐시하지 않는다.
+    """
+    choice = response.choices[0]
+    result = parse_enrichment(choice.message.content)
+    loaded = _load_enrichment(choice.message.content)
+    cacheable = (
+        choice.finish_reason != "length"
+        and loaded is not None
+        and str(loaded.get("category", "")).strip() == result["category"]
+    )
+    return result, cacheable
+
+
+def _enrich_messages(content):
+    return [
+        {"role": "system", "content": ENRICH_PROMPT},
+        {"role": "user", "content": content},
+    ]
+
+
+def transform_enrich(content):
+    """
+    텍스트 데이터 변환 - 키워드 5개 추출 + 카테고리 분류
+    본문을 한 번만 보내 하나의 JSON 응답으로 키워드와 카테고리를 함께 받는 변환 로직
+    """
+    content, content_tokens = _preprocess(content)
+
+    cache = get_llm_cache()
+    key = cache_key("enrich", CHAT_MODEL, ENRICH_PROMPT_VERSION, content)
+    if cache is not None:
+        cached = cache.get("enrich", key)
+        if cached is not None:
+            return cached
+
+    response = _call_with_rate_limit(
+        CHAT_MODEL,
+        _enrich_token_estimate(content_tokens),
+        lambda: get_client().chat.completions.create(
+            model=CHAT_MODEL,
+            messages=_enrich_messages(content),
+            response_format={"type": "json_object"},
+            max_tokens=ENRICH_MAX_TOKENS,
+        ),
+    )
+    result, cacheable = _enrichment_from_response(response)
+
+    if cache is not None and cacheable:
+        cache.set("enrich", key, result)
+    return result
+
+
+async def atransform_enrich(content):
+    """transform_enrich의 async 버전 (동시 요청 수는 ASYNC_CONCURRENCY로 제한)"""
+    content, content_tokens = _preprocess(content)
+
+    cache = get_llm_cache()
+    key = cache_key("enrich", CHAT_MODEL, ENRICH_PROMPT_VERSION, content)
+    if cache is not None:
+        cached = cache.get("enrich", key)
+        if cached is not None:
+            return cached
+
+    client = get_async_client()
+    response = await _acall_with_rate_limit(
+        CHAT_MODEL,
+        _enrich_token_estimate(content_tokens),
+        lambda: client.chat.completions.create(
+            model=CHAT_MODEL,
+            messages=_enrich_messages(content),
+            response_format={"type": "json_object"},
+            max_tokens=ENRICH_MAX_TOKENS,
+        ),
+    )
+    result, cacheable = _enrichment_from_response(response)
+
+    if cache is not None and cacheable:
+        cache.set("enrich", key, result)
+    return result
 
 
 def transform_extract_keywords(text):
@@ -29,22 +381,7 @@ def transform_extract_keywords(text):
     텍스트 데이터 변환 - 키워드 5개 추출
     입력 텍스트에서 핵심 키워드를 추출하는 변환 로직
     """
-    text = preprocess_content(text)
-
-    client = OpenAI()
-    response = client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[
-            {
-                "role": "system",
-                "content": "아래의 뉴스 본문에서 주요 키워드를 5개 추출해 주세요. 키워드는 콤마(,)로 구분된 한 줄 문자열로만 답변하세요. (예: 경제, 시장, 금리, 주식, 소비자)",
-            },  # 해당 위치에서 키워드 5개를 추출할 수 있도록 프롬프트 작성성
-            {"role": "user", "content": text},
-        ],
-        max_tokens=100,
-    )
-    keywords = response.choices[0].message.content.strip()
-    return keywords.split(",")
+    return transform_enrich(text)["keywords"]
 
 
 def transform_to_embedding(text: str) -> list[float]:
@@ -52,60 +389,83 @@ def transform_to_embedding(text: str) -> list[float]:
     텍스트 데이터 변환 - 벡터 임베딩
     텍스트를 수치형 벡터로 변환하는 변환 로직
     """
-    text = preprocess_content(text)
+    return transform_to_embeddings([text])[0]
 
-    client = OpenAI()
-    response = client.embeddings.create(input=text, model="text-embedding-3-small")
-    # print(response.data[0].embedding)
-    return response.data[0].embedding
 
+def _lookup_embeddings(texts):
+    """
+    전처리 후 캐시에 있는 임베딩을 찾고,
+    (본문, 캐시 키, 임베딩, 요청할 위치, 요청할 토큰 수)를 돌려준다.
+    """
+    preprocessed = [_preprocess(text) for text in texts]
+    texts = [text for text, _ in preprocessed]
+    embeddings = [None] * len(texts)
 
-def transform_classify_category(content):
+    cache = get_llm_cache()
+    keys = [cache_key("embedding", EMBEDDING_MODEL, "", text) for text in texts]
+    if cache is not None:
+        embeddings = [cache.get("embedding", key) for key in keys]
+
+    missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+    tokens = sum(preprocessed[i][1] for i in missing)
+    return texts, keys, embeddings, missing, tokens
+
+
+def _fill_embeddings(response, keys, embeddings, missing):
+    cache = get_llm_cache()
+    # 응답 순서를 입력 순서에 맞춰 정렬
+    for i, item in zip(missing, sorted(response.data, key=lambda item: item.index)):
+        embeddings[i] = item.embedding
+        if cache is not None:
+            cache.set("embedding", keys[i], item.embedding)
+    return embeddings
+
+
+def transform_to_embeddings(texts: list[str]) -> list[list[float]]:
+    """
+    텍스트 데이터 변환 - 벡터 임베딩 (여러 건)
+    임베딩 API는 입력 목록을 한 번에 받으므로 여러 기사를 한 번의 요청으로 변환
+    캐시에 있는 임베딩은 재사용하고 나머지만 요청
     """
-    TODO: 해당 로직을 위의 코드와 아래의 category를 참고하여 openai 기반의 카테고리 분류가 가능한 형태로 구현하세요.
+    texts, keys, embeddings, missing, tokens = _lookup_embeddings(texts)
+    if not missing:
+        return embeddings
+
+    response = _call_with_rate_limit(
+        EMBEDDING_MODEL,
+        tokens,
+        lambda: get_client().embeddings.create(
+            input=[texts[i] for i in missing], model=EMBEDDING_MODEL
+        ),
+    )
+    return _fill_embeddings(response, keys, embeddings, missing)
+
+
+async def atransform_to_embeddings(texts: list[str]) -> list[list[float]]:
+    """transform_to_embeddings의 async 버전"""
+    texts, keys, embeddings, missing, tokens = _lookup_embeddings(texts)
+    if not missing:
+        return embeddings
+
+    client = get_async_client()
+    response = await _acall_with_rate_limit(
+        EMBEDDING_MODEL,
+        tokens,
+        lambda: client.embeddings.create(
+            input=[texts[i] for i in missing], model=EMBEDDING_MODEL
+        ),
+    )
+    return _fill_embeddings(response, keys, embeddings, missing)
+
+
+async def atransform_to_embedding(text: str) -> list[float]:
+    """transform_to_embedding의 async 버전"""
+    return (await atransform_to_embeddings([text]))[0]
 
+
+def transform_classify_category(content):
+    """
     텍스트 데이터 변환 - 카테고리 분류
     뉴스 내용을 기반으로 적절한 카테고리로 분류하는 변환 로직
     """
-    content = preprocess_content(content)
-
-    client = OpenAI()
-    response = client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[
-            {
-                "role": "system",
-                "content": """다음 뉴스 본문을 읽고 가장 적절한 카테고리를 하나 선택하세요.
-카테고리 목록: IT_과학, 건강, 경제, 교육, 국제, 라이프스타일, 문화, 사건사고, 사회일반, 산업, 스포츠, 여성복지, 여행레저, 연예, 정치, 지역, 취미.
-카테고리 이름만 답변하세요.""",
-            },
-            {"role": "user", "content": content},
-        ],
-        max_tokens=20,
-    )
-    model_output = response.choices[0].message.content.strip()
-
-    allowed_categories = [
-        "IT_과학",
-        "건강",
-        "경제",
-        "교육",
-        "국제",
-        "라이프스타일",
-        "문화",
-        "사건사고",
-        "사회일반",
-        "산업",
-        "스포츠",
-        "여성복지",
-        "여행레저",
-        "연예",
-        "정치",
-        "지역",
-        "취미",
-    ]
-    if model_output not in allowed_categories:
-        model_output = "미분류"
-
-    # print(model_output)
-    return model_output
+    return transform_enrich(content)["category"]
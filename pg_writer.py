@@ -0,0 +1,194 @@
+import atexit
+import json
+import os
+import threading
+import time
+from concurrent.futures import Future
+
+from psycopg2 import InterfaceError, OperationalError
+from psycopg2.extras import execute_values
+from psycopg2.pool import ThreadedConnectionPool
+
+# 한 번에 INSERT할 최대 기사 수
+PG_BATCH_SIZE = 50
+# 버퍼에 기사가 머무를 수 있는 최대 시간 (초)
+PG_FLUSH_INTERVAL = 1.0
+# 커넥션 풀 크기
+PG_POOL_MIN = 1
+PG_POOL_MAX = 4
+
+INSERT_ARTICLES_SQL = """
+    INSERT INTO news_article (title, writer, write_date, category, content, url, keywords, embedding, views, duplicate_of)
+    VALUES %s
+    ON CONFLICT (url) DO NOTHING RETURNING id, url
+"""
+
+
+def default_connect_kwargs():
+    return {
+        "host": "localhost",
+        "dbname": "news",
+        "user": os.getenv("DB_USERNAME"),
+        "password": os.getenv("DB_PASSWORD"),
+        "port": 5432,
+    }
+
+
+def _article_row(data):
+    return (
+        data["title"],
+        data["writer"],
+        data["write_date"],
+        data["category"],
+        data["content"],
+        data["url"],
+        json.dumps(data["keywords"], ensure_ascii=False),
+        json.dumps(data["embedding"]),
+        0,
+        data.get("duplicate_of"),
+    )
+
+
+class PostgresArticleWriter:
+    """
+    기사 저장용 PostgreSQL 배치 writer
+    기사를 버퍼에 모았다가 batch_size개가 차거나 flush_interval이 지나면
+    커넥션 풀의 연결로 여러 행 INSERT ... ON CONFLICT (url) DO NOTHING RETURNING id, url을 한 번에 실행한다.
+
+    write()는 저장된 기사 id(중복이면 -1)를 받을 Future를 돌려주고,
+    배치 INSERT가 실패하면 한 건씩 다시 INSERT해서 실패한 기사의 Future에만 예외를 넣는다.
+    on_saved(article_id, data)가 있으면 새로 저장된 기사마다 flush 직후 호출한다.
+    """
+
+    def __init__(
+        self,
+        pool=None,
+        batch_size=PG_BATCH_SIZE,
+        flush_interval=PG_FLUSH_INTERVAL,
+        on_saved=None,
+    ):
+        self.pool = pool or ThreadedConnectionPool(PG_POOL_MIN, PG_POOL_MAX, **default_connect_kwargs())
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.on_saved = on_saved
+
+        self._buffer = []
+        self._buffer_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._oldest = None
+        self._closed = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="pg-writer", daemon=True)
+        self._thread.start()
+
+    def write(self, data):
+        future = Future()
+        with self._buffer_lock:
+            if not self._buffer:
+                self._oldest = time.monotonic()
+            self._buffer.append((data, future))
+            full = len(self._buffer) >= self.batch_size
+
+        if full:
+            self.flush()
+        return future
+
+    def flush(self):
+        with self._buffer_lock:
+            batch, self._buffer = self._buffer, []
+        if batch:
+            with self._flush_lock:
+                self._insert(batch)
+
+    # 시간 기준 flush
+    def _run(self):
+        while not self._closed.wait(self.flush_interval / 4):
+            with self._buffer_lock:
+                due = self._buffer and time.monotonic() - self._oldest >= self.flush_interval
+            if due:
+                self.flush()
+
+    def _insert(self, batch):
+        # 같은 배치 안의 중복 url은 첫 기사만 INSERT
+        unique = {}
+        for data, _ in batch:
+            unique.setdefault(data["url"], data)
+
+        try:
+            rows = self._insert_rows([_article_row(data) for data in unique.values()])
+            errors = {}
+        except Exception as e:
+            print(f"PostgreSQL 저장 중 오류 발생: {e}")
+            rows, errors = self._insert_one_by_one(unique)
+
+        ids = {url: article_id for article_id, url in rows}
+        saved = []
+        for data, future in batch:
+            if data["url"] in errors:
+                future.set_exception(errors[data["url"]])
+                continue
+            # RETURNING에 없는 url은 이미 저장된 기사
+            article_id = ids.pop(data["url"], -1)
+            future.set_result(article_id)
+            print(article_id, data["title"])
+            if article_id != -1:
+                saved.append((article_id, data))
+
+        print(f"PostgreSQL {len(saved)}/{len(batch)}건 저장")
+        if self.on_saved:
+            for article_id, data in saved:
+                try:
+                    self.on_saved(article_id, data)
+                except Exception as e:
+                    print(f"저장 후처리 중 오류 발생: {e}")
+
+    # 배치 안의 한 행 때문에 전체가 롤백되었을 때, 나머지 기사는 저장되도록 한 건씩 INSERT
+    # 새로 저장된 (id, url) 목록과 실패한 기사의 {url: 예외}를 돌려준다
+    def _insert_one_by_one(self, unique):
+        rows, errors = [], {}
+        for url, data in unique.items():
+            try:
+                rows.extend(self._insert_rows([_article_row(data)]))
+            except Exception as e:
+                print(f"PostgreSQL 저장 중 오류 발생 ({url}): {e}")
+                errors[url] = e
+        return rows, errors
+
+    # 여러 행을 한 번에 INSERT하고 새로 저장된 (id, url) 목록을 돌려준다
+    def _insert_rows(self, rows):
+        conn = self.pool.getconn()
+        broken = False
+        try:
+            with conn.cursor() as cursor:
+                saved = execute_values(cursor, INSERT_ARTICLES_SQL, rows, page_size=len(rows), fetch=True)
+            conn.commit()
+            return saved
+        except (OperationalError, InterfaceError):
+            # 끊어진 연결은 풀에 돌려주지 않고 닫는다
+            broken = True
+            raise
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            self.pool.putconn(conn, close=broken)
+
+    def close(self):
+        if not self._closed.is_set():
+            self._closed.set()
+            self._thread.join()
+            self.flush()
+            self.pool.closeall()
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+# 프로세스에서 공유하는 writer (처음 사용할 때 생성, 종료 시 남은 버퍼 flush)
+def get_article_writer(on_saved=None):
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = PostgresArticleWriter(on_saved=on_saved)
+            atexit.register(_writer.close)
+        return _writer
@@ -0,0 +1,105 @@
+import asyncio
+import random
+import threading
+import time
+
+
+class TokenBucket:
+    """rate(1분당 허용량)만큼 채워지고 최대 rate까지 쌓이는 토큰 버킷"""
+
+    def __init__(self, rate, period=60.0):
+        self.capacity = rate
+        self.fill_rate = rate / period
+        self.available = rate
+        self.updated_at = time.monotonic()
+
+    def _refill(self, now):
+        self.available = min(self.capacity, self.available + (now - self.updated_at) * self.fill_rate)
+        self.updated_at = now
+
+    # amount만큼 쓸 수 있을 때까지 남은 시간 (초)
+    def wait_time(self, amount, now):
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        if self.available >= amount:
+            return 0.0
+        return (amount - self.available) / self.fill_rate
+
+    def consume(self, amount):
+        self.available -= min(amount, self.capacity)
+
+
+class RateLimiter:
+    """
+    요청 수(RPM)와 토큰 수(TPM)를 함께 관리하는 공유 스케줄러
+    acquire(tokens)는 두 버킷에 모두 여유가 생길 때까지 기다린 뒤 사용량을 차감한다.
+    429 응답을 받으면 penalize(delay)로 Retry-After 동안 모든 요청을 멈춘다.
+    """
+
+    def __init__(self, rpm, tpm):
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+        self._waiting = 0
+        self.throttled = 0
+
+    @property
+    def queue_depth(self):
+        """차례를 기다리고 있는 요청 수"""
+        return self._waiting
+
+    # 지금 보낼 수 있으면 사용량을 차감하고 0을, 아니면 기다릴 시간을 돌려준다
+    def _reserve(self, tokens):
+        with self._lock:
+            now = time.monotonic()
+            wait = max(
+                self._blocked_until - now,
+                self.requests.wait_time(1, now),
+                self.tokens.wait_time(tokens, now),
+            )
+            if wait > 0:
+                return wait
+            self.requests.consume(1)
+            self.tokens.consume(tokens)
+            return 0.0
+
+    def acquire(self, tokens):
+        with self._lock:
+            self._waiting += 1
+        try:
+            while (wait := self._reserve(tokens)) > 0:
+                time.sleep(wait)
+        finally:
+            with self._lock:
+                self._waiting -= 1
+
+    async def aacquire(self, tokens):
+        with self._lock:
+            self._waiting += 1
+        try:
+            while (wait := self._reserve(tokens)) > 0:
+                await asyncio.sleep(wait)
+        finally:
+            with self._lock:
+                self._waiting -= 1
+
+    def penalize(self, delay):
+        """서버가 알려준 Retry-After(또는 백오프) 동안 새 요청을 보내지 않는다."""
+        with self._lock:
+            self.throttled += 1
+            self._blocked_until = max(self._blocked_until, time.monotonic() + delay)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "queue_depth": self._waiting,
+                "throttled": self.throttled,
+                "available_requests": int(self.requests.available),
+                "available_tokens": int(self.tokens.available),
+            }
+
+
+# 지수 백오프 + full jitter (초)
+def backoff_delay(attempt, base=1.0, cap=60.0):
+    return random.uniform(0, min(cap, base * 2 ** attempt))
@@ -0,0 +1,179 @@
+import atexit
+import json
+import os
+import threading
+import time
+
+from psycopg2.errors import DeadlockDetected, SerializationFailure
+from psycopg2.extras import execute_values
+from psycopg2.pool import ThreadedConnectionPool
+
+from openai_api import EMBEDDING_DIMENSIONS
+from pg_writer import PG_POOL_MAX, PG_POOL_MIN, default_connect_kwargs
+
+# 기사마다 미리 계산해 둘 관련 기사 수
+RELATED_TOP_K = 10
+# halfvec 인덱스에서 top_k의 몇 배만큼 후보를 찾아 다시 정렬할지
+RELATED_RERANK_FACTOR = 4
+# HNSW 검색 후보 수 (클수록 정확하지만 느림, Django의 PGVECTOR_EF_SEARCH와 같은 값)
+HNSW_EF_SEARCH = int(os.getenv("PGVECTOR_EF_SEARCH", 40))
+# 한 번에 처리할 최대 기사 수, 버퍼에 머무를 수 있는 최대 시간 (초)
+RELATED_BATCH_SIZE = 50
+RELATED_FLUSH_INTERVAL = 1.0
+# 다른 consumer와 겹쳐서 교착 상태, 직렬화 실패가 나면 다시 시도할 횟수와 대기 시간 (초)
+RELATED_MAX_RETRIES = 3
+RELATED_RETRY_DELAY = 0.2
+
+# halfvec HNSW 인덱스(코사인 거리)로 후보를 찾고, 후보만 float32 임베딩으로 거리를 다시 재서 가장 가까운 기사 찾기
+# (후보 쿼리의 식이 인덱스 article_embedding_half_hnsw_idx와 같아야 인덱스를 탄다)
+NEIGHBOURS_SQL = f"""
+    SELECT id, embedding <=> %(vector)s::vector AS distance
+    FROM (
+        SELECT id, embedding
+        FROM news_article
+        WHERE id <> %(article_id)s
+        ORDER BY embedding::halfvec({EMBEDDING_DIMENSIONS}) <=> %(vector)s::halfvec({EMBEDDING_DIMENSIONS})
+        LIMIT %(candidates)s
+    ) candidates
+    ORDER BY distance
+    LIMIT %(limit)s
+"""
+
+UPSERT_RELATED_SQL = """
+    INSERT INTO news_relatedarticle (article_id, related_id, distance)
+    VALUES %s
+    ON CONFLICT (article_id, related_id) DO UPDATE SET distance = EXCLUDED.distance
+"""
+
+# 기사마다 거리가 가까운 top_k개만 남기기
+PRUNE_RELATED_SQL = """
+    DELETE FROM news_relatedarticle
+    WHERE id IN (
+        SELECT id FROM (
+            SELECT id, row_number() OVER (PARTITION BY article_id ORDER BY distance, related_id) AS rank
+            FROM news_relatedarticle
+            WHERE article_id = ANY(%s)
+        ) ranked
+        WHERE rank > %s
+    )
+"""
+
+
+class RelatedArticleUpdater:
+    """
+    관련 기사 테이블(news_relatedarticle)을 새 기사가 저장될 때마다 갱신하는 writer
+    새 기사의 이웃 top_k개를 HNSW 인덱스로 찾아 저장하고,
+    반대로 그 이웃들의 관련 기사 목록에도 새 기사를 넣은 뒤 top_k개만 남긴다.
+    기사를 batch_size개 또는 flush_interval까지 모아서 한 트랜잭션으로 처리한다.
+    """
+
+    def __init__(
+        self,
+        pool=None,
+        top_k=RELATED_TOP_K,
+        ef_search=HNSW_EF_SEARCH,
+        batch_size=RELATED_BATCH_SIZE,
+        flush_interval=RELATED_FLUSH_INTERVAL,
+    ):
+        self.pool = pool or ThreadedConnectionPool(PG_POOL_MIN, PG_POOL_MAX, **default_connect_kwargs())
+        self.top_k = top_k
+        self.ef_search = ef_search
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        self._buffer = []
+        self._buffer_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._oldest = None
+        self._closed = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="related-articles", daemon=True)
+        self._thread.start()
+
+    def add(self, article_id, embedding):
+        with self._buffer_lock:
+            if not self._buffer:
+                self._oldest = time.monotonic()
+            self._buffer.append((article_id, embedding))
+            full = len(self._buffer) >= self.batch_size
+
+        if full:
+            self.flush()
+
+    def flush(self):
+        with self._buffer_lock:
+            batch, self._buffer = self._buffer, []
+        if batch:
+            with self._flush_lock:
+                for attempt in range(1, RELATED_MAX_RETRIES + 1):
+                    try:
+                        self._update(batch)
+                        return
+                    except (DeadlockDetected, SerializationFailure) as e:
+                        if attempt == RELATED_MAX_RETRIES:
+                            print(f"관련 기사 저장 중 오류 발생: {e}")
+                            return
+                        time.sleep(RELATED_RETRY_DELAY * attempt)
+                    except Exception as e:
+                        print(f"관련 기사 저장 중 오류 발생: {e}")
+                        return
+
+    # 시간 기준 flush
+    def _run(self):
+        while not self._closed.wait(self.flush_interval / 4):
+            with self._buffer_lock:
+                due = self._buffer and time.monotonic() - self._oldest >= self.flush_interval
+            if due:
+                self.flush()
+
+    def _update(self, batch):
+        conn = self.pool.getconn()
+        try:
+            with conn.cursor() as cursor:
+                candidates = self.top_k * RELATED_RERANK_FACTOR
+                cursor.execute("SET LOCAL hnsw.ef_search = %s", (max(self.ef_search, candidates),))
+
+                # (기사, 관련 기사) -> 거리, 양방향으로 기록
+                pairs = {}
+                for article_id, embedding in batch:
+                    vector = json.dumps(embedding)
+                    cursor.execute(
+                        NEIGHBOURS_SQL,
+                        {"vector": vector, "article_id": article_id, "candidates": candidates, "limit": self.top_k},
+                    )
+                    for related_id, distance in cursor.fetchall():
+                        pairs[(article_id, related_id)] = distance
+                        pairs[(related_id, article_id)] = distance
+
+                if pairs:
+                    # 여러 consumer가 겹치는 행을 upsert하므로 항상 같은 순서로 잠가서 교착 상태를 피한다
+                    rows = [(article_id, related_id, distance) for (article_id, related_id), distance in sorted(pairs.items())]
+                    execute_values(cursor, UPSERT_RELATED_SQL, rows, page_size=len(rows))
+                    touched = sorted({article_id for article_id, _ in pairs})
+                    cursor.execute(PRUNE_RELATED_SQL, (touched, self.top_k))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            self.pool.putconn(conn)
+
+    def close(self):
+        if not self._closed.is_set():
+            self._closed.set()
+            self._thread.join()
+            self.flush()
+            self.pool.closeall()
+
+
+_updater = None
+_updater_lock = threading.Lock()
+
+
+# 프로세스에서 공유하는 관련 기사 writer (종료 시 남은 기사 처리)
+def get_related_updater():
+    global _updater
+    with _updater_lock:
+        if _updater is None:
+            _updater = RelatedArticleUpdater()
+            atexit.register(_updater.close)
+        return _updater
@@ -0,0 +1,131 @@
+import json
+import os
+import sys
+
+import numpy as np
+import pytest
+
+django = pytest.importorskip("django")
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "django_project"))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "django_project.settings")
+
+from django.conf import settings  # noqa: E402
+
+# PostgreSQL 없이 돌리기 위해 메모리 SQLite 사용
+settings.DATABASES = {"default": {"ENGINE": "django.db.backends.sqlite3", "NAME": ":memory:"}}
+django.setup()
+
+from django.apps import apps  # noqa: E402
+from django.core.management import call_command  # noqa: E402
+from django.core.management.base import CommandError  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.utils import timezone  # noqa: E402
+from pgvector.django import HnswIndex  # noqa: E402
+
+from news import embeddings  # noqa: E402
+from news.embeddings import Checkpoint, CheckpointMismatch, FakeEmbeddingBackend, _token_batches, reembed  # noqa: E402
+from news.models import EMBEDDING_DIMENSIONS, Article  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def tables():
+    # SQLite에는 HNSW 인덱스가 없으므로 빼고 테이블 생성
+    created = set()
+    with connection.schema_editor() as editor:
+        for model in apps.get_models():
+            if model._meta.db_table in created:
+                continue
+            created.add(model._meta.db_table)
+            model._meta.indexes = [index for index in model._meta.indexes if not isinstance(index, HnswIndex)]
+            editor.create_model(model)
+
+
+@pytest.fixture
+def articles(tables, monkeypatch):
+    Article.objects.all().delete()
+    for i in range(10):
+        Article.objects.create(
+            title=f"기사 {i}",
+            writer="기자",
+            write_date=timezone.now(),
+            category="IT",
+            content=f"본문 {i}",
+            url=f"https://example.com/{i}",
+            embedding=[0.0] * EMBEDDING_DIMENSIONS,
+        )
+
+    # SQLite에는 ::vector 캐스트가 없으므로 ORM으로 저장
+    updates = []
+
+    def update_embeddings(rows):
+        updates.append([article_id for article_id, _ in rows])
+        for article_id, embedding in rows:
+            Article.objects.filter(id=article_id).update(embedding=embedding)
+        return len(rows)
+
+    monkeypatch.setattr(embeddings, "update_embeddings", update_embeddings)
+    return updates
+
+
+def test_fake_backend_is_deterministic():
+    backend = FakeEmbeddingBackend(dimensions=8)
+    assert backend.model == f"fake:{embeddings.EMBEDDING_MODEL}"
+    first = backend._vector("같은 본문")
+    assert first == FakeEmbeddingBackend(dimensions=8)._vector("같은 본문")
+    assert first != backend._vector("다른 본문")
+    assert len(first) == 8
+    assert np.isclose(np.linalg.norm(first), 1.0)
+
+
+def test_token_batches_split_by_token_budget():
+    truncated = [(f"본문 {i}", 100) for i in range(5)]
+    assert list(_token_batches(truncated, 250)) == [["본문 0", "본문 1"], ["본문 2", "본문 3"], ["본문 4"]]
+    assert list(_token_batches([], 250)) == []
+
+
+def test_token_batches_send_oversized_text_alone():
+    truncated = [("짧은 본문", 10), ("긴 본문", 500), ("짧은 본문 2", 10)]
+    assert list(_token_batches(truncated, 100)) == [["짧은 본문"], ["긴 본문"], ["짧은 본문 2"]]
+
+
+def test_checkpoint_rejects_other_model_or_dimensions(tmp_path):
+    path = str(tmp_path / "checkpoint.json")
+    Checkpoint(path, "model-a", 1536).save(42)
+    assert Checkpoint(path, "model-a", 1536).load() == 42
+    with pytest.raises(CheckpointMismatch):
+        Checkpoint(path, "model-b", 1536).load()
+    with pytest.raises(CheckpointMismatch):
+        Checkpoint(path, "model-a", 512).load()
+
+
+def test_reembed_resumes_from_checkpoint(articles, tmp_path):
+    backend = FakeEmbeddingBackend()
+    checkpoint = Checkpoint(str(tmp_path / "checkpoint.json"), backend.model, backend.dimensions)
+    ids = list(Article.objects.order_by("id").values_list("id", flat=True))
+
+    assert reembed(backend, checkpoint, batch_size=2, concurrency=2, limit=3) == 3
+    assert checkpoint.load() == ids[2]
+
+    # 이어서 실행하면 체크포인트 다음 기사부터 처리
+    assert reembed(backend, checkpoint, batch_size=2, concurrency=2) == 7
+    assert [article_id for update in articles for article_id in update] == ids
+    assert checkpoint.load() == ids[-1]
+
+    article = Article.objects.get(id=ids[-1])
+    assert np.allclose(article.embedding, backend._vector(article.content), atol=1e-6)
+
+
+def test_reembed_command_respects_limit_zero(articles, tmp_path):
+    path = tmp_path / "checkpoint.json"
+    call_command("reembed", backend="fake", limit=0, checkpoint=str(path))
+    assert articles == []
+    assert not path.exists()
+
+
+def test_reembed_command_reports_checkpoint_mismatch(articles, tmp_path):
+    path = tmp_path / "checkpoint.json"
+    path.write_text(json.dumps({"model": "other", "dimensions": EMBEDDING_DIMENSIONS, "last_id": 1}))
+    with pytest.raises(CommandError):
+        call_command("reembed", backend="fake", checkpoint=str(path))
+    assert articles == []
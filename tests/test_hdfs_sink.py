@@ -0,0 +1,162 @@
+import json
+import os
+import time
+from datetime import datetime
+
+import pytest
+
+import hdfs_sink
+from hdfs_sink import IN_PROGRESS_SUFFIX, LocalFileSystemClient, RollingHdfsSink
+
+
+@pytest.fixture
+def dirs(tmp_path):
+    return str(tmp_path / "staging"), str(tmp_path / "hdfs")
+
+
+def uploaded(hdfs_root):
+    """업로드된 part 파일 이름과 기사 목록 {(날짜, 파일 이름): [기사]}"""
+    result = {}
+    news_dir = os.path.join(hdfs_root, "news")
+    if not os.path.isdir(news_dir):
+        return result
+    for date in os.listdir(news_dir):
+        for name in os.listdir(os.path.join(news_dir, date)):
+            with open(os.path.join(news_dir, date, name), encoding="utf-8") as f:
+                result[(date, name)] = [json.loads(line) for line in f]
+    return result
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def staged_files(staging):
+    return [
+        name
+        for _, _, names in os.walk(staging)
+        for name in names
+        if name.endswith((".jsonl", ".jsonl" + IN_PROGRESS_SUFFIX))
+    ]
+
+
+def test_rolls_by_size_and_uploads(dirs):
+    staging, hdfs_root = dirs
+    sink = RollingHdfsSink(LocalFileSystemClient(hdfs_root), staging_dir=staging, max_bytes=200, max_age=60)
+    articles = [{"title": f"기사 {i}", "content": "x" * 80} for i in range(5)]
+    for article in articles:
+        sink.write(article)
+    sink.close()
+
+    parts = uploaded(hdfs_root)
+    assert len(parts) >= 3
+    today = datetime.now().strftime("%Y-%m-%d")
+    assert {date for date, _ in parts} == {today}
+    assert all(name.startswith("part-") and name.endswith(".jsonl") for _, name in parts)
+    assert sorted((a for rows in parts.values() for a in rows), key=lambda a: a["title"]) == articles
+    assert staged_files(staging) == []
+
+
+def test_rolls_by_age(dirs):
+    staging, hdfs_root = dirs
+    sink = RollingHdfsSink(LocalFileSystemClient(hdfs_root), staging_dir=staging, max_age=0.2)
+    try:
+        sink.write({"title": "한 건"})
+        assert wait_for(lambda: len(uploaded(hdfs_root)) == 1)
+        assert list(uploaded(hdfs_root).values()) == [[{"title": "한 건"}]]
+    finally:
+        sink.close()
+
+
+def test_recovers_parts_left_by_dead_worker(dirs):
+    staging, hdfs_root = dirs
+    dead = os.path.join(staging, "worker-old-host-1")
+    os.makedirs(dead)
+    open(os.path.join(dead, ".lock"), "w").close()
+    with open(os.path.join(dead, "2025-06-01_part-000000-1-00001.jsonl" + IN_PROGRESS_SUFFIX), "w") as f:
+        f.write('{"title": "쓰다 만 파일"}\n')
+    with open(os.path.join(dead, "2025-06-01_part-000000-1-00002.jsonl"), "w") as f:
+        f.write('{"title": "닫힌 파일"}\n')
+
+    RollingHdfsSink(LocalFileSystemClient(hdfs_root), staging_dir=staging, max_age=60).close()
+
+    assert uploaded(hdfs_root) == {
+        ("2025-06-01", "part-000000-1-00001.jsonl"): [{"title": "쓰다 만 파일"}],
+        ("2025-06-01", "part-000000-1-00002.jsonl"): [{"title": "닫힌 파일"}],
+    }
+    assert not os.path.exists(dead)
+    assert staged_files(staging) == []
+
+
+@pytest.mark.skipif(hdfs_sink.fcntl is None, reason="fcntl 필요")
+def test_does_not_take_parts_of_live_worker(dirs):
+    staging, hdfs_root = dirs
+    client = LocalFileSystemClient(hdfs_root)
+    live = RollingHdfsSink(client, staging_dir=staging, max_age=60)
+    live.write({"title": "쓰는 중"})
+
+    RollingHdfsSink(client, staging_dir=staging, max_age=60).close()
+    assert uploaded(hdfs_root) == {}
+    assert len(staged_files(staging)) == 1
+
+    live.close()
+    assert list(uploaded(hdfs_root).values()) == [[{"title": "쓰는 중"}]]
+
+
+class FailingClient(LocalFileSystemClient):
+    def __init__(self, root):
+        super().__init__(root)
+        self.attempts = 0
+
+    def upload(self, hdfs_path, local_path):
+        self.attempts += 1
+        raise ConnectionError("HDFS 연결 실패")
+
+
+def test_gives_up_after_max_attempts_and_keeps_file(dirs, monkeypatch):
+    staging, hdfs_root = dirs
+    monkeypatch.setattr(hdfs_sink, "UPLOAD_RETRY_DELAY", 0)
+    client = FailingClient(hdfs_root)
+    sink = RollingHdfsSink(client, staging_dir=staging, max_age=60)
+    sink.write({"title": "실패"})
+    sink.roll()
+    assert wait_for(lambda: client.attempts == hdfs_sink.UPLOAD_MAX_ATTEMPTS)
+    time.sleep(0.2)
+    sink.close()
+
+    assert client.attempts == hdfs_sink.UPLOAD_MAX_ATTEMPTS
+    assert len(staged_files(staging)) == 1
+
+    # 다음 실행에서 남은 파일을 올린다
+    RollingHdfsSink(LocalFileSystemClient(hdfs_root), staging_dir=staging, max_age=60).close()
+    assert list(uploaded(hdfs_root).values()) == [[{"title": "실패"}]]
+
+
+def test_skips_missing_file(dirs):
+    staging, hdfs_root = dirs
+    client = FailingClient(hdfs_root)
+    sink = RollingHdfsSink(client, staging_dir=staging, max_age=60)
+    sink._uploads.put((os.path.join(staging, "2025-06-01_part-gone.jsonl"), 1))
+    sink.close()
+    assert client.attempts == 0
+
+
+def test_roll_resets_file_when_rename_fails(dirs, monkeypatch):
+    staging, hdfs_root = dirs
+    sink = RollingHdfsSink(LocalFileSystemClient(hdfs_root), staging_dir=staging, max_age=60)
+    sink.write({"title": "첫 번째"})
+
+    real_replace = os.replace
+    monkeypatch.setattr(hdfs_sink.os, "replace", lambda *args: (_ for _ in ()).throw(OSError("rename 실패")))
+    with pytest.raises(OSError):
+        sink.roll()
+    monkeypatch.setattr(hdfs_sink.os, "replace", real_replace)
+
+    sink.write({"title": "두 번째"})
+    sink.close()
+    assert list(uploaded(hdfs_root).values()) == [[{"title": "두 번째"}]]